@@ -0,0 +1,65 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""GOT relocation microbenchmark.
+
+Compare :py:func:`camelot.barbican.relocation.elfutils.relocate_table` against the former per
+entry implementation (`int.from_bytes` and `bytearray` concatenation).
+
+.. code-block:: console
+
+    python benchmarks/bench_got_relocation.py [--entries N] [--repeat R]
+"""
+
+from argparse import ArgumentParser
+import random
+import struct
+import timeit
+
+from camelot.barbican.relocation.elfutils import relocate_table
+
+S_RAM = 0x20000000
+E_RAM = 0x20040000
+OFFSET = 0x8000
+
+
+def legacy_relocate_table(content: bytes, lower: int, upper: int, offset: int) -> bytes:
+    chunk_size = 4
+    patched = bytearray()
+    for i in range(0, len(content), chunk_size):
+        addr = int.from_bytes(content[i : i + chunk_size], "little")
+        if lower <= addr <= upper:
+            addr = addr + offset
+        patched += addr.to_bytes(chunk_size, "little")
+    return bytes(patched)
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1 << 16, help="number of GOT entries")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # Mix of ram (relocated) and flash (untouched) addresses
+    entries = [
+        rng.randrange(S_RAM, E_RAM) if rng.random() < 0.7 else rng.randrange(0x08000000, 0x08100000)
+        for _ in range(args.entries)
+    ]
+    got = struct.pack(f"<{len(entries)}I", *entries)
+
+    assert relocate_table(got, S_RAM, E_RAM, OFFSET) == legacy_relocate_table(
+        got, S_RAM, E_RAM, OFFSET
+    )
+
+    print(f"GOT relocation, {args.entries} entries ({len(got) // 1024} KiB)")
+    for name, func in (("legacy", legacy_relocate_table), ("relocate_table", relocate_table)):
+        best = min(
+            timeit.repeat(lambda: func(got, S_RAM, E_RAM, OFFSET), number=1, repeat=args.repeat)
+        )
+        print(f"  {name:<16} {best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Memory layout (de)serialization microbenchmark.
+
+Compare :py:meth:`camelot.barbican.utils.memory_layout.Layout.from_json` and
+:py:meth:`camelot.barbican.utils.memory_layout.Layout.asdict` against the former implementation
+(per field reflection in `Region.__post_init__` and `dataclasses.asdict` w/ a dict factory).
+
+.. code-block:: console
+
+    python benchmarks/bench_layout_load.py [--regions N] [--repeat R]
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass, field, fields, asdict
+from enum import Enum
+import json
+import timeit
+from types import GenericAlias
+import typing as T
+
+from camelot.barbican.utils import memory_layout as memory
+
+
+@dataclass(kw_only=True, frozen=True)
+class LegacyRegion:
+    name: str
+    type: memory.Region.Type
+    permission: memory.Region.Permission = memory.Region.Permission(0)
+    start_address: int
+    size: int
+    pool: str = ""
+    subregion_mask: int = 0
+    subregions: list["LegacyRegion"] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        for f in fields(self):
+            value = getattr(self, f.name)
+            value_type = T.cast(type, f.type)
+            if value_type is int and isinstance(value, str):
+                object.__setattr__(self, f.name, int(value, 16))
+            elif value_type == GenericAlias(list, ("LegacyRegion",)) and all(
+                isinstance(e, dict) for e in value
+            ):
+                object.__setattr__(self, f.name, [LegacyRegion(**e) for e in value])
+            elif issubclass(value_type, Enum):
+                object.__setattr__(self, f.name, value_type(value))
+
+
+@dataclass
+class LegacyLayout:
+    regions: list[LegacyRegion] = field(default_factory=list)
+    pools: list[LegacyRegion] = field(default_factory=list)
+
+
+def legacy_from_json(data: str) -> LegacyLayout:
+    keyvals = json.loads(data)
+    return LegacyLayout(
+        regions=[LegacyRegion(**r) for r in keyvals["regions"]],
+        pools=[LegacyRegion(**p) for p in keyvals.get("pools", [])],
+    )
+
+
+def legacy_asdict(layout: LegacyLayout) -> dict:
+    return asdict(layout, dict_factory=memory.Region.dict_factory)
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument("--regions", type=int, default=10000, help="number of regions")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    layout = memory.Layout(
+        pools=[
+            memory.Region(
+                name="tasks_code",
+                type=memory.Region.Type.Text,  # type: ignore
+                start_address=0x08000000,
+                size=args.regions * 0x1000,
+            ),
+        ]
+    )
+    for i in range(args.regions):
+        layout.append(
+            memory.Region(
+                name=f"app{i}",
+                type=memory.Region.Type.Text,  # type: ignore
+                permission=memory.Region.Permission.Read | memory.Region.Permission.Exec,
+                start_address=0x08000000 + i * 0x1000,
+                size=0xC00,
+                pool="tasks_code",
+                subregion_mask=0xC0,
+            )
+        )
+    data = json.dumps(layout.asdict(), indent=4)
+
+    legacy = legacy_from_json(data)
+    assert legacy_asdict(legacy) == layout.asdict()
+    assert memory.Layout.from_json(data) == layout
+
+    print(f"Memory layout, {args.regions} regions ({len(data) // 1024} KiB)")
+    for name, func in (
+        ("legacy load", lambda: legacy_from_json(data)),
+        ("from_json", lambda: memory.Layout.from_json(data)),
+        ("legacy dump", lambda: legacy_asdict(legacy)),
+        ("asdict", layout.asdict),
+    ):
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"  {name:<16} {best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
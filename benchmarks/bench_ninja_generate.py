@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Ninja build statements generation microbenchmark.
+
+Compare :py:meth:`camelot.barbican.builder.ninja.NinjaWriter.build_statement` against the former
+generation path (`NinjaWriter.build(**build.asdict())`, i.e. dependency builds recursively deep
+copied as dictionaries) on a synthetic project w/ integration targets dependency chains mirroring
+:py:meth:`camelot.barbican.project.Project._integration_targets`.
+
+.. code-block:: console
+
+    python benchmarks/bench_ninja_generate.py [--apps N] [--repeat R] [--legacy]
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+import timeit
+
+from camelot.barbican.builder.ninja import NinjaBuild, NinjaWriter
+
+
+def _internal(out: Path, cmd: str, implicit: list) -> NinjaBuild:
+    return NinjaBuild(
+        outputs=[out],
+        rule="internal",
+        implicit=["kernel_introspect.json", *implicit],
+        variables={"cmd": cmd, "args": f"{out}", "description": f"{cmd} {out}"},
+    )
+
+
+def integration_targets(apps: int) -> list[NinjaBuild]:
+    build_dir = Path("build")
+    dummy_layout = _internal(build_dir / "dummy_layout.json", "gen_memory_layout", [])
+    dummy_ld_script = _internal(build_dir / "dummy.lds", "gen_ld_script", [dummy_layout])
+    dummy_apps = [
+        _internal(build_dir / f"app{i}.dummy.elf", "relink_elf", [dummy_ld_script, f"app{i}.stamp"])
+        for i in range(apps)
+    ]
+    # firmware layout depends on every dummy linked app, and every app final link depends on it
+    firmware_layout = _internal(build_dir / "layout.json", "gen_memory_layout", dummy_apps)
+    elves = []
+    for i in range(apps):
+        ld_script = _internal(build_dir / f"app{i}.lds", "gen_ld_script", [firmware_layout])
+        elves.append(_internal(build_dir / f"app{i}.elf", "relink_elf", [ld_script]))
+    hexes = [_internal(elf.outputs[0].with_suffix(".hex"), "objcopy", [elf]) for elf in elves]
+    metadata = [_internal(elf.outputs[0].with_suffix(".meta"), "gen_meta", [elf]) for elf in elves]
+    kernel = _internal(build_dir / "kernel.patched.elf", "kernel_fixup", metadata)
+    kernel_hex = _internal(build_dir / "kernel.hex", "objcopy", [kernel])
+    firmware = _internal(build_dir / "firmware.hex", "srec_cat", [kernel_hex, *hexes])
+    return [
+        dummy_layout,
+        dummy_ld_script,
+        *dummy_apps,
+        firmware_layout,
+        *elves,
+        *hexes,
+        *metadata,
+        kernel,
+        kernel_hex,
+        firmware,
+    ]
+
+
+def legacy_generate(builds: list[NinjaBuild]) -> str:
+    nw = NinjaWriter()
+    for b in builds:
+        nw.build(**(b.asdict()))
+    return nw.render()
+
+
+def generate(builds: list[NinjaBuild]) -> str:
+    nw = NinjaWriter()
+    for b in builds:
+        nw.build_statement(b)
+    return nw.render()
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument("--apps", type=int, default=500, help="number of applications")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--legacy",
+        action="store_true",
+        help="also run the former generation path (super-linear, takes minutes w/ 500 apps)",
+    )
+    args = parser.parse_args()
+
+    builds = integration_targets(args.apps)
+    benchmarks = [("build_statement", lambda: generate(builds))]
+    if args.legacy:
+        assert legacy_generate(builds) == generate(builds)
+        benchmarks.append(("asdict", lambda: legacy_generate(builds)))
+
+    print(f"Integration targets, {args.apps} applications ({len(builds)} build statements)")
+    for name, func in benchmarks:
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"  {name:<16} {best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Ninja line wrapping and escaping microbenchmark.
+
+Compare :py:meth:`camelot.barbican.builder.ninja.NinjaWriter._wrap` against the former
+implementation (remaining line re-sliced on each wrap, i.e. quadratic in line length) on build
+lines of increasing length, wrapping time is expected to scale linearly.
+
+:py:meth:`camelot.barbican.builder.ninja.NinjaWriter._escape` (chained `str.replace`) is also
+compared against a `str.translate` based escaper, the latter being slower as CPython translate
+falls back to a per character slow path w/ non 1:1 mappings.
+
+.. code-block:: console
+
+    python benchmarks/bench_ninja_wrap.py [--max-words N] [--repeat R]
+"""
+
+from argparse import ArgumentParser
+from pathlib import PurePosixPath
+import timeit
+
+from camelot.barbican.builder.ninja import NinjaWriter
+
+_ESCAPE_NEW_LINE = " $"
+
+
+def legacy_wrap(line: str, width: int) -> list[str]:
+    if len(line) <= width:
+        return [line]
+
+    def space_is_escaped(text: str, pos: int) -> bool:
+        idx = pos - 1
+        cnt = 0
+        while idx > 0 and text[idx] == "$":
+            idx -= 1
+            cnt += 1
+        return cnt % 2 == 1
+
+    def space_pos_before_line_width(text: str) -> int:
+        pos = width - len(_ESCAPE_NEW_LINE)
+        while True:
+            pos = text.rfind(" ", 0, pos)
+            if pos < 0 or not space_is_escaped(text, pos):
+                break
+        return pos
+
+    def space_pos_after_line_width(text: str) -> int:
+        pos = width - len(_ESCAPE_NEW_LINE) - 1
+        while True:
+            pos = text.find(" ", pos + 1)
+            if pos < 0 or not space_is_escaped(text, pos):
+                break
+        return pos
+
+    parts: list[str] = []
+    indent = len(line) - len(line.lstrip())
+    min_pos = indent
+    while len(line) > width:
+        pos = space_pos_before_line_width(line)
+        if pos < min_pos:
+            pos = space_pos_after_line_width(line)
+        if pos >= min_pos:
+            parts.append(line[:pos] + _ESCAPE_NEW_LINE)
+            line = " " * (indent + 2) + line[pos + 1 :]
+            min_pos = indent + 2
+        else:
+            break
+    parts.append(line)
+    return parts
+
+
+_ESCAPE_TABLE = str.maketrans({"$": "$$", " ": "$ ", ":": "$:"})
+
+
+def translate_escape(value: str | PurePosixPath) -> str:
+    return str(value).translate(_ESCAPE_TABLE)
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument("--max-words", type=int, default=16000, help="longest line, in words")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    nw = NinjaWriter()
+
+    print("Line wrapping")
+    words = 1000
+    while words <= args.max_words:
+        line = "build out.elf: link " + " ".join(f"obj/app$ {i}/main.c.o" for i in range(words))
+        assert nw._wrap(line) == legacy_wrap(line, nw.width)
+        legacy = min(
+            timeit.repeat(lambda: legacy_wrap(line, nw.width), number=1, repeat=args.repeat)
+        )
+        best = min(timeit.repeat(lambda: nw._wrap(line), number=1, repeat=args.repeat))
+        print(
+            f"  {words:>6} words ({len(line) // 1024:>4} KiB)"
+            f"  legacy {legacy * 1000:>10.2f} ms  _wrap {best * 1000:>8.2f} ms"
+        )
+        words *= 2
+
+    print("Escaping, 100k paths")
+    paths = [PurePosixPath("build", f"app {i}", "obj", "src:main.c.o") for i in range(100000)]
+    assert all(nw._escape(p) == translate_escape(p) for p in paths)
+    for name, func in (("str.replace", nw._escape), ("str.translate", translate_escape)):
+        best = min(timeit.repeat(lambda: [func(p) for p in paths], number=1, repeat=args.repeat))
+        print(f"  {name:<16} {best * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
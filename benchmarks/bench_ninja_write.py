@@ -0,0 +1,96 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Ninja build file generation microbenchmark.
+
+Compare :py:meth:`camelot.barbican.builder.ninja.NinjaFile.write` in memory backend (whole file
+rendered as a string and then written) against the streaming backend (lines written to a
+buffered file handle as they are generated), for time and peak memory.
+
+.. code-block:: console
+
+    python benchmarks/bench_ninja_write.py [--edges N] [--repeat R]
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+import tempfile
+import timeit
+import tracemalloc
+
+from camelot.barbican.builder.ninja import NinjaBuild, NinjaFile, NinjaRule, NinjaVariable
+
+
+class Builder:
+    def __init__(self, name: str, edges: int) -> None:
+        self._name = name
+        self._edges = edges
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @classmethod
+    def __ninja_variables__(cls):
+        yield NinjaVariable(key="cc", value="arm-none-eabi-gcc")
+
+    @classmethod
+    def __ninja_rules__(cls):
+        yield NinjaRule(
+            name="cc",
+            command="$cc -MD -MF $out.d $cflags -c $in -o $out",
+            description="compile $out",
+            depfile="$out.d",
+        )
+
+    def __ninja_builds__(self):
+        for i in range(self._edges):
+            yield NinjaBuild(
+                outputs=[f"{self._name}/obj/src/module_{i}.c.o"],
+                rule="cc",
+                inputs=[f"{self._name}/src/module_{i}.c"],
+                implicit=[f"{self._name}/include/module_{i}.h", f"{self._name}/include/config.h"],
+                order_only=[f"{self._name}/generated.stamp"],
+                variables={"cflags": "-Os -mcpu=cortex-m33 -mthumb -ffunction-sections"},
+                build_by_default=(i % 100 == 0),
+            )
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument("--edges", type=int, default=100000, help="number of build edges")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    nf = NinjaFile([Builder("pkg", args.edges)])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        memory = Path(tmpdir, "memory.ninja")
+        streaming = Path(tmpdir, "streaming.ninja")
+        nf.write(memory, streaming=False)
+        nf.write(streaming, streaming=True)
+        assert memory.read_bytes() == streaming.read_bytes()
+
+        size = memory.stat().st_size
+        print(f"Ninja build file, {args.edges} edges ({size // 1024} KiB)")
+        for name, streamed, path in (
+            ("in memory", False, memory),
+            ("streaming", True, streaming),
+        ):
+
+            def func() -> None:
+                # remove output file, i.e. benchmark a full (and not an unchanged) write
+                path.unlink(missing_ok=True)
+                nf.write(path, streaming=streamed)
+
+            best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+            tracemalloc.start()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"  {name:<16} {best * 1000:>10.2f} ms {peak / 1024**2:>10.2f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,20 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-from ._version import __version__
+import typing as T
+
+if T.TYPE_CHECKING:
+    from ._version import __version__
 
 __all__ = ["__version__"]
+
+
+def __getattr__(name: str) -> T.Any:
+    # XXX:
+    #  `importlib.metadata` import time is not negligible, version is resolved on first access
+    #  only, as it is not needed by barbican internal commands.
+    if name == "__version__":
+        from ._version import __version__
+
+        return __version__
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -13,11 +13,12 @@ from argparse import ArgumentParser, REMAINDER
 from pathlib import Path
 import subprocess
 
+from ..utils import write_if_changed
+
 
 def run_capture_stdout(cmdline: list[str], output: Path) -> None:
     proc_return = subprocess.run(cmdline, check=True, capture_output=True)
-    with output.open("w") as fout:
-        fout.write(proc_return.stdout.decode("utf-8"))
+    write_if_changed(output, proc_return.stdout.decode("utf-8"))
 
 
 def argument_parser() -> ArgumentParser:
@@ -11,6 +11,8 @@ Add target specific and per apps compile flags in a config.
 from argparse import ArgumentParser
 from pathlib import Path
 
+from ..utils import write_if_changed
+
 
 def run_cargo_config(rustargs: Path, target: Path, extra_args: str, outdir: Path) -> None:
     rust_target = target.read_text().splitlines()[0]
@@ -33,7 +35,7 @@ rustflags = {rust_flags}
 OUT_DIR = "{str(outdir.resolve())}"
 """
 
-    (outdir / ".cargo" / "config.toml").write_text(config)
+    write_if_changed(outdir / ".cargo" / "config.toml", config)
 
 
 def argument_parser() -> ArgumentParser:
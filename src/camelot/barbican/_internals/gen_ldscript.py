@@ -11,9 +11,10 @@ TODO : documentation
 from argparse import ArgumentParser
 from pathlib import Path
 
-from jinja2 import Environment, BaseLoader
 import json
 
+from ..utils import write_if_changed
+
 
 def run_gen_ldscript(name: str, template: Path, layout: Path, output: Path) -> None:
     """LD script generator internal command.
@@ -34,16 +35,17 @@ def run_gen_ldscript(name: str, template: Path, layout: Path, output: Path) -> N
     output: Path
         generated linker script for a given application
     """
+    from jinja2 import Environment, BaseLoader
+
     with open(layout, "r", encoding="utf-8") as layout_file:
         memory_layout = json.load(layout_file)
         with open(template, "r") as template_file:
             linkerscript_template = Environment(loader=BaseLoader()).from_string(
                 template_file.read()
             )
-            with open(output, "w", encoding="utf-8") as linkerscript:
-                linkerscript.write(
-                    linkerscript_template.render(name=name, layout=memory_layout["regions"])
-                )
+            write_if_changed(
+                output, linkerscript_template.render(name=name, layout=memory_layout["regions"])
+            )
 
 
 def argument_parser() -> ArgumentParser:
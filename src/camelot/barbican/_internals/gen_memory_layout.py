@@ -9,29 +9,33 @@ This internal command forge firmware memory layout for barbican applications.
 """
 
 from argparse import ArgumentParser
+import dataclasses
+from dataclasses import dataclass
+import itertools
 import os
 from pathlib import Path
 import typing as T
 
-from dts_utils import Dts
-
+from ..logger import logger
 from ..relocation.elfutils import SentryElf, AppElf
 from ..utils import memory_layout as memory
 from ..utils import align_to, pow2_round_up
 
 
-def _get_project_elves(exelist: list[Path]) -> tuple[SentryElf, list[AppElf]]:
+def _get_project_elves(
+    exelist: list[Path], cache_dir: Path | None
+) -> tuple[SentryElf, list[AppElf]]:
     sentry: SentryElf
     apps: list[AppElf] = []
 
     for elf in exelist:
         name = elf.stem
         if name == "sentry-kernel":
-            sentry = SentryElf(str(elf), None)
+            sentry = SentryElf(str(elf), None, readonly=True, cache_dir=cache_dir)
         elif name == "idle" or name == "autotest":
             continue
         else:
-            apps.append(AppElf(str(elf), None))
+            apps.append(AppElf(str(elf), None, readonly=True, cache_dir=cache_dir))
 
     return sentry, apps
 
@@ -88,6 +92,11 @@ def _add_idle_regions(layout: memory.Layout, sentry: SentryElf) -> tuple[int, in
     return idle_text_saddr + idle_text_size, idle_ram_saddr + idle_ram_size
 
 
+# PMSAv7 regions of 256 bytes or more are split into 8 subregions that can be disabled
+_PMSA_V7_SUBREGIONS: int = 8
+_PMSA_V7_SUBREGIONS_MIN_SIZE: int = 256
+
+
 def _arm_pmsa_v7_align_region(saddr: int, size: int) -> tuple[int, int]:
     """Return start address and size to be PMSAv7 MPU compliant.
 
@@ -111,6 +120,68 @@ def _arm_pmsa_v7_align_region(saddr: int, size: int) -> tuple[int, int]:
     return saddr, size
 
 
+def _arm_pmsa_v7_subregion_align_region(saddr: int, size: int) -> tuple[int, int]:
+    """Return start address and size to be PMSAv7 MPU compliant, using subregions.
+
+    A PMSAv7 region of 256 bytes or more is split into 8 subregions that can be disabled
+    individually. Thus, the effective region is a run of contiguous subregions, i.e. start
+    address and size are multiple of the subregion size, in a naturally aligned power of 2
+    window (see :py:func:`_arm_pmsa_v7_subregion_mask`).
+
+    Parameters
+    ----------
+    saddr: int
+        region start address
+    size: int
+        region size
+
+    Returns
+    -------
+    tuple[int, int]
+        Tuple containing fixed up start address and size for PMSAv7 MPU requirements
+    """
+    region_size = pow2_round_up(size)
+    if region_size < _PMSA_V7_SUBREGIONS_MIN_SIZE:
+        return align_to(saddr, region_size), region_size
+
+    subregion_size = region_size // _PMSA_V7_SUBREGIONS
+    size = align_to(size, subregion_size)
+    saddr = align_to(saddr, subregion_size)
+    # Enabled subregions must all be in the same MPU region
+    if saddr % region_size + size > region_size:
+        saddr = align_to(saddr, region_size)
+    return saddr, size
+
+
+def _arm_pmsa_v7_subregion_mask(saddr: int, size: int) -> int:
+    """Return PMSAv7 subregion disable mask of a region.
+
+    The MPU region is the smallest naturally aligned power of 2 window that contains the given
+    region (as fixed up by :py:func:`_arm_pmsa_v7_subregion_align_region`). Subregions outside of
+    the given region are disabled and can be used by other regions.
+
+    Parameters
+    ----------
+    saddr: int
+        region start address
+    size: int
+        region size
+
+    Returns
+    -------
+    int
+        Subregion disable mask (MPU_RASR.SRD), bit n set if subregion n is disabled
+    """
+    region_size = pow2_round_up(size)
+    if region_size < _PMSA_V7_SUBREGIONS_MIN_SIZE:
+        return 0
+
+    subregion_size = region_size // _PMSA_V7_SUBREGIONS
+    first = (saddr % region_size) // subregion_size
+    enabled = ((1 << (size // subregion_size)) - 1) << first
+    return ~enabled & ((1 << _PMSA_V7_SUBREGIONS) - 1)
+
+
 def _arm_pmsa_v8_align_region(saddr: int, size: int) -> tuple[int, int]:
     """Return start address and size to be PMSAv8 MPU compliant.
 
@@ -132,52 +203,493 @@ def _arm_pmsa_v8_align_region(saddr: int, size: int) -> tuple[int, int]:
     return align_to(saddr, 32), align_to(size, 32)
 
 
-def _add_app_regions(
-    layout: memory.Layout,
-    app: AppElf,
-    memory_slot: tuple[int, int],
-    code_limit: int,
-    ram_limit: int,
-    region_fixup: T.Callable,
-) -> tuple[int, int]:
-    task_text, task_ram = memory_slot
-
-    flash_saddr, flash_size = region_fixup(task_text, app.flash_size)
-    ram_saddr, ram_size = region_fixup(task_ram, app.ram_size)
-
-    # XXX: dedicated error
-    if flash_saddr + flash_size >= code_limit:
-        raise Exception("task code region overflow")
-
-    if ram_saddr + ram_size >= ram_limit:
-        raise Exception("ram code region overflow")
-
+def _app_name(app: AppElf) -> str:
     # trim extension
     name, _ = app.name.split(".", maxsplit=1)
+    return name
 
-    layout.append(
+
+def _app_regions(
+    name: str,
+    flash: tuple[int, int],
+    ram: tuple[int, int],
+    text_pool: str = "",
+    ram_pool: str = "",
+) -> list[memory.Region]:
+    return [
         memory.Region(
             name=name,
             type=memory.Region.Type.Text,  # type: ignore
             permission=memory.Region.Permission.Read | memory.Region.Permission.Exec,
-            start_address=flash_saddr,
-            size=flash_size,
-        )
-    )
-    layout.append(
+            start_address=flash[0],
+            size=flash[1],
+            pool=text_pool,
+        ),
         memory.Region(
             name=name,
             type=memory.Region.Type.Ram,  # type: ignore
             permission=memory.Region.Permission.Read | memory.Region.Permission.Write,
-            start_address=ram_saddr,
-            size=ram_size,
+            start_address=ram[0],
+            size=ram[1],
+            pool=ram_pool,
+        ),
+    ]
+
+
+def _keep_region(
+    region: memory.Region,
+    size: int,
+    pools: dict[str, tuple[int, int]],
+    candidates: list[str],
+    region_fixup: T.Callable,
+) -> bool:
+    """Return True if a previously placed region can be kept as is for the given size.
+
+    The region must still be MPU compliant, in one of its candidate memory pools, and large
+    enough.
+    """
+    if region.pool not in candidates:
+        return False
+    start, limit = pools[region.pool]
+    if region_fixup(region.start_address, region.size) != (region.start_address, region.size):
+        return False
+    if region.start_address < start or region.start_address + region.size >= limit:
+        return False
+    saddr, fixed_size = region_fixup(region.start_address, size)
+    return saddr == region.start_address and fixed_size <= region.size
+
+
+def _span(start: int, end: int) -> memory.Region:
+    """Return an address range as a region, only its bounds are meaningful."""
+    return memory.Region(
+        name="",
+        type=memory.Region.Type.Text,  # type: ignore
+        start_address=start,
+        size=end - start,
+    )
+
+
+def _first_fit(
+    size: int, pool: tuple[int, int], taken: memory.Layout, region_fixup: T.Callable
+) -> tuple[int, int] | None:
+    """Return the first free, MPU compliant, slot in pool, None if there is no room left.
+
+    Parameters
+    ----------
+    size: int
+        requested size
+    pool: tuple[int, int]
+        memory pool start address and limit
+    taken: memory.Layout
+        already placed regions in that pool
+    region_fixup: T.Callable
+        MPU region alignment fixup
+
+    Returns
+    -------
+    tuple[int, int] | None
+        Slot start address and size, None if the requested size does not fit
+    """
+    saddr = taken.find_fit(size, pool=_span(*pool), fixup=region_fixup)
+    if saddr is None:
+        return None
+    saddr, fixed_size = region_fixup(saddr, size)
+    # A region can't end at pool limit, the first fit is then in the last free range anyway
+    return (saddr, fixed_size) if saddr + fixed_size < pool[1] else None
+
+
+# Up to this number of regions, all placement orders are tried (i.e. 6! = 720 orders)
+_EXHAUSTIVE_PACKING_LIMIT: int = 6
+
+
+def _region_alignment(size: int, region_fixup: T.Callable) -> int:
+    """Return MPU region start address alignment for the given size.
+
+    As MPU fixup aligns start address up, the alignment is the fixed up start address of 1.
+    """
+    saddr, _ = region_fixup(1, size)
+    return saddr
+
+
+def _pack(
+    sizes: list[int],
+    pool: tuple[int, int],
+    occupied: list[tuple[int, int]],
+    region_fixup: T.Callable,
+) -> list[tuple[int, int]] | None:
+    """Pack regions in pool free space, minimizing alignment gaps.
+
+    Regions are placed, largest alignment first, in the first free slot. For a few regions,
+    every placement order is tried and the one with the lowest end address (i.e. the less gaps)
+    is kept. Ties are resolved in favor of the first order tried, thus the placement is
+    deterministic.
+
+    Parameters
+    ----------
+    sizes: list[int]
+        requested region sizes
+    pool: tuple[int, int]
+        memory pool start address and limit
+    occupied: list[tuple[int, int]]
+        start and end addresses of already placed regions in that pool
+    region_fixup: T.Callable
+        MPU region alignment fixup
+
+    Returns
+    -------
+    list[tuple[int, int]] | None
+        Start address and size of each region, in requested sizes order, None if regions do not
+        fit in pool
+    """
+    occupied_regions = [_span(start, end) for start, end in occupied]
+
+    def _place(order: T.Iterable[int]) -> list[tuple[int, int]] | None:
+        taken = memory.Layout(list(occupied_regions))
+        slots: list[tuple[int, int]] = [(0, 0)] * len(sizes)
+        for i in order:
+            slot = _first_fit(sizes[i], pool, taken, region_fixup)
+            if slot is None:
+                return None
+            taken.append(_span(slot[0], slot[0] + slot[1]))
+            slots[i] = slot
+        return slots
+
+    def _end(slots: list[tuple[int, int]]) -> int:
+        return max((saddr + size for saddr, size in slots), default=pool[0])
+
+    fixed_sizes = [region_fixup(0, size)[1] for size in sizes]
+    order = sorted(
+        range(len(sizes)),
+        key=lambda i: (-_region_alignment(sizes[i], region_fixup), -fixed_sizes[i], i),
+    )
+    best = _place(order)
+
+    if len(sizes) > _EXHAUSTIVE_PACKING_LIMIT:
+        return best
+
+    # No gap at all, can't do better
+    lower_bound = max(
+        [pool[0] + sum(fixed_sizes) + sum(end - start for start, end in occupied)]
+        + [end for _, end in occupied]
+    )
+    for permutation in itertools.permutations(order):
+        if best is not None and _end(best) <= lower_bound:
+            break
+        slots = _place(permutation)
+        if slots is not None and (best is None or _end(slots) < _end(best)):
+            best = slots
+
+    return best
+
+
+@dataclass(frozen=True, kw_only=True)
+class Affinity:
+    """Application memory pool affinity hints.
+
+    Attributes
+    ----------
+    text: str | None
+        preferred code pool, if any
+    ram: str | None
+        preferred ram pool, if any
+    spill: bool
+        allow placement in another pool if the preferred one is full
+    """
+
+    text: str | None = None
+    ram: str | None = None
+    spill: bool = True
+
+
+def _candidate_pools(
+    pools: dict[str, tuple[int, int]], preferred: str | None, spill: bool
+) -> list[str]:
+    """Return memory pools an application region may be placed in, by preference order.
+
+    Without preferred pool, all pools are candidates in DTS order, i.e. the first pool is filled
+    first and regions spill to the next ones.
+    """
+    if preferred is None:
+        return list(pools)
+    if preferred not in pools:
+        raise ValueError(f"no such memory pool {preferred}")
+    return [preferred] + ([name for name in pools if name != preferred] if spill else [])
+
+
+def _pack_pools(
+    requests: list[tuple[int, list[str]]],
+    pools: dict[str, tuple[int, int]],
+    occupied: dict[str, list[tuple[int, int]]],
+    region_fixup: T.Callable,
+) -> list[tuple[str, tuple[int, int]]] | None:
+    """Pack regions in several memory pools.
+
+    Each region is assigned, largest alignment first, to the first of its candidate pools with a
+    free slot large enough. Regions are then packed in their pool (see :py:func:`_pack`).
+
+    Parameters
+    ----------
+    requests: list[tuple[int, list[str]]]
+        requested region sizes and their candidate pools, by preference order
+    pools: dict[str, tuple[int, int]]
+        memory pools start address and limit, by name
+    occupied: dict[str, list[tuple[int, int]]]
+        start and end addresses of already placed regions, by pool name
+    region_fixup: T.Callable
+        MPU region alignment fixup
+
+    Returns
+    -------
+    list[tuple[str, tuple[int, int]]] | None
+        Pool name, start address and size of each region, in requests order, None if regions do
+        not fit in their candidate pools
+    """
+    taken = {
+        name: memory.Layout([_span(start, end) for start, end in occupied.get(name, [])])
+        for name in pools
+    }
+    assignment: list[str] = [""] * len(requests)
+    order = sorted(
+        range(len(requests)),
+        key=lambda i: (
+            -_region_alignment(requests[i][0], region_fixup),
+            -region_fixup(0, requests[i][0])[1],
+            i,
+        ),
+    )
+    for i in order:
+        size, candidates = requests[i]
+        for name in candidates:
+            slot = _first_fit(size, pools[name], taken[name], region_fixup)
+            if slot is not None:
+                taken[name].append(_span(slot[0], slot[0] + slot[1]))
+                assignment[i] = name
+                break
+        else:
+            return None
+
+    placement: list[tuple[str, tuple[int, int]]] = [("", (0, 0))] * len(requests)
+    for name, pool in pools.items():
+        indices = [i for i in range(len(requests)) if assignment[i] == name]
+        sizes = [requests[i][0] for i in indices]
+        # Regions fit in that pool in assignment order, packing can't do worse
+        slots = _pack(sizes, pool, occupied.get(name, []), region_fixup)
+        if slots is None:
+            return None
+        for i, slot in zip(indices, slots):
+            placement[i] = (name, slot)
+
+    return placement
+
+
+@dataclass(frozen=True, kw_only=True)
+class PoolUsage:
+    """Memory pool usage and fragmentation statistics.
+
+    Attributes
+    ----------
+    size: int
+        pool size
+    requested: int
+        total size requested by applications
+    allocated: int
+        total size of MPU compliant regions, i.e. requested size and alignment padding
+    largest_free: int
+        largest free contiguous block
+    """
+
+    size: int
+    requested: int
+    allocated: int
+    largest_free: int
+
+    @property
+    def padding(self) -> int:
+        """Size lost in region size alignment."""
+        return self.allocated - self.requested
+
+    @property
+    def free(self) -> int:
+        return self.size - self.allocated
+
+    @property
+    def fragmentation(self) -> float:
+        """External fragmentation ratio, 0 if free memory is one contiguous block."""
+        return 1 - self.largest_free / self.free if self.free else 0.0
+
+
+def _pool_usage(pool: tuple[int, int], regions: list[memory.Region], requested: int) -> PoolUsage:
+    start, limit = pool
+    free = memory.Layout(regions).free_ranges(_span(start, limit))
+    largest_free = max((end - saddr for saddr, end in free), default=0)
+
+    return PoolUsage(
+        size=limit - start,
+        requested=requested,
+        allocated=sum(r.size for r in regions),
+        largest_free=largest_free,
+    )
+
+
+def _log_pool_usage(name: str, usage: PoolUsage) -> None:
+    logger.info(
+        f"{name}: {usage.allocated:#x}/{usage.size:#x} bytes allocated, "
+        f"{usage.padding:#x} alignment padding, {usage.free:#x} free "
+        f"(largest block {usage.largest_free:#x}, fragmentation {usage.fragmentation:.0%})"
+    )
+
+
+def _incremental_app_regions(
+    previous: memory.Layout,
+    apps: list[AppElf],
+    code_pools: dict[str, tuple[int, int]],
+    ram_pools: dict[str, tuple[int, int]],
+    region_fixup: T.Callable,
+    affinity: dict[str, Affinity] | None = None,
+) -> list[memory.Region] | None:
+    """Place applications, keeping previous placement whenever possible.
+
+    Applications whose size still fit in their previously allocated regions are left in place,
+    unless those are no longer in their preferred pool, others (resized, moved or new
+    applications) are packed in free memory (see :py:func:`_pack_pools`).
+    With an empty previous layout, all applications are packed.
+
+    Parameters
+    ----------
+    previous: memory.Layout
+        previous memory layout
+    apps: list[AppElf]
+        applications to place
+    code_pools: dict[str, tuple[int, int]]
+        applications code pools start address and limit, by name, in DTS order
+    ram_pools: dict[str, tuple[int, int]]
+        applications ram pools start address and limit, by name, in DTS order
+    region_fixup: T.Callable
+        MPU region alignment fixup
+    affinity: dict[str, Affinity] | None
+        applications memory pool affinity, by application name, if any
+
+    Returns
+    -------
+    list[memory.Region] | None
+        Applications regions, in applications order, None if applications do not fit anymore
+    """
+    affinity = affinity or {}
+    candidates: dict[str, tuple[list[str], list[str]]] = {}
+    for app in apps:
+        hint = affinity.get(_app_name(app), Affinity())
+        candidates[_app_name(app)] = (
+            _candidate_pools(code_pools, hint.text, hint.spill),
+            _candidate_pools(ram_pools, hint.ram, hint.spill),
         )
+
+    kept: dict[str, tuple[memory.Region, memory.Region]] = {}
+    for app in apps:
+        name = _app_name(app)
+        try:
+            text = previous.get_region(name, memory.Region.Type.Text)  # type: ignore
+            ram = previous.get_region(name, memory.Region.Type.Ram)  # type: ignore
+        except ValueError:
+            continue
+        # A region w/ a preferred pool is kept in that pool only, thus affinity changes apply
+        hint = affinity.get(name, Affinity())
+        code_candidates, ram_candidates = candidates[name]
+        code_candidates = code_candidates[:1] if hint.text else code_candidates
+        ram_candidates = ram_candidates[:1] if hint.ram else ram_candidates
+        if _keep_region(
+            text, app.flash_size, code_pools, code_candidates, region_fixup
+        ) and _keep_region(ram, app.ram_size, ram_pools, ram_candidates, region_fixup):
+            kept[name] = (text, ram)
+
+    occupied_code: dict[str, list[tuple[int, int]]] = {}
+    occupied_ram: dict[str, list[tuple[int, int]]] = {}
+    for text, ram in kept.values():
+        occupied_code.setdefault(text.pool, []).append(
+            (text.start_address, text.start_address + text.size)
+        )
+        occupied_ram.setdefault(ram.pool, []).append(
+            (ram.start_address, ram.start_address + ram.size)
+        )
+
+    placed = [app for app in apps if _app_name(app) not in kept]
+    for app in placed:
+        logger.info(f"{_app_name(app)}: placing application")
+    flash_slots = _pack_pools(
+        [(app.flash_size, candidates[_app_name(app)][0]) for app in placed],
+        code_pools,
+        occupied_code,
+        region_fixup,
+    )
+    ram_slots = _pack_pools(
+        [(app.ram_size, candidates[_app_name(app)][1]) for app in placed],
+        ram_pools,
+        occupied_ram,
+        region_fixup,
     )
+    if flash_slots is None or ram_slots is None:
+        return None
+
+    new_regions: dict[str, list[memory.Region]] = {}
+    for app, (text_pool, flash_slot), (ram_pool, ram_slot) in zip(placed, flash_slots, ram_slots):
+        name = _app_name(app)
+        code_candidates, ram_candidates = candidates[name]
+        if text_pool != code_candidates[0]:
+            logger.info(f"{name}: text spilled to {text_pool}")
+        if ram_pool != ram_candidates[0]:
+            logger.info(f"{name}: ram spilled to {ram_pool}")
+        new_regions[name] = _app_regions(name, flash_slot, ram_slot, text_pool, ram_pool)
+
+    regions: list[memory.Region] = []
+    for app in apps:
+        name = _app_name(app)
+        regions.extend(kept[name] if name in kept else new_regions[name])
+
+    return regions
+
 
-    return flash_saddr + flash_size, ram_saddr + ram_size
+def _get_pools(reserved_memory: T.Any, label: str) -> dict[str, tuple[int, int]]:
+    """Return applications memory pools declared in DTS reserved memory node.
 
+    The first pool is labeled after the given label, additional pools (e.g. in another flash
+    bank or SRAM block) are labeled `<label>_1`, `<label>_2`, and so on.
+
+    Parameters
+    ----------
+    reserved_memory: T.Any
+        DTS reserved memory node
+    label: str
+        first pool label
 
-def run_gen_memory_layout(output: Path, dts_filename: Path, exelist: list[Path]) -> None:
+    Returns
+    -------
+    dict[str, tuple[int, int]]
+        Pools start address and limit, by label, in DTS order, empty if none
+    """
+    pools: dict[str, tuple[int, int]] = {}
+    for index in itertools.count():
+        name = label if index == 0 else f"{label}_{index}"
+        node = getattr(reserved_memory, name, None)
+        if not node:
+            break
+        pools[name] = (node.reg[0], node.reg[0] + node.reg[1])
+    return pools
+
+
+def _load_previous_layout(output: Path) -> memory.Layout | None:
+    try:
+        return memory.Layout.load(output)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def run_gen_memory_layout(
+    output: Path,
+    dts_filename: Path,
+    exelist: list[Path],
+    cache_dir: Path | None = None,
+    affinity: dict[str, Affinity] | None = None,
+    mpu_subregions: bool = False,
+) -> None:
     """Memory layout internal command.
 
     This command does the barbican application memory placement in the dedicated memory pool.
@@ -186,6 +698,20 @@ def run_gen_memory_layout(output: Path, dts_filename: Path, exelist: list[Path])
     All applications must fit in target device RAM and Flash.
     This command outputs a memory layout json file.
 
+    Applications regions are packed in memory pools, largest alignment first, in order to
+    minimize MPU alignment gaps, regardless of applications order in project configuration.
+    On PMSAv7 MPU, if MPU subregions are enabled, applications regions are not rounded up to a
+    power of 2 but to the MPU subregion size, and the subregion disable mask is recorded in the
+    memory layout. This is opt-in as the mask must then be used when programming the MPU.
+    Several code and ram pools may be declared in DTS reserved memory (see :py:func:`_get_pools`),
+    an application is placed in its preferred pool, if any, and spills to the other pools, in
+    DTS order, if there is no room left. Pools usage and fragmentation statistics are reported.
+
+    If a previous memory layout exists, applications are left in place as long as they still
+    fit in their previously allocated regions, only resized, or new, applications are placed in
+    free memory. If those do not fit, all applications are placed again. The output file is not
+    written if the memory layout is unchanged.
+
     Parameters
     ----------
     output: Path
@@ -194,11 +720,17 @@ def run_gen_memory_layout(output: Path, dts_filename: Path, exelist: list[Path])
         dts file to use
     exelist: list[Path]
         list of executable path to consider
+    cache_dir: Path | None
+        ELF summary cache directory, if any
+    affinity: dict[str, Affinity] | None
+        applications memory pool affinity, by application name, if any
+    mpu_subregions: bool
+        use PMSAv7 MPU subregions for applications regions
 
     Raises
     ------
     Exception
-        Reserved memory for tasks code and/or ram is missing
+        Reserved memory for tasks code and/or ram is missing, or applications do not fit
 
     Notes
     -----
@@ -212,39 +744,100 @@ def run_gen_memory_layout(output: Path, dts_filename: Path, exelist: list[Path])
       - :py:mod:`.plot_memory_layout`
       - :py:mod:`.gen_ldscript` (in case of noPIC w/ partially linked application)
     """
+    from dts_utils import Dts
+
     dts = Dts(dts_filename.resolve(strict=True))
-    sentry, apps = _get_project_elves(exelist)
+    sentry, apps = _get_project_elves(exelist, cache_dir)
 
     # default to armv7 pmsav7 alignment
     _mpu_memory_region_fixup = _arm_pmsa_v7_align_region
+    _mpu_subregions = mpu_subregions
+    if _mpu_subregions:
+        _mpu_memory_region_fixup = _arm_pmsa_v7_subregion_align_region
     if dts.mpu and dts.mpu.compatible == "arm,armv8m-mpu":
         _mpu_memory_region_fixup = _arm_pmsa_v8_align_region
+        _mpu_subregions = False
 
     layout = memory.Layout()
     _add_kernel_regions(layout, sentry)
     _add_idle_regions(layout, sentry)
 
-    # TODO:
-    #  Handle multiple bank
     reserved_memory = getattr(dts, "reserved-memory")
     if not reserved_memory:
         raise Exception("missing reserved memory node in dts file")
 
-    tasks_code = reserved_memory.tasks_code
-    tasks_ram = reserved_memory.tasks_ram
+    code_pools = _get_pools(reserved_memory, "tasks_code")
+    ram_pools = _get_pools(reserved_memory, "tasks_ram")
 
-    if not tasks_code or not tasks_ram:
+    if not code_pools or not ram_pools:
         raise Exception("missing applications reserved memory node in dts file")
 
-    next_memory_slot = (tasks_code.reg[0], tasks_ram.reg[0])
-    code_limit = tasks_code.reg[0] + tasks_code.reg[1]
-    ram_limit = tasks_ram.reg[0] + tasks_ram.reg[1]
+    for pools, type in ((code_pools, memory.Region.Type.Text), (ram_pools, memory.Region.Type.Ram)):
+        for name, (start, limit) in pools.items():
+            layout.pools.append(
+                memory.Region(
+                    name=name,
+                    type=type,  # type: ignore
+                    start_address=start,
+                    size=limit - start,
+                )
+            )
+
+    # Keep previous applications placement, if any, so that unchanged applications are not
+    # moved (and thus not linked again)
+    previous = _load_previous_layout(output)
+    app_regions = None
+    if previous is not None:
+        app_regions = _incremental_app_regions(
+            previous, apps, code_pools, ram_pools, _mpu_memory_region_fixup, affinity
+        )
 
-    for app in apps:
-        next_memory_slot = _add_app_regions(
-            layout, app, next_memory_slot, code_limit, ram_limit, _mpu_memory_region_fixup
+    if app_regions is None:
+        app_regions = _incremental_app_regions(
+            memory.Layout(), apps, code_pools, ram_pools, _mpu_memory_region_fixup, affinity
         )
 
+    # XXX: dedicated error
+    if app_regions is None:
+        raise Exception("task code and/or ram region overflow")
+
+    if _mpu_subregions:
+        app_regions = [
+            dataclasses.replace(
+                r, subregion_mask=_arm_pmsa_v7_subregion_mask(r.start_address, r.size)
+            )
+            for r in app_regions
+        ]
+
+    layout.regions.extend(app_regions)
+
+    # XXX: dedicated error
+    for region, other in layout.overlaps():
+        if region in app_regions or other in app_regions:
+            raise Exception(
+                f"{region.name} {region.type} region overlaps {other.name} {other.type}"
+            )
+
+    requested = {
+        memory.Region.Type.Text: {_app_name(app): app.flash_size for app in apps},
+        memory.Region.Type.Ram: {_app_name(app): app.ram_size for app in apps},
+    }
+    for pool in layout.pools:
+        regions = [r for r in app_regions if r.pool == pool.name and r.type == pool.type]
+        _log_pool_usage(
+            pool.name,
+            _pool_usage(
+                (pool.start_address, pool.start_address + pool.size),
+                regions,
+                sum(requested[pool.type][r.name] for r in regions),
+            ),
+        )
+
+    # Do not touch output if unchanged, dependent build steps are skipped (ninja `restat`)
+    if layout == previous:
+        logger.info("memory layout unchanged")
+        return
+
     layout.save(output)
 
 
@@ -270,6 +863,19 @@ def run_gen_dummy_memory_layout(output: Path) -> None:
     layout.save(output)
 
 
+def _affinity(hints: list[list[str]], no_spill: list[str]) -> dict[str, Affinity]:
+    preferred: dict[str, dict[str, str]] = {name: {} for name in no_spill}
+    for name, type, pool in hints:
+        if type not in ("text", "ram"):
+            raise ValueError(f"{name}: invalid region type {type}")
+        preferred.setdefault(name, {})[type] = pool
+
+    return {
+        name: Affinity(**pools, spill=name not in no_spill)  # type: ignore
+        for name, pools in preferred.items()
+    }
+
+
 def argument_parser() -> ArgumentParser:
     parser = ArgumentParser()
     parser.add_argument("output", type=Path, help="output filename")
@@ -294,6 +900,33 @@ def argument_parser() -> ArgumentParser:
         required=False,
         help="dts file to use for memory placement",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        action="store",
+        required=False,
+        help="ELF summary cache directory",
+    )
+    parser.add_argument(
+        "--affinity",
+        nargs=3,
+        action="append",
+        metavar=("APP", "TYPE", "POOL"),
+        default=[],
+        help="preferred memory pool of the given application region type (text or ram)",
+    )
+    parser.add_argument(
+        "--no-spill",
+        action="append",
+        metavar="APP",
+        default=[],
+        help="do not place the given application outside of its preferred pools",
+    )
+    parser.add_argument(
+        "--mpu-subregions",
+        action="store_true",
+        help="use PMSAv7 MPU subregions to reduce applications regions alignment padding",
+    )
     parser.add_argument(
         "-l",
         "--list",
@@ -315,7 +948,14 @@ def run(argv: list[str]) -> None:
     if args.dummy:
         run_gen_dummy_memory_layout(args.output)
     elif args.exelist:
-        run_gen_memory_layout(args.output, args.dts, args.exelist)
+        run_gen_memory_layout(
+            args.output,
+            args.dts,
+            args.exelist,
+            args.cache_dir,
+            _affinity(args.affinity, args.no_spill),
+            args.mpu_subregions,
+        )
     else:
         # XXX: handle invalid command
         raise ValueError
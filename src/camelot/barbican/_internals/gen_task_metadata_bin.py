@@ -31,7 +31,7 @@ def _gen_metadata(output: Path, metadata: dict[str, T.Any], path: ProjectPath) -
 
 def run_gen_task_metadata_bin(input: Path, output: Path, path: ProjectPath) -> None:
     # Package metadata supports only string, convert package meta to task meta and generates blob
-    elf = AppElf(str(input.resolve()), None)
+    elf = AppElf(str(input.resolve()), None, readonly=True, cache_dir=path.elfinfo_cache_dir)
     task_metadata = elf.get_package_metadata("task")
 
     task_metadata["version"] = 1
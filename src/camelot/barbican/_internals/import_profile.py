@@ -0,0 +1,127 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Internal command import profiler.
+
+Report per module import cost of a given internal command, i.e. what is paid by each build step
+on interpreter start up before doing the actual job.
+
+.. code-block:: console
+
+    barbican --internal --import-profile <cmd>
+
+The internal command is imported in a fresh interpreter with Python's `-X importtime` option.
+
+.. note::
+    Internal commands must defer heavy dependencies import (see :py:data:`HEAVY_PACKAGES`) to
+    the function(s) that actually need them.
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+import subprocess
+import sys
+
+
+HEAVY_PACKAGES: tuple[str, ...] = ("dts_utils", "git", "jinja2", "lief", "requests", "rich")
+"""Heavy third party packages, must not be imported at internal command module level."""
+
+
+@dataclass(frozen=True, kw_only=True)
+class ImportTime:
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".", maxsplit=1)[0]
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """Parse Python's `-X importtime` output.
+
+    Parameters
+    ----------
+    output: str
+        interpreter stderr with `-X importtime` enabled
+
+    Returns
+    -------
+    list[ImportTime]
+        Imported module list, in import completion order
+    """
+    imports: list[ImportTime] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # skip header line
+            continue
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        imports.append(
+            ImportTime(
+                name=stripped,
+                depth=(len(name) - len(stripped)) // 2,
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+            )
+        )
+    return imports
+
+
+def profile_internal_command(cmd: str) -> list[ImportTime]:
+    """Import the given internal command in a fresh interpreter and return imports time."""
+    module = f"{__package__}.{cmd}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import camelot.barbican.barbican, {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise ValueError(f"{cmd}: invalid internal command\n{proc.stderr}")
+    return parse_importtime(proc.stderr)
+
+
+def run_import_profile(cmd: str, top: int) -> None:
+    imports = profile_internal_command(cmd)
+    total = sum(i.self_us for i in imports)
+
+    per_package: dict[str, tuple[int, int]] = {}
+    for i in imports:
+        self_us, count = per_package.get(i.package, (0, 0))
+        per_package[i.package] = (self_us + i.self_us, count + 1)
+
+    print(f"{cmd}: {len(imports)} modules imported in {total / 1000:.1f} ms")
+    print()
+    print(f"{'package':<32} {'modules':>8} {'self [ms]':>10} {'share':>7}")
+    packages = sorted(per_package.items(), key=lambda x: x[1][0], reverse=True)
+    for name, (self_us, count) in packages[:top]:
+        marker = " (heavy)" if name in HEAVY_PACKAGES else ""
+        print(f"{name:<32} {count:>8} {self_us / 1000:>10.1f} {self_us / total:>7.1%}{marker}")
+
+    print()
+    print(f"{'module':<48} {'self [ms]':>10} {'cumulative [ms]':>16}")
+    modules = sorted(imports, key=lambda x: x.self_us, reverse=True)
+    for i in modules[:top]:
+        print(f"{i.name:<48} {i.self_us / 1000:>10.1f} {i.cumulative_us / 1000:>16.1f}")
+
+
+def argument_parser() -> ArgumentParser:
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--top", type=int, default=20, help="number of packages and modules to report"
+    )
+    parser.add_argument("cmd", type=str, help="internal command to profile")
+
+    return parser
+
+
+def run(argv: list[str]) -> None:
+    """Execute import profile internal command."""
+    args = argument_parser().parse_args(argv)
+    run_import_profile(args.cmd, args.top)
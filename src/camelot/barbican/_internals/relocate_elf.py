@@ -0,0 +1,62 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Relocate ELF internal command.
+
+This internal command moves an already linked application to its final place in firmware memory
+layout, without any further linker invocation. This is used in `relocate` integration mode,
+the application is linked once with the dummy linker script, then relocated in place.
+
+.. warning:: Only position independent applications can be relocated that way
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+from ..relocation.elfutils import AppElf
+from ..utils import memory_layout as memory
+
+
+def run_relocate_elf(name: str, input: Path, output: Path, layout: Path) -> None:
+    """Relocate ELF internal command.
+
+    Sections, symbols and GOT of the given application are relocated at the start address of
+    the application regions in the memory layout generated by :py:mod:`.gen_memory_layout`.
+
+    Parameters
+    ----------
+    name: str
+        application name in memory layout
+    input: Path
+        linked (with the dummy linker script) application elf
+    output: Path
+        relocated application elf
+    layout: Path
+        barbican memory layout in json
+    """
+    firmware_layout = memory.Layout.load(layout)
+    text = firmware_layout.get_region(name, memory.Region.Type.Text)
+    ram = firmware_layout.get_region(name, memory.Region.Type.Ram)
+
+    elf = AppElf(str(input.resolve(strict=True)), str(output.resolve()))
+    elf.relocate(text.start_address, ram.start_address)
+    elf.save()
+
+
+def argument_parser() -> ArgumentParser:
+    parser = ArgumentParser()
+    parser.add_argument("--name", type=str, required=True, help="application name")
+    parser.add_argument(
+        "-l", "--layout", type=Path, required=True, help="memory layout (in json format)"
+    )
+    parser.add_argument("output", type=Path, help="relocated output elf file")
+    parser.add_argument("input", type=Path, help="linked input elf")
+
+    return parser
+
+
+def run(argv: list[str]) -> None:
+    """Execute relocate_elf internal command."""
+    args = argument_parser().parse_args(argv)
+    run_relocate_elf(args.name, args.input, args.output, args.layout)
@@ -0,0 +1,383 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Internal command server.
+
+Each build step in the integration graph runs through the ninja `internal` rule, i.e. a fresh
+Python interpreter that imports barbican and its (heavy) dependencies for a few milliseconds of
+actual work. The internal command server keeps those modules warm in a long running process and
+executes each command in a forked child.
+
+The server is opt-in, one need to set the `BARBICAN_INTERNAL_SERVER` environment variable to
+a non empty value (other than `0`) in order to forward internal commands to the server.
+The server is started on demand, on first forward request, and exits after an idle timeout.
+While the server is not available, internal commands are executed in process.
+
+Client command line (argv[0], argv), working directory, environment, log level and standard
+streams are forwarded to the server through an unix socket. The forked child runs the internal
+command with client standard streams, thus output and errors are printed as if the command had run
+in process.
+
+The socket lives in a per user directory that must be private (i.e. owned by the current user,
+not accessible by others, and not a symlink), otherwise the server is not used, as the client
+environment (and thus any credential in there) is sent to whoever listens to that socket.
+
+.. note::
+    This module is imported on every forwarded internal command invocation, only lightweight
+    standard library modules are imported at module level.
+"""
+
+from argparse import ArgumentParser
+import errno
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import time
+
+
+ENV_ENABLE: str = "BARBICAN_INTERNAL_SERVER"
+"""Environment variable to set to enable internal command forwarding to server."""
+
+DEFAULT_IDLE_TIMEOUT: int = 300
+"""Server idle timeout, in seconds, before exiting."""
+
+_HEADER = struct.Struct("!I")
+_STATUS = struct.Struct("!i")
+_STDIO_FDS: list[int] = [0, 1, 2]
+
+
+def is_enabled() -> bool:
+    """Return True if internal commands must be forwarded to server."""
+    if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+        return False
+    return os.environ.get(ENV_ENABLE, "0") not in ("", "0")
+
+
+def default_socket_path() -> Path:
+    """Return the server socket path for the running Python interpreter and barbican install.
+
+    A server is dedicated to a given user, interpreter and barbican installation, one can't
+    forward command to a server running another barbican version. Installation is identified
+    by its path and modification time, barbican (re)installation spawns a new server.
+
+    Returns
+    -------
+    Path
+        unix socket path
+    """
+    package_init = Path(__file__).parent.parent / "__init__.py"
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    key = "\0".join([sys.executable, str(package_init), str(package_init.stat().st_mtime_ns)])
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return Path(runtime_dir) / f"barbican-{os.getuid()}" / f"{digest}.sock"
+
+
+def _private_dir(path: Path, create: bool) -> bool:
+    """Return True if the given directory is private, i.e. owned by and only accessible by us.
+
+    Parameters
+    ----------
+    path: Path
+        socket directory
+    create: bool
+        create the directory if missing
+
+    Returns
+    -------
+    bool
+        True if the directory exists, is not a symlink, is owned by the current user and is not
+        accessible by group and others.
+    """
+    try:
+        if create:
+            path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and stat.S_IMODE(st.st_mode) & 0o077 == 0
+    )
+
+
+def _send_message(sock: socket.socket, data: dict, fds: list[int] | None = None) -> None:
+    payload = json.dumps(data).encode("utf-8")
+    if fds:
+        socket.send_fds(sock, [_HEADER.pack(len(payload))], fds)
+    else:
+        sock.sendall(_HEADER.pack(len(payload)))
+    sock.sendall(payload)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed by peer")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _spawn_server(path: Path) -> None:
+    """Start a detached server process, do not wait for it to be ready."""
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, "-m", __name__, "--socket", str(path)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd="/",
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def forward(cmd: str, argv: list[str], path: Path | None = None, spawn: bool = True) -> int | None:
+    """Forward an internal command to the server.
+
+    Parameters
+    ----------
+    cmd: str
+        internal command name
+    argv: list[str]
+        internal command arguments
+    path: Path | None
+        server socket path, default to :py:func:`default_socket_path` if None
+    spawn: bool
+        start a new server if none is listening on the socket path
+
+    Returns
+    -------
+    int | None
+        Internal command exit code, None if the server is not available (or its socket directory
+        is not private), in that case, the caller must run the command in process.
+    """
+    path = path or default_socket_path()
+    if not _private_dir(path.parent, create=spawn):
+        if path.parent.exists():
+            print(
+                f"barbican internal server: {path.parent} is not a private directory, ignored",
+                file=sys.stderr,
+            )
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(str(path))
+        except OSError as e:
+            if spawn and e.errno in (errno.ENOENT, errno.ECONNREFUSED):
+                _spawn_server(path)
+            return None
+
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+
+        request = {
+            "cmd": cmd,
+            "argv": argv,
+            "argv0": sys.argv[0],
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+            "log_level": logging.getLogger().level,
+        }
+        try:
+            _send_message(sock, request, _STDIO_FDS)
+        except OSError:
+            # Server may have reached its idle timeout and closed listening socket meanwhile
+            return None
+
+        # From here, the command is dispatched, a broken connection is a command failure
+        try:
+            (returncode,) = _STATUS.unpack(_recv_exactly(sock, _STATUS.size))
+        except ConnectionError:
+            print(f"barbican internal server: lost connection while running {cmd}", file=sys.stderr)
+            returncode = 1
+        return returncode
+    finally:
+        sock.close()
+
+
+def _run_request(request: dict, fds: list[int]) -> int:
+    """Execute the internal command in the forked child."""
+    import importlib
+    import traceback
+
+    from ..logger import logger, log_config
+
+    for fd, target in zip(fds, _STDIO_FDS):
+        os.dup2(fd, target)
+        os.close(fd)
+
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    sys.argv = [request["argv0"], "--internal", request["cmd"], *request["argv"]]
+    log_config.set_console_log_level(request["log_level"])
+
+    returncode = 0
+    try:
+        module = importlib.import_module(f"{__package__}.{request['cmd']}")
+        module.run(request["argv"])
+    except SystemExit as e:
+        returncode = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        logger.critical(str(e))
+        traceback.print_exc()
+        returncode = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+
+    return returncode
+
+
+def _handle_connection(conn: socket.socket) -> None:
+    """Receive a request and fork a child to handle it."""
+    conn.settimeout(5)
+    fds: list[int] = []
+    try:
+        header, fds, _, _ = socket.recv_fds(conn, _HEADER.size, len(_STDIO_FDS))
+        if len(header) != _HEADER.size or len(fds) != len(_STDIO_FDS):
+            raise ConnectionError("malformed request")
+        (size,) = _HEADER.unpack(header)
+        request = json.loads(_recv_exactly(conn, size))
+        conn.settimeout(None)
+    except (ConnectionError, OSError, ValueError):
+        for fd in fds:
+            os.close(fd)
+        return
+
+    pid = os.fork()
+    if pid == 0:
+        returncode = 1
+        try:
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            returncode = _run_request(request, fds)
+        finally:
+            try:
+                conn.sendall(_STATUS.pack(returncode))
+            finally:
+                os._exit(0)
+
+    for fd in fds:
+        os.close(fd)
+
+
+def _warmup() -> None:
+    """Import every internal command module (and their dependencies)."""
+    import importlib
+    import pkgutil
+
+    from .. import _internals
+
+    for module in pkgutil.iter_modules(_internals.__path__):
+        if module.name != "server":
+            importlib.import_module(f"{_internals.__name__}.{module.name}")
+
+
+def run_server(path: Path, idle_timeout: int = DEFAULT_IDLE_TIMEOUT) -> None:
+    """Run the internal command server.
+
+    Only one server can listen to a given socket path, a lock file is held while the server is
+    running. If another server already holds the lock, or if the socket directory is not private,
+    this function returns immediately.
+
+    Parameters
+    ----------
+    path: Path
+        unix socket path to listen to
+    idle_timeout: int
+        time, in seconds, without any request before exiting
+    """
+    import fcntl
+    import selectors
+
+    if not _private_dir(path.parent, create=True):
+        return
+
+    lock = path.with_suffix(".lock").open("w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return
+
+    _warmup()
+
+    # Reap children on termination, those are never waited for explicitly
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    path.unlink(missing_ok=True)
+    inode: int | None = None
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(str(path))
+        server.listen(64)
+        inode = path.stat().st_ino
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(server, selectors.EVENT_READ)
+            last_request = time.monotonic()
+            while time.monotonic() - last_request < idle_timeout:
+                if not selector.select(timeout=1.0):
+                    # Exit if socket file has been removed or replaced
+                    try:
+                        if path.stat().st_ino != inode:
+                            break
+                    except FileNotFoundError:
+                        break
+                    continue
+
+                conn, _ = server.accept()
+                with conn:
+                    _handle_connection(conn)
+                last_request = time.monotonic()
+    finally:
+        server.close()
+        try:
+            if path.stat().st_ino == inode:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+        lock.close()
+
+
+def argument_parser() -> ArgumentParser:
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="unix socket path (default to a per user, per barbican installation path)",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=int,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="exit after the given number of seconds without request",
+    )
+
+    return parser
+
+
+def run(argv: list[str]) -> None:
+    """Execute internal command server."""
+    args = argument_parser().parse_args(argv)
+    run_server(args.socket or default_socket_path(), args.idle_timeout)
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
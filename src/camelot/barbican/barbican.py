@@ -14,7 +14,7 @@ from .logger import logger, log_config
 
 class CommandLineArguments:
     def __init__(self) -> None:
-        from . import cmd_download, cmd_setup, cmd_update, cmd_dumpspecs
+        from . import cmd_build, cmd_download, cmd_setup, cmd_update, cmd_dumpspecs
 
         self.parser = ArgumentParser(prog="barbican", add_help=True)
         self.subparsers = self.parser.add_subparsers(
@@ -35,6 +35,7 @@ class CommandLineArguments:
             "update", cmd_update.add_arguments, cmd_update.run, "update project packages sources"
         )
         self.add_command("setup", cmd_setup.add_arguments, cmd_setup.run, "setup project")
+        self.add_command("build", cmd_build.add_arguments, cmd_build.run, "build project")
         self.add_command(
             "dumpspecs", cmd_dumpspecs.add_arguments, cmd_dumpspecs.run, "dump project specs"
         )
@@ -95,9 +96,24 @@ def run_internal_command(cmd: str, argv: list[str]) -> None:
 
     Each internal commands are in the `_internal` subdir and each module is named with the
     command name. Each internal must accept an argument of type List[str].
+
+    If enabled, the command is forwarded to the internal command server
+    (see :py:mod:`._internals.server`) and executed in process if the server is not available.
     """
     import importlib
 
+    # XXX:
+    #  Do not import server module (and thus socket) if not explicitly enabled
+    if cmd != "server" and os.environ.get("BARBICAN_INTERNAL_SERVER"):
+        from ._internals import server
+
+        if server.is_enabled():
+            returncode = server.forward(cmd, argv)
+            if returncode is not None:
+                if returncode != 0:
+                    raise SystemExit(returncode)
+                return
+
     module = importlib.import_module("camelot.barbican._internals." + cmd)
     module.run(argv)
 
@@ -114,12 +130,17 @@ def main() -> None:
      `barbican <cmd> [option(s)]`
     internal command usage:
      `barbican --internal <internal_cmd> [option(s)]`
+    internal command import time profile:
+     `barbican --internal --import-profile <internal_cmd>`
     """
     try:
         if len(sys.argv) >= 2 and sys.argv[1] == "--internal":
             if len(sys.argv) == 2:
                 raise ValueError("missing internal command")
-            run_internal_command(sys.argv[2], sys.argv[3:])
+            if sys.argv[2] == "--import-profile":
+                run_internal_command("import_profile", sys.argv[3:])
+            else:
+                run_internal_command(sys.argv[2], sys.argv[3:])
         else:
             run()
 
@@ -4,13 +4,17 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterator, Sequence
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass, field, asdict
 from enum import StrEnum, auto
+from functools import partial
 from pathlib import Path, PurePath
-from typing import Protocol
+from typing import IO, Protocol
 import textwrap
 
+from ..logger import logger
+from ..utils import open_if_changed, write_if_changed
+
 
 @dataclass(frozen=True, kw_only=True, slots=True)
 class NinjaVariable:
@@ -38,6 +42,12 @@ class NinjaRule:
     msvc_deps_prefix: str | None = None
 
 
+@dataclass(frozen=True, kw_only=True, slots=True)
+class NinjaPool:
+    name: str
+    depth: int
+
+
 @dataclass(frozen=True, kw_only=True, slots=True)
 class NinjaBuild:
     outputs: Sequence[str | PurePath] = field(default_factory=list)
@@ -89,6 +99,9 @@ class NinjaWriter:
     ----------
     width : int, optional
         Maximum line width before wrapping (default is 100).
+    output : IO[str] | None
+        If given, lines are streamed to this (buffered) text file handle as they are
+        generated instead of being held in memory for :py:meth:`render`.
 
     Notes
     -----
@@ -112,9 +125,16 @@ class NinjaWriter:
 
     _ESCAPE_NEW_LINE = " $"
 
-    def __init__(self, width: int = 100) -> None:
+    def __init__(self, width: int = 100, output: IO[str] | None = None) -> None:
         self.lines: list[str] = []
         self.width = width
+        self._output = output
+
+    def _emit(self, line: str) -> None:
+        if self._output is not None:
+            self._output.write(line + "\n")
+        else:
+            self.lines.append(line)
 
     @staticmethod
     def _escape(value: str | PurePath) -> str:
@@ -135,8 +155,12 @@ class NinjaWriter:
         """
         Wrap a line if it exceeds the configured width.
 
-        The line is wrapped on the first space that is not escaped in order to keep the generated
-        file human readable.
+        The line is wrapped on the last space that is not escaped before line width (or the first
+        one after if none) in order to keep the generated file human readable.
+
+        Wrapping positions are searched in the original line, within the remaining text bounds,
+        thus the remaining text is neither rescanned nor copied on each wrap, i.e. wrapping is
+        linear in line length.
 
         Parameters
         ----------
@@ -149,8 +173,8 @@ class NinjaWriter:
         if len(line) <= self.width:
             return [line]
 
-        def space_is_escaped(text: str, pos: int) -> bool:
-            """Return True if the space at pos in given text is escaped.
+        def space_is_escaped(pos: int) -> bool:
+            """Return True if the space at pos in line is escaped.
 
             In ninja syntax, space can be escaped (e.g. in windows path) with `$` escape character.
             Note that escape character can be used to escape itself.
@@ -158,7 +182,6 @@ class NinjaWriter:
 
             Parameters
             ----------
-            text: str
             pos: int
 
             Returns
@@ -166,89 +189,52 @@ class NinjaWriter:
             bool
             """
             idx = pos - 1
-            cnt = 0
-            while idx > 0 and text[idx] == "$":
+            while idx > 0 and line[idx] == "$":
                 idx -= 1
-                cnt += 1
-            return cnt % 2 == 1
+            return (pos - 1 - idx) % 2 == 1
 
-        def space_pos_before_line_width(text: str) -> int:
-            """Return the last unescaped space before line width.
-
-            Parameters
-            ----------
-            text: str
-
-            Returns
-            -------
-            int
-                unescaped space pos, -1 if not found
-            """
-            # reverse search from width minus escape sequence
-            pos = self.width - len(self._ESCAPE_NEW_LINE)
-            while True:
-                pos = text.rfind(" ", 0, pos)
-                # if pos is negative one, there is no match at all
-                # if space is not escaped, there is a match
-                # in both case, terminate iteration and return
-                # otherwise, look for another space
-                if pos < 0 or not space_is_escaped(text, pos):
-                    break
-            return pos
-
-        def space_pos_after_line_width(text: str) -> int:
-            """Return the first unescaped space after line width.
-
-            Parameters
-            ----------
-            text: str
-
-            Returns
-            -------
-            int
-                unescaped space pos, -1 if not found
-            """
-            # search from width minus escape sequence
-            # extra minus one is hackish here because find will start at previous pos + 1
-            pos = self.width - len(self._ESCAPE_NEW_LINE) - 1
-            while True:
-                pos = text.find(" ", pos + 1)
-                # if pos is negative one, there is no match at all
-                # if space is not escaped, there is a match
-                # in both case, terminate iteration and return
-                # otherwise, look for another space
-                if pos < 0 or not space_is_escaped(text, pos):
-                    break
-            return pos
-
-        parts: list[str] = []
         indent: int = len(line) - len(line.lstrip())
 
+        parts: list[str] = []
+        # Once wrapped, the remaining text is the continuation indentation (i.e. `prefix`)
+        # followed by `line[start:]`, thus the remaining text is `len(prefix) - start` longer
+        # than the original one on the same position.
+        prefix: str = ""
+        start: int = 0
         # do not try to wrap on indentation (i.e. leading) space
         min_pos: int = indent
+        # search for the last space before line width minus escape sequence,
+        # if none, search for the first space after
+        before: int = self.width - len(self._ESCAPE_NEW_LINE)
+        after: int = before
+
+        while len(prefix) + len(line) - start > self.width:
+            shift = start - len(prefix)
+            pos = line.rfind(" ", min_pos, before + shift)
+            while pos >= 0 and space_is_escaped(pos):
+                pos = line.rfind(" ", min_pos, pos)
+
+            if pos < 0:
+                # (continuation) indentation spaces are not valid wrapping positions
+                if after < len(prefix) or (not prefix and line.find(" ", after, indent) >= 0):
+                    break
+                pos = line.find(" ", max(after + shift, min_pos))
+                while pos >= 0 and space_is_escaped(pos):
+                    pos = line.find(" ", pos + 1)
+                if pos < 0:
+                    # the remaining cannot be wrapped
+                    break
 
-        while len(line) > self.width:
-            pos = space_pos_before_line_width(line)
-            if pos < min_pos:
-                pos = space_pos_after_line_width(line)
-
-            # if a valid position is found, wrap line here
-            if pos >= min_pos:
-                parts.append(line[:pos] + self._ESCAPE_NEW_LINE)
-                # update remaining text to wrap w/ extra indentation
-                line = " " * (indent + 2) + line[pos + 1 :]
-                # wrapped line are indented
-                min_pos = indent + 2
-            else:
-                # if pos negative, the remaining cannot be wrapped
-                break
+            parts.append(prefix + line[start:pos] + self._ESCAPE_NEW_LINE)
+            prefix = " " * (indent + 2)
+            start = min_pos = pos + 1
 
-        parts.append(line)
+        parts.append(prefix + line[start:])
         return parts
 
     def _write(self, text: str = "") -> None:
         for line in self._wrap(text):
-            self.lines.append(line)
+            self._emit(line)
 
     def comment(self, text: str) -> None:
         """
@@ -262,7 +248,7 @@ class NinjaWriter:
             text, self.width - 2, break_long_words=False, break_on_hyphens=False
         )
         for line in wrapped_comment:
-            self.lines.append(f"# {line}")
+            self._emit(f"# {line}")
 
     def variable(self, key: str, value: str | PurePath) -> None:
         """
@@ -328,15 +314,27 @@ class NinjaWriter:
                 self._write(f"  {k} = {v}")
         self._write()
 
+    def _format_deps(self, elements: Sequence[str | PurePath | NinjaBuild | dict]) -> list[str]:
+        """Return escaped dependencies, a dependency build is replaced by its outputs."""
+        data: list[str] = []
+        for elem in elements:
+            if isinstance(elem, NinjaBuild):
+                data.extend([self._escape(x) for x in elem.outputs])
+            elif isinstance(elem, dict):
+                data.extend([self._escape(x) for x in elem["outputs"]])
+            else:
+                data.append(self._escape(elem))
+        return data
+
     def build(
         self,
-        outputs: list[str | PurePath],
+        outputs: Sequence[str | PurePath],
         rule: str,
-        inputs: list[str | PurePath | dict] | None = None,
-        implicit: list[str | PurePath | dict] | None = None,
-        order_only: list[str | PurePath | dict] | None = None,
-        validation: list[str | PurePath | dict] | None = None,
-        implicit_outputs: list[str | PurePath] | None = None,
+        inputs: Sequence[str | PurePath | NinjaBuild | dict] | None = None,
+        implicit: Sequence[str | PurePath | NinjaBuild | dict] | None = None,
+        order_only: Sequence[str | PurePath | NinjaBuild | dict] | None = None,
+        validation: Sequence[str | PurePath | NinjaBuild | dict] | None = None,
+        implicit_outputs: Sequence[str | PurePath] | None = None,
         variables: dict[str, str | PurePath | list] | None = None,
     ) -> None:
         """
@@ -344,57 +342,46 @@ class NinjaWriter:
 
         Parameters
         ----------
-        outputs : list[str | PurePath]
+        outputs : Sequence[str | PurePath]
             Explicit outputs.
         rule : str
             Rule name.
-        inputs : list[str | PurePath | dict] | None (optional)
+        inputs : Sequence[str | PurePath | NinjaBuild | dict] | None (optional)
             Explicit inputs.
-        implicit : list[str | PurePath | dict] | None (optional)
+        implicit : Sequence[str | PurePath | NinjaBuild | dict] | None (optional)
             Implicit dependencies (after `|`).
-        order_only : list[str | PurePath | dict] | None (optional)
+        order_only : Sequence[str | PurePath | NinjaBuild | dict] | None (optional)
             Order-only dependencies (after `||`).
-        validation : list[str | PurePath | dict] | None (optional)
+        validation : Sequence[str | PurePath | NinjaBuild | dict] | None (optional)
             Validation dependencies (after `|@`)
-        implicit_outputs : list[str | PurePath] | None (optional)
+        implicit_outputs : Sequence[str | PurePath] | None (optional)
             Additional outputs (after `|`, before `:`).
         variables : dict[str, str | PurePath | list] | None (optional)
             Per-build variables.
 
         Note
         ----
-        NinjaWrite is used internally by NinjaFile which unpack NinjaBuild dataclass with `**asdict`
-        asdict will recursively convert dataclass as dictionary and thus input deps as well.
-        Here, the right type for such a input deps is list[ str | PurePath | dict ].
-        The given dict is 'pack' as a NinjaBuild dataclass while formatted.
+        A dependency may be a NinjaBuild, or a NinjaBuild as dictionary (i.e. unpacked with
+        :py:meth:`NinjaBuild.asdict`), which is replaced by its outputs.
+        See :py:meth:`build_statement` in order to declare a NinjaBuild as is.
         """
-
-        def _format(elements: list[str | PurePath | dict]) -> list[str]:
-            data: list[str] = []
-            for elem in elements:
-                if isinstance(elem, dict):
-                    data.extend([self._escape(x) for x in NinjaBuild(**elem).outputs])
-                else:
-                    data.append(self._escape(elem))
-            return data
-
         out = [self._escape(x) for x in outputs]
         inp: list[str] = []
 
         if inputs:
-            inp.extend(_format(inputs))
+            inp.extend(self._format_deps(inputs))
 
         if implicit:
             inp.append("|")
-            inp.extend(_format(implicit))
+            inp.extend(self._format_deps(implicit))
 
         if order_only:
             inp.append("||")
-            inp.extend(_format(order_only))
+            inp.extend(self._format_deps(order_only))
 
         if validation:
             inp.append("|@")
-            inp.extend(_format(validation))
+            inp.extend(self._format_deps(validation))
 
         if implicit_outputs:
             out.append("|")
@@ -405,13 +392,34 @@ class NinjaWriter:
         if variables:
             for k, v in variables.items():
                 if isinstance(v, list):
-                    print(v)
                     self._write(f"  {k} = {' '.join([self._escape(elem) for elem in v])}")
                 else:
                     self._write(f"  {k} = {self._escape(v)}")
 
         self._write()
 
+    def build_statement(self, build: NinjaBuild) -> None:
+        """
+        Declare a Ninja build statement from a NinjaBuild.
+
+        Dependency builds are resolved to their outputs as is, i.e. without being converted
+        (and thus deep copied) to dictionaries first.
+
+        Parameters
+        ----------
+        build : NinjaBuild
+        """
+        self.build(
+            outputs=build.outputs,
+            rule=build.rule,
+            inputs=build.inputs,
+            implicit=build.implicit,
+            order_only=build.order_only,
+            validation=build.validation,
+            implicit_outputs=build.implicit_outputs,
+            variables=build.variables,
+        )
+
     def include(self, path: PurePath) -> None:
         """
         Include another Ninja file.
@@ -464,7 +472,14 @@ class NinjaWriter:
         Returns
         -------
         str
+
+        Raises
+        ------
+        ValueError
+            If lines are streamed to an output file handle.
         """
+        if self._output is not None:
+            raise ValueError("streaming Ninja writer cannot be rendered")
         return "\n".join(self.lines) + "\n"
 
 
@@ -524,6 +539,24 @@ class NinjaBuildsProtocol(Protocol):
         yield from ()
 
 
+class NinjaPoolsProtocol(Protocol):
+    """Protocol for ninja pools builder."""
+
+    def __ninja_pools__(self) -> Iterator[NinjaPool]:
+        """Ninja pools generator.
+
+        Yields
+        ------
+        NinjaPool
+            The next ninja pool
+
+        Note
+        ----
+            Default implementation is an empty generator
+        """
+        yield from ()
+
+
 class NinjaBuilderProtocol(
     NinjaVariablesProtocol, NinjaRulesProtocol, NinjaBuildsProtocol, Protocol
 ):
@@ -543,6 +576,26 @@ class NinjaBuilderProtocol(
     def name(self) -> str: ...
 
 
+class NinjaFragmentProtocol(Protocol):
+    """
+    Protocol for builders emitting build statements in their own Ninja file fragment.
+
+    The fragment is included by the top level Ninja file with a `subninja` statement, and is
+    regenerated only if the builder fingerprint changed.
+    """
+
+    def __ninja_fingerprint__(self) -> str:
+        """Builder fingerprint.
+
+        Returns
+        -------
+        str
+            Digest of everything the builder build statements depend on (e.g. package
+            configuration and build options)
+        """
+        ...
+
+
 class NinjaFile:
     """
     Orchestrates Ninja file generation.
@@ -553,6 +606,8 @@ class NinjaFile:
         Builder instances.
     """
 
+    _FINGERPRINT = "fingerprint: "
+
     def __init__(self, builders: list[NinjaBuilderProtocol]) -> None:
         self.builders = builders
         self.types: set[type[NinjaBuilderProtocol]] = set()
@@ -604,46 +659,226 @@ class NinjaFile:
 
         return list(rules.values())
 
-    def generate(self) -> str:
+    def _collect_pools(self) -> list[NinjaPool]:
         """
-        Generate Ninja file content.
+        Collect and validate Ninja pools across builders.
+
+        Pools are optional, i.e. declared by builders implementing
+        :py:class:`NinjaPoolsProtocol` only.
+        It is an error to have duplicate pool name.
+        Error is silenced if pools are identical.
 
         Returns
         -------
-        str
+        list[NinjaPool]
+
+        Raises
+        ------
+        ValueError
+            If duplicate pool names are detected.
         """
-        nw = NinjaWriter()
+        pools: dict[str, NinjaPool] = {}
+
+        for builder in self.builders:
+            ninja_pools = getattr(builder, "__ninja_pools__", None)
+            if not callable(ninja_pools):
+                continue
+            for pool in ninja_pools():
+                if pools.setdefault(pool.name, pool) != pool:
+                    raise ValueError(
+                        f"Duplicate Ninja pool detected: '{pool.name}' from {builder.name}"
+                    )
 
+        return list(pools.values())
+
+    @staticmethod
+    def _header(nw: NinjaWriter) -> None:
         nw.comment("Generated by Barbican Ninja File builder")
         nw.comment("** DO NOT EDIT **")
         nw.newline()
 
+    @staticmethod
+    def _generate_builds(nw: NinjaWriter, builder: NinjaBuilderProtocol) -> list[str | PurePath]:
+        """
+        Generate builder build statements with the given writer.
+
+        Parameters
+        ----------
+        nw : NinjaWriter
+        builder : NinjaBuilderProtocol
+
+        Returns
+        -------
+        list[str | PurePath]
+            Default targets
+        """
+        default_targets: list[str | PurePath] = []
+        for b in builder.__ninja_builds__():
+            nw.build_statement(b)
+            if b.build_by_default:
+                default_targets.extend(b.outputs)
+        return default_targets
+
+    def _generate(
+        self, nw: NinjaWriter, fragments: dict[str, tuple[Path, str]] | None = None
+    ) -> None:
+        """
+        Generate Ninja file content with the given writer.
+
+        Parameters
+        ----------
+        nw : NinjaWriter
+        fragments : dict[str, tuple[Path, str]] | None
+            Fragment path and fingerprint, by builder name, of builders included with a
+            `subninja` statement instead of being generated inline.
+        """
+        self._header(nw)
+
         for v in [v for t in self.types for v in t.__ninja_variables__()]:
             nw.variable(**asdict(v))
         nw.newline()
 
+        for p in self._collect_pools():
+            nw.pool(p.name, p.depth)
+
         for r in self._collect_rules():
             nw.rule(**asdict(r))
         nw.newline()
 
         default_targets: list[str | PurePath] = []
-        for b in [b for builder in self.builders for b in builder.__ninja_builds__()]:
-            nw.build(**(b.asdict()))
-            if b.build_by_default:
-                default_targets.extend(b.outputs)
+        for builder in self.builders:
+            if fragments and builder.name in fragments:
+                fragment, fingerprint = fragments[builder.name]
+                # XXX:
+                #  Fragment fingerprint is recorded in top level file too, ninja reloads build
+                #  files only if the top level one changed.
+                nw.comment(f"{builder.name}: {fingerprint}")
+                nw.subninja(fragment)
+                nw.newline()
+            else:
+                default_targets.extend(self._generate_builds(nw, builder))
         nw.newline()
 
         if default_targets:
             nw.default(default_targets)
 
+    def _generate_fragment(
+        self, nw: NinjaWriter, builder: NinjaBuilderProtocol, fingerprint: str
+    ) -> None:
+        """
+        Generate builder Ninja file fragment content with the given writer.
+
+        Parameters
+        ----------
+        nw : NinjaWriter
+        builder : NinjaBuilderProtocol
+        fingerprint : str
+        """
+        nw.comment(f"{self._FINGERPRINT}{fingerprint}")
+        self._header(nw)
+
+        default_targets = self._generate_builds(nw, builder)
+        nw.newline()
+
+        if default_targets:
+            nw.default(default_targets)
+
+    def generate(self) -> str:
+        """
+        Generate Ninja file content.
+
+        Returns
+        -------
+        str
+        """
+        nw = NinjaWriter()
+        self._generate(nw)
         return nw.render()
 
-    def write(self, path: Path = Path("build.ninja")) -> None:
+    @staticmethod
+    def fragment_path(path: Path, name: str) -> Path:
         """
-        Write Ninja file.
+        Return builder Ninja file fragment path.
 
         Parameters
         ----------
-        path : Path, optional
+        path : Path
+            Top level Ninja file path.
+        name : str
+            Builder name.
+
+        Returns
+        -------
+        Path
+        """
+        return path.parent / "subninja" / f"{name}.ninja"
+
+    @classmethod
+    def _fingerprint(cls, fragment: Path) -> str | None:
+        """Return fingerprint recorded in the given fragment, None if missing."""
+        try:
+            with fragment.open("r", encoding="utf-8") as f:
+                line = f.readline().rstrip("\n")
+        except FileNotFoundError:
+            return None
+        prefix = f"# {cls._FINGERPRINT}"
+        return line.removeprefix(prefix) if line.startswith(prefix) else None
+
+    @staticmethod
+    def _write(path: Path, streaming: bool, generate: Callable[[NinjaWriter], None]) -> None:
+        if streaming:
+            with open_if_changed(path) as f:
+                generate(NinjaWriter(output=f))
+        else:
+            nw = NinjaWriter()
+            generate(nw)
+            write_if_changed(path, nw.render())
+
+    def write(
+        self, path: Path = Path("build.ninja"), streaming: bool = True, fragments: bool = False
+    ) -> None:
         """
-        path.write_text(self.generate(), encoding="utf-8")
+        Write Ninja file.
+
+        The file is left untouched if its content is unchanged.
+
+        If enabled, build statements of builders implementing :py:class:`NinjaFragmentProtocol`
+        are written to their own fragment (see :py:meth:`fragment_path`), included by the top
+        level file. A fragment is regenerated only if its builder fingerprint changed, stale
+        fragments (i.e. of a removed builder) are removed. Thus, fragments must be enabled for
+        the top level build file only, as it owns the fragment directory next to it (e.g. not
+        for a dyndep file written in the same directory).
+
+        Parameters
+        ----------
+        path : Path
+        streaming : bool
+            If True (default), content is streamed to file while generated, otherwise the whole
+            content is rendered in memory first.
+        fragments : bool
+            If True, write per builder fragments, False by default.
+        """
+        fragment_map: dict[str, tuple[Path, str]] = {}
+        for builder in self.builders if fragments else []:
+            fingerprint_func = getattr(builder, "__ninja_fingerprint__", None)
+            if not callable(fingerprint_func):
+                continue
+            fingerprint = fingerprint_func()
+            fragment = self.fragment_path(path, builder.name)
+            if self._fingerprint(fragment) != fingerprint:
+                logger.debug(f"generating {builder.name} ninja fragment")
+                fragment.parent.mkdir(parents=True, exist_ok=True)
+                self._write(
+                    fragment,
+                    streaming,
+                    partial(self._generate_fragment, builder=builder, fingerprint=fingerprint),
+                )
+            fragment_map[builder.name] = (fragment, fingerprint)
+
+        fragment_dir = self.fragment_path(path, "*").parent
+        if fragments and fragment_dir.is_dir():
+            for stale in fragment_dir.glob("*.ninja"):
+                if stale.stem not in fragment_map:
+                    stale.unlink()
+
+        self._write(path, streaming, lambda nw: self._generate(nw, fragment_map))
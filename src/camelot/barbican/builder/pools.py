@@ -0,0 +1,118 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Ninja pools for heavyweight build steps.
+
+Some build steps spawn their own full width parallel job set (e.g. `cargo build` w/ LTO or a
+nested `meson compile`) or are memory hungry (e.g. final links), running many of them
+concurrently thrashes build machine CPUs and memory. Those steps are assigned to ninja pools,
+bounding the number of concurrent steps of each kind:
+
+- :py:data:`CARGO_LTO`: cargo package builds,
+- :py:data:`MESON_COMPILE`: meson package builds,
+- :py:data:`LINK`: application (re)links.
+
+Default pool depth is derived from build machine core count and physical memory (w/ cgroup
+limit, if any), i.e. the number of jobs that fit w/ the cores and memory expected per job.
+Physical (and not currently free) memory is used so that the generated build file does not
+change from one setup to another on the same machine.
+Depths can be overridden in project configuration `pools` table.
+"""
+
+from collections.abc import Iterator, Mapping
+import os
+
+from .ninja import NinjaPool
+
+CARGO_LTO: str = "cargo_lto"
+"""Cargo package build pool."""
+
+MESON_COMPILE: str = "meson_compile"
+"""Meson package build pool."""
+
+LINK: str = "link"
+"""Application link pool."""
+
+_GiB = 1024**3
+
+# cores and memory expected per job, by pool name
+_JOB_RESOURCES: dict[str, tuple[int, int]] = {
+    CARGO_LTO: (4, 4 * _GiB),
+    MESON_COMPILE: (4, 2 * _GiB),
+    LINK: (1, 1 * _GiB),
+}
+
+_CGROUP_MEMORY_MAX = "/sys/fs/cgroup/memory.max"
+
+
+def cpu_count() -> int:
+    """Return the number of cores usable by the current process."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def physical_memory() -> int | None:
+    """Return physical memory (bounded by cgroup limit if any), in bytes, None if unknown."""
+    memory: int | None = None
+    try:
+        memory = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        pass
+
+    try:
+        with open(_CGROUP_MEMORY_MAX, "r") as f:
+            limit = f.read().strip()
+        if limit.isdigit():
+            memory = min(memory, int(limit)) if memory else int(limit)
+    except OSError:
+        pass
+
+    return memory
+
+
+def default_depth(name: str, cores: int | None = None, memory: int | None = None) -> int:
+    """Return default depth of the given pool.
+
+    Parameters
+    ----------
+    name: str
+        pool name
+    cores: int | None
+        build machine core count, default to :py:func:`cpu_count`
+    memory: int | None
+        build machine memory, in bytes, default to :py:func:`physical_memory`
+
+    Returns
+    -------
+    int
+        number of jobs that fit w/ available cores and memory, at least one
+    """
+    job_cores, job_memory = _JOB_RESOURCES[name]
+    cores = cores or cpu_count()
+    memory = memory or physical_memory()
+
+    depth = cores // job_cores
+    if memory is not None:
+        depth = min(depth, memory // job_memory)
+    return max(1, depth)
+
+
+def ninja_pools(config: Mapping[str, int]) -> Iterator[NinjaPool]:
+    """Ninja pools generator.
+
+    Parameters
+    ----------
+    config: Mapping[str, int]
+        pool depths, by pool name, overriding default ones (i.e. project configuration `pools`
+        table)
+
+    Yields
+    ------
+    NinjaPool
+        The next ninja pool
+    """
+    for name in _JOB_RESOURCES:
+        yield NinjaPool(name=name, depth=config.get(name) or default_depth(name))
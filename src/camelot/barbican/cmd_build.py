@@ -0,0 +1,34 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from argparse import ArgumentParser, Namespace
+
+from .builder.pools import cpu_count
+from .project import Project
+
+
+def add_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=cpu_count(),
+        help=(
+            "maximum number of concurrent jobs, across ninja and nested meson and cargo builds "
+            "(default: number of CPUs)"
+        ),
+    )
+    parser.add_argument(
+        "-t",
+        "--target",
+        dest="targets",
+        action="append",
+        default=[],
+        help="ninja target to build, may be repeated (default: project default targets)",
+    )
+
+
+def run(args: Namespace) -> None:
+    project = Project(args.projectdir)
+    project.build(args.jobs, args.targets)
@@ -13,6 +13,7 @@ from rich.table import Table
 from rich import box
 
 from .project import Project
+from .utils import memory_layout as memory
 
 # get back console instance for rendering, we want to use the same console
 # for all rendering to ensure consistent output and proper handling of colors
@@ -45,36 +46,19 @@ def __region_color(region_type: str) -> str:
 
 # Detect overlapping regions, return a list of booleans indicating if each region
 # is involved in a collision.
-# This is O(n^2) but we expect a small number of regions so it should be fine.
-def __detect_collisions(regions: List[Dict]) -> List[bool]:
-    enriched = []
-    for r in regions:
-        start = int(r["start_address"], 16)
-        size = int(r["size"], 16)
-        end = start + size - 1
-        enriched.append((r, start, end))
-
-    enriched.sort(key=lambda x: x[1])
-
-    collisions = {id(r): False for r, _, _ in enriched}
+def __detect_collisions(layout: memory.Layout) -> List[bool]:
+    index = {id(r): i for i, r in enumerate(layout.regions)}
 
-    for i in range(len(enriched)):
-        r1, s1, e1 = enriched[i]
-        for j in range(i + 1, len(enriched)):
-            r2, s2, e2 = enriched[j]
+    collisions = [False] * len(layout.regions)
+    for r1, r2 in layout.overlaps():
+        collisions[index[id(r1)]] = True
+        collisions[index[id(r2)]] = True
 
-            if s2 > e1:
-                break
-
-            if s2 <= e1:
-                collisions[id(r1)] = True
-                collisions[id(r2)] = True
-
-    return [collisions[id(r)] for r in regions]
+    return collisions
 
 
 # Effective rendering of the memory layout using rich
-def __render_layout(regions: List[Dict]) -> None:
+def __render_layout(layout: memory.Layout) -> None:
     table = Table(
         title="Memory Mapping",
         box=box.ROUNDED,
@@ -91,25 +75,25 @@ def __render_layout(regions: List[Dict]) -> None:
     table.add_column("Perm", justify="center")
     table.add_column("", justify="center", width=3)
 
-    collisions = __detect_collisions(regions)
+    collisions = __detect_collisions(layout)
 
-    regions_sorted = sorted(enumerate(regions), key=lambda x: int(x[1]["start_address"], 16))
+    regions_sorted = sorted(enumerate(layout.regions), key=lambda x: x[1].start_address)
 
     for original_index, r in regions_sorted:
-        start = int(r["start_address"], 16)
-        size = int(r["size"], 16)
+        start = r.start_address
+        size = r.size
         end = start + size - 1
 
-        perms = __decode_permissions(r["permission"])
-        color = __region_color(r["type"])
+        perms = __decode_permissions(r.permission)
+        color = __region_color(r.type)
 
         collision_flag = collisions[original_index]
         collision_marker = "[bold red]X[/bold red]" if collision_flag else ""
         row_style = "on red" if collision_flag else ""
 
         table.add_row(
-            r["name"],
-            f"[{color}]{r['type'].upper()}[/{color}]",
+            r.name,
+            f"[{color}]{r.type.upper()}[/{color}]",
             f"0x{start:08X}",
             f"0x{end:08X}",
             f"0x{size:X}",
@@ -225,17 +209,20 @@ def run(args: Namespace) -> None:
         raise SystemExit(1)
 
     try:
-        data = json.loads(layout_path.read_text())
+        layout = memory.Layout.load(layout_path)
     except json.JSONDecodeError as e:
         console.print(f"[bold red]Invalid JSON:[/bold red] {e}")
         raise SystemExit(1)
+    except (KeyError, ValueError, TypeError) as e:
+        # i.e. missing key, invalid hex string or enum value, unexpected json type
+        console.print(f"[bold red]Invalid layout:[/bold red] {e!r}")
+        raise SystemExit(1)
 
-    regions = data.get("regions", [])
-    if not regions:
+    if not layout.regions:
         console.print("[yellow]Warning:[/yellow] No regions found in layout.")
         return
 
-    __render_layout(regions)
+    __render_layout(layout)
 
     tasks = []
 
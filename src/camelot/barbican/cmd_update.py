@@ -4,13 +4,20 @@
 
 from argparse import ArgumentParser, Namespace
 
+from .builder.pools import cpu_count
 from .project import Project
 
 
 def add_arguments(parser: ArgumentParser) -> None:
-    pass
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=cpu_count(),
+        help="number of packages to update in parallel (default: number of CPUs)",
+    )
 
 
 def run(args: Namespace) -> None:
     project = Project(args.projectdir)
-    project.update()
+    project.update(args.jobs)
@@ -3,20 +3,85 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import logging
-from typing import Any
+import threading
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Any, Iterator
 
-import rich
-import rich.progress
-import rich.status
-import rich.logging
-import rich.text
+import typing as T
+
+if T.TYPE_CHECKING:
+    import rich.console
+    import rich.progress
+    import rich.status
+    import rich.theme
+
+# XXX:
+#  rich is imported on first use only, internal commands that do not print anything
+#  must not pay for rich import time.
+
+
+class _RichLogHandler(logging.Handler):
+    """Logging handler forwarding to a rich logging handler.
+
+    The rich handler (and thus rich console) is instantiated on first emitted record.
+    """
+
+    def __init__(self, console: "Console", level: int = logging.NOTSET) -> None:
+        super().__init__(level)
+        self._owner = console
+        self._handler: logging.Handler | None = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._handler is None:
+            import rich.logging
+
+            self._handler = rich.logging.RichHandler(
+                rich_tracebacks=True,
+                console=self._owner._console,
+            )
+            self._handler.setFormatter(self.formatter)  # type: ignore[arg-type]
+        self._handler.emit(record)
+
+
+class _LiveGroup:
+    """Renderables multiplexed in a single live display.
+
+    Renderables are added and removed from worker threads while the live display refresh
+    thread renders the group, thus the renderable list is lock protected.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._renderables: list[Any] = []
+
+    def add(self, renderable: Any) -> None:
+        with self._lock:
+            self._renderables.append(renderable)
+
+    def remove(self, renderable: Any) -> None:
+        with self._lock:
+            self._renderables.remove(renderable)
+
+    def __rich__(self) -> "rich.console.Group":
+        import rich.console
+
+        with self._lock:
+            return rich.console.Group(*self._renderables)
 
 
 class Console:
     """Rich console wrapper."""
 
     def __init__(self) -> None:
-        self._theme = rich.theme.Theme(
+        self._log_handler = _RichLogHandler(self, level=logging.CRITICAL)
+        self._live_group: _LiveGroup | None = None
+
+    @cached_property
+    def _theme(self) -> "rich.theme.Theme":
+        import rich.theme
+
+        return rich.theme.Theme(
             {
                 "title": "bold underline",
                 "warning": "bold dark_orange3",
@@ -25,12 +90,12 @@ class Console:
                 "deprecated": "bold gold1",
             }
         )
-        self._console = rich.console.Console(theme=self._theme)
-        self._log_handler = rich.logging.RichHandler(
-            level=logging.CRITICAL,
-            rich_tracebacks=True,
-            console=self._console,
-        )
+
+    @cached_property
+    def _console(self) -> "rich.console.Console":
+        import rich.console
+
+        return rich.console.Console(theme=self._theme)
 
     @property
     def log_handler(self) -> logging.Handler:
@@ -51,6 +116,8 @@ class Console:
         str
             Plain text (i.e. without rich markup)
         """
+        import rich.text
+
         return rich.text.Text.from_markup(message).plain
 
     @staticmethod
@@ -86,6 +153,10 @@ class Console:
         self._console.print(f"{message}")
 
     def __getattr__(self, name: str) -> Any:
+        # private attributes (e.g. not yet computed cached properties) are not console styles
+        if name.startswith("_"):
+            raise AttributeError(name)
+
         def __default(message) -> None:
             self._log(self._theme2level(name), message)
             self._console.print(
@@ -94,8 +165,82 @@ class Console:
 
         return __default
 
-    def status(self, message: str) -> rich.status.Status:
-        return rich.status.Status(message, spinner="moon", console=self._console)
+    @contextmanager
+    def _attach(self, renderable: Any) -> Iterator[None]:
+        """Attach renderable to the shared live display for the context duration."""
+        assert self._live_group is not None
+        group = self._live_group
+        group.add(renderable)
+        try:
+            yield
+        finally:
+            group.remove(renderable)
+
+    @contextmanager
+    def live(self) -> Iterator[None]:
+        """Multiplex progress bars and status spinners in a single live display.
+
+        rich allows only one live display per console at once. Within this context,
+        :py:meth:`progress` and :py:meth:`status` displays are attached to a shared live
+        display instead of starting their own, so that those can be used concurrently
+        (e.g. from a thread pool).
+        """
+        import rich.live
+
+        if self._live_group is not None:
+            # already multiplexed, e.g. nested call
+            yield
+            return
+
+        group = _LiveGroup()
+        with rich.live.Live(group, console=self._console, refresh_per_second=10, transient=True):
+            self._live_group = group
+            try:
+                yield
+            finally:
+                self._live_group = None
+
+    @contextmanager
+    def progress(self, *columns: Any, **kwargs: Any) -> Iterator["rich.progress.Progress"]:
+        """Progress bar context.
+
+        Parameters
+        ----------
+        *columns: Any
+            Progress bar columns, see :py:class:`rich.progress.Progress`
+        **kwargs: Any
+            Extra :py:class:`rich.progress.Progress` keyword arguments
+
+        Yields
+        ------
+        rich.progress.Progress
+            Progress bar, started for the context duration, standalone or attached to
+            the shared live display (see :py:meth:`live`)
+        """
+        import rich.progress
+
+        progress = rich.progress.Progress(*columns, console=self._console, **kwargs)
+        if self._live_group is None:
+            with progress:
+                yield progress
+        else:
+            with self._attach(progress):
+                yield progress
+            if not kwargs.get("transient", False):
+                # keep final state on screen, above the live display
+                self._console.print(progress.get_renderable())
+
+    @contextmanager
+    def status(self, message: str) -> Iterator["rich.status.Status"]:
+        import rich.status
+
+        status = rich.status.Status(message, spinner="moon", console=self._console)
+        if self._live_group is None:
+            with status:
+                yield status
+        else:
+            with self._attach(status):
+                yield status
 
 
 console = Console()
@@ -17,9 +17,18 @@ class LoggerConfig:
             datefmt="[%X]",
             handlers=[self._console_handler],
         )
+        self._sync_logger_level()
+
+    def _sync_logger_level(self) -> None:
+        # XXX:
+        #  Root logger level follows console handler level, so that disabled records are dropped
+        #  early and `logger.isEnabledFor` can guard costly debug logs.
+        #  To be revisited w/ file logging.
+        logging.getLogger().setLevel(self._console_handler.level)
 
     def set_console_log_level(self, level: int | str) -> None:
         self._console_handler.setLevel(level)
+        self._sync_logger_level()
 
 
 log_config = LoggerConfig()
@@ -12,7 +12,9 @@ from pathlib import Path
 from jinja2 import Environment, BaseLoader
 
 from .package import Package
+from ..builder import pools
 from ..builder.ninja import NinjaBuild, NinjaRule, NinjaVariable
+from ..utils import write_if_changed
 from ..utils.environment import ExeWrapper, find_program
 
 
@@ -132,8 +134,10 @@ git-fetch-with-cli = true
 
     def _update(self) -> None:
         template = Environment(loader=BaseLoader()).from_string(self.template)
-        with self.config_filename.open(mode="w", encoding="utf-8") as config:
-            config.write(template.render(registry=self._local_registry, crates=self._crates))
+        write_if_changed(
+            self.config_filename,
+            template.render(registry=self._local_registry, crates=self._crates),
+        )
 
     def patch_crate_registry(self, name: str, version: str) -> None:
         self._crates[name] = version
@@ -251,6 +255,7 @@ class Cargo(Package):
                     "cd - && "
                     "touch $out"
                 ),
+                pool=pools.CARGO_LTO,
             ),
             NinjaRule(
                 name="cargo_clean",
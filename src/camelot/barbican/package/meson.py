@@ -7,8 +7,8 @@ import subprocess
 from collections.abc import Iterator
 
 from .package import Package
+from ..builder import pools
 from ..builder.ninja import NinjaBuild, NinjaRule, NinjaVariable
-from ..utils import working_directory_attr
 from ..utils.environment import find_program
 
 
@@ -35,6 +35,7 @@ class Meson(Package):
                 name="meson_compile",
                 command="$meson compile -C $builddir && touch $out",
                 description="Compile $name",
+                pool=pools.MESON_COMPILE,
             ),
             NinjaRule(
                 name="meson_introspect",
@@ -42,6 +43,7 @@ class Meson(Package):
                     "$barbican --internal capture_out $out $meson introspect --all -i $builddir"
                 ),
                 description="Introspect $name",
+                restat=True,
             ),
             NinjaRule(
                 name="meson_install",
@@ -196,11 +198,11 @@ class Meson(Package):
         opts.extend([f"-D{k}={str(v)}" for k, v in self._extra_build_opts.items()])
         return opts
 
-    @working_directory_attr("src_dir")
+    # XXX:
+    #  Packages are downloaded concurrently, do not change (process wide) working directory
     def post_download_hook(self):
-        subprocess.run(["meson", "subprojects", "download"], capture_output=True)
+        subprocess.run(["meson", "subprojects", "download"], cwd=self.src_dir, capture_output=True)
 
-    @working_directory_attr("src_dir")
     def post_update_hook(self):
-        subprocess.run(["meson", "subprojects", "download"], capture_output=True)
-        subprocess.run(["meson", "subprojects", "update"], capture_output=True)
+        subprocess.run(["meson", "subprojects", "download"], cwd=self.src_dir, capture_output=True)
+        subprocess.run(["meson", "subprojects", "update"], cwd=self.src_dir, capture_output=True)
@@ -4,6 +4,9 @@
 
 from abc import ABC, abstractmethod
 import collections.abc
+from dataclasses import asdict
+import hashlib
+import json
 from pathlib import Path
 
 from functools import lru_cache
@@ -230,6 +233,31 @@ class Package(ABC):
     def as_dependency(self) -> str:
         return f"{self.name}_install.stamp"
 
+    def __ninja_fingerprint__(self) -> str:
+        """Package ninja build statements fingerprint.
+
+        Package build statements only depend on package configuration node, build options and
+        project paths, thus package ninja file fragment is regenerated only if one of those (or
+        barbican version) changed.
+
+        Returns
+        -------
+        str
+            Package configuration digest
+        """
+        from .. import __version__
+
+        data = {
+            "version": __version__,
+            "backend": self.backend,
+            "type": self._type,
+            "config": self._config,
+            "paths": asdict(self._parent.path, dict_factory=self._parent.path.asdict_factory),
+            "build_options": self.build_options,
+            "deps": self.deps,
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
     @classmethod
     def get_backend_factory(cls, backend: str) -> T.Type["Package"]:
         return cls.__backend_factories[Backend(backend)]
@@ -2,9 +2,11 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+import time
 import tomllib
 
 from collections.abc import Iterator
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from pathlib import Path, PurePath
 
 from .console import console
@@ -17,9 +19,11 @@ from .package.meson import Meson
 from .package.cargo import Cargo
 from .package import cargo
 
-from .builder.ninja import NinjaBuild, NinjaRule, NinjaVariable, NinjaFile
+from .builder import pools
+from .builder.ninja import NinjaBuild, NinjaFile, NinjaPool, NinjaRule, NinjaVariable
 from .utils import pathhelper
 from .utils.environment import find_program
+from .utils.jobserver import JobServer, ninja_is_client
 
 
 class Project:
@@ -93,14 +97,20 @@ class Project:
                 generator=True,
                 description="Reconfigure barbican project",
                 pool="console",
+                restat=True,
             ),
+            # Internal commands do not rewrite unchanged outputs
             NinjaRule(
                 name="internal",
                 command="$barbican --internal $cmd $args",
                 description="$cmd (internal)",
+                restat=True,
             ),
         ]
 
+    def __ninja_pools__(self) -> Iterator[NinjaPool]:
+        yield from pools.ninja_pools(self._toml.get("pools", {}))
+
     def __ninja_builds__(self) -> Iterator[NinjaBuild]:
         yield from self._config_targets
         if not self._noapp:
@@ -114,6 +124,11 @@ class Project:
     def name(self) -> str:
         return self._toml["name"]
 
+    @property
+    def integration_mode(self) -> str:
+        """Applications integration mode, either `relink` (default) or `relocate`."""
+        return self._toml.get("integration", {}).get("mode", "relink")
+
     @property
     def _config_targets(self) -> list[NinjaBuild]:
         path_target = NinjaBuild(
@@ -150,6 +165,16 @@ class Project:
         for app in apps:
             elves.extend(app.outputs)
         opts = " ".join(f"-l {elf}" for elf in elves)
+        for package in self.apps:
+            placement = package.placement or {}
+            name = package.relocated_targets[0].stem
+            for type in ("text", "ram"):
+                if type in placement:
+                    opts += f" --affinity {name} {type} {placement[type]}"
+            if not placement.get("spill", True):
+                opts += f" --no-spill {name}"
+        if self._toml.get("integration", {}).get("mpu_subregions", False):
+            opts += " --mpu-subregions"
 
         return NinjaBuild(
             outputs=[out],
@@ -157,7 +182,7 @@ class Project:
             implicit=implicit,
             variables={
                 "cmd": "gen_memory_layout",
-                "args": f"{out} --dts {dts} {opts}",
+                "args": f"{out} --dts {dts} --cache-dir {self.path.elfinfo_cache_dir} {opts}",
                 "description": "Firmware layout",
             },
         )
@@ -198,6 +223,21 @@ class Project:
                 "cmd": "relink_elf",
                 "args": f"-l {ldscript.outputs[0]} -m {kernel_introspect} {out} {inp}",
                 "description": f"{package.name}: linking {out}",
+                "pool": pools.LINK,
+            },
+        )
+
+    def _relocate_target(
+        self, package: Package, inp: NinjaBuild, out: Path, layout: NinjaBuild
+    ) -> NinjaBuild:
+        return NinjaBuild(
+            outputs=[out],
+            rule="internal",
+            implicit=[inp, layout],
+            variables={
+                "cmd": "relocate_elf",
+                "args": f"--name {out.stem} -l {layout.outputs[0]} {out} {inp.outputs[0]}",
+                "description": f"{package.name}: relocating {out}",
             },
         )
 
@@ -263,17 +303,17 @@ class Project:
             "dummy", self.path.private_build_dir / "dummy.lds", dummy_layout
         )
         # dummy link for partially linked, non-pic application
+        apps = [p for p in self._packages if p.is_application]
         dummy_apps: list[NinjaBuild] = []
-        for package in self._packages:
-            if package.is_application:
-                dummy_apps.append(
-                    self._relink_target(
-                        package,
-                        package.installed_targets[0],
-                        package.dummy_linked_targets[0],
-                        dummy_ld_script,
-                    )
+        for package in apps:
+            dummy_apps.append(
+                self._relink_target(
+                    package,
+                    package.installed_targets[0],
+                    package.dummy_linked_targets[0],
+                    dummy_ld_script,
                 )
+            )
 
         # Generate final firmware layout
         firmware_layout = self._firmware_layout_target(
@@ -285,25 +325,28 @@ class Project:
         apps_hex: list[NinjaBuild] = []
         apps_metadata: list[NinjaBuild] = []
 
-        for package in self._packages:
-            if package.is_application:
-                elf = package.installed_targets[0]
-                relinked_elf = package.relocated_targets[0]
-                ld_script = self.path.private_build_dir / f"{elf.stem}.lds"
-                metadata = relinked_elf.with_suffix(".meta")
-                hex = relinked_elf.with_suffix(".hex")
+        for package, dummy_app in zip(apps, dummy_apps):
+            elf = package.installed_targets[0]
+            relinked_elf = package.relocated_targets[0]
+            metadata = relinked_elf.with_suffix(".meta")
+            hex = relinked_elf.with_suffix(".hex")
 
+            if self.integration_mode == "relocate":
+                # Dummy linked application is relocated in place, no final link
+                apps_elves.append(
+                    self._relocate_target(package, dummy_app, relinked_elf, firmware_layout)
+                )
+            else:
+                ld_script = self.path.private_build_dir / f"{elf.stem}.lds"
                 apps_ld_script.append(
                     self._gen_ldscript_target(elf.stem, ld_script, firmware_layout, package)
                 )
-
                 apps_elves.append(
                     self._relink_target(package, elf, relinked_elf, apps_ld_script[-1])
                 )
 
-                apps_hex.append(self._objcopy(apps_elves[-1], hex, "ihex"))
-
-                apps_metadata.append(self._gen_metadata(apps_elves[-1], metadata))
+            apps_hex.append(self._objcopy(apps_elves[-1], hex, "ihex"))
+            apps_metadata.append(self._gen_metadata(apps_elves[-1], metadata))
 
         # XXX this is ugly (...)
         _kernel_elf = self._kernel._package.installed_targets[1]
@@ -334,15 +377,96 @@ class Project:
             firmware,
         ]
 
-    def download(self) -> None:
+    def _run_packages(self, action: str, jobs: int) -> dict[str, float]:
+        """Run the given package source action on each package.
+
+        Package sources are independent from each other, up to `jobs` packages are processed
+        concurrently. Progress displays are multiplexed in a single live display.
+        On the first failure, not yet started packages are cancelled and the error is raised
+        once running ones complete.
+
+        Parameters
+        ----------
+        action: str
+            Package method name (i.e. `download` or `update`)
+        jobs: int
+            Maximum number of packages processed concurrently
+
+        Returns
+        -------
+        dict[str, float]
+            Elapsed time (in seconds), by package name, in project package order
+        """
+
+        def _run(package: Package) -> tuple[str, float]:
+            start = time.perf_counter()
+            getattr(package, action)()
+            return package.name, time.perf_counter() - start
+
+        timings: dict[str, float] = {}
+        with console.live(), ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            pending = {executor.submit(_run, p) for p in self._packages}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_EXCEPTION)
+                for future in done:
+                    if future.exception() is not None:
+                        for f in pending:
+                            f.cancel()
+                        wait(pending)
+                    # re-raise package error, if any
+                    name, elapsed = future.result()
+                    timings[name] = elapsed
+                    logger.info(f"{name} {action} done in {elapsed:.2f}s")
+
+        return {p.name: timings[p.name] for p in self._packages}
+
+    def _report_timings(self, timings: dict[str, float], elapsed: float) -> None:
+        for name, t in sorted(timings.items(), key=lambda kv: kv[1], reverse=True):
+            console.message(f"  [i]{name}[/i]: {t:.2f}s")
+        console.message(f"[b]{len(timings)} packages in {elapsed:.2f}s[/b]")
+
+    def download(self, jobs: int = 1) -> None:
         logger.info("Downloading packages")
-        for p in self._packages:
-            p.download()
+        start = time.perf_counter()
+        timings = self._run_packages("download", jobs)
+        self._report_timings(timings, time.perf_counter() - start)
 
-    def update(self) -> None:
+    def update(self, jobs: int = 1) -> None:
         logger.info("Updating packages")
-        for p in self._packages:
-            p.update()
+        start = time.perf_counter()
+        timings = self._run_packages("update", jobs)
+        self._report_timings(timings, time.perf_counter() - start)
+
+    def build(self, jobs: int, targets: list[str]) -> None:
+        """Build the project.
+
+        Ninja runs as a jobserver client, as well as nested meson (i.e. ninja) and cargo builds,
+        total number of concurrent jobs across all those builds is bounded by `jobs`.
+        Ninja prior to 1.13 is not a jobserver client, outer ninja parallelism is then bounded by
+        `jobs` on its own, nested builds parallelism is still bounded by the jobserver.
+
+        Parameters
+        ----------
+        jobs: int
+            Maximum number of concurrent jobs
+        targets: list[str]
+            Ninja targets to build, default targets if empty
+
+        Raises
+        ------
+        SystemExit
+            If the build fails, w/ ninja exit code.
+        """
+        logger.info(f"Building {self.name} ({jobs} jobs)")
+        ninja = find_program("ninja")
+        cmd = [ninja, "-C", str(self.path.build_dir)]
+        if not ninja_is_client(ninja):
+            logger.warning(f"ninja < 1.13 is not a jobserver client, fallback to `ninja -j {jobs}`")
+            cmd.extend(["-j", str(jobs)])
+        with JobServer(jobs) as jobserver:
+            returncode = jobserver.run([*cmd, *targets])
+        if returncode != 0:
+            raise SystemExit(returncode)
 
     def setup(self) -> None:
 
@@ -356,4 +480,4 @@ class Project:
         self._runtime.install_crates(registry, cargo_config)
 
         logger.info(f"Generating {self.name} Ninja build File")
-        NinjaFile(self._packages + [self]).write(self._ninja_filepath)
+        NinjaFile(self._packages + [self]).write(self._ninja_filepath, fragments=True)
@@ -0,0 +1,217 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Minimal read only ELF file reader.
+
+This is a lightweight alternative to lief for callers that only need section headers, symbol
+values and (note) section content. The file is memory mapped, and section headers and symbol
+table are decoded on first access only, thus opening a multi megabytes ELF file is cheap.
+
+Both ELF32 and ELF64, little and big endian, files are supported.
+
+.. note::
+    This module depends on python standard library only, it can be imported from any internal
+    command without any start up penalty.
+"""
+
+from functools import cached_property
+import mmap
+from pathlib import Path
+import struct
+import typing as T
+
+
+class Section(T.NamedTuple):
+    name: str
+    type: int
+    flags: int
+    addr: int
+    offset: int
+    size: int
+    link: int
+    info: int
+    addralign: int
+    entsize: int
+
+
+class ElfFile:
+    """Read only ELF file.
+
+    Parameters
+    ----------
+    filepath: Path
+        ELF file to open
+
+    Raises
+    ------
+    ValueError
+        Not a valid ELF file
+    """
+
+    ELFCLASS32: T.ClassVar[int] = 1
+    ELFCLASS64: T.ClassVar[int] = 2
+    ELFDATA2LSB: T.ClassVar[int] = 1
+    ELFDATA2MSB: T.ClassVar[int] = 2
+
+    SHT_SYMTAB: T.ClassVar[int] = 2
+    SHT_NOBITS: T.ClassVar[int] = 8
+    SHN_XINDEX: T.ClassVar[int] = 0xFFFF
+
+    # ELF header, after e_ident, section header and symbol formats, w/o byte order
+    _FORMATS: T.ClassVar[dict[int, tuple[str, str, str]]] = {
+        ELFCLASS32: ("HHIIIIIHHHHHH", "IIIIIIIIII", "IIIBBH"),
+        ELFCLASS64: ("HHIQQQIHHHHHH", "IIQQQQIIQQ", "IBBHQQ"),
+    }
+
+    def __init__(self, filepath: Path) -> None:
+        self._name = filepath.name
+        with filepath.open("rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        ident = self._map[:16]
+        if len(ident) < 16 or ident[:4] != b"\x7fELF":
+            self.close()
+            raise ValueError(f"{self._name}: not an ELF file")
+
+        elfclass, data = ident[4], ident[5]
+        if elfclass not in ElfFile._FORMATS or data not in (self.ELFDATA2LSB, self.ELFDATA2MSB):
+            self.close()
+            raise ValueError(f"{self._name}: unsupported ELF class or data encoding")
+
+        self._elfclass = elfclass
+        byteorder = "<" if data == self.ELFDATA2LSB else ">"
+        header_fmt, shdr_fmt, sym_fmt = ElfFile._FORMATS[elfclass]
+        self._header = struct.Struct(byteorder + header_fmt)
+        self._shdr = struct.Struct(byteorder + shdr_fmt)
+        self._sym = struct.Struct(byteorder + sym_fmt)
+
+        (
+            _,  # e_type
+            self._machine,
+            _,  # e_version
+            self._entry,
+            _,  # e_phoff
+            self._shoff,
+            _,  # e_flags
+            _,  # e_ehsize
+            _,  # e_phentsize
+            _,  # e_phnum
+            self._shentsize,
+            self._shnum,
+            self._shstrndx,
+        ) = self._header.unpack_from(self._map, 16)
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "ElfFile":
+        return self
+
+    def __exit__(self, *exc: T.Any) -> None:
+        self.close()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def is_elf64(self) -> bool:
+        return self._elfclass == self.ELFCLASS64
+
+    @property
+    def machine(self) -> int:
+        return self._machine
+
+    @property
+    def entrypoint(self) -> int:
+        return self._entry
+
+    def _read_section_header(self, index: int) -> Section:
+        fields = self._shdr.unpack_from(self._map, self._shoff + index * self._shentsize)
+        return Section("", *fields[1:])
+
+    def _cstring(self, offset: int) -> str:
+        end = self._map.find(b"\0", offset)
+        return self._map[offset:end].decode("utf-8")
+
+    @cached_property
+    def _section_list(self) -> list[Section]:
+        if self._shoff == 0:
+            return []
+
+        # Extended numbering, actual values are in the first (null) section header
+        shnum, shstrndx = self._shnum, self._shstrndx
+        if shnum == 0 or shstrndx == self.SHN_XINDEX:
+            null_section = self._read_section_header(0)
+            shnum = shnum or null_section.size
+            shstrndx = null_section.link if shstrndx == self.SHN_XINDEX else shstrndx
+
+        headers = [
+            self._shdr.unpack_from(self._map, self._shoff + i * self._shentsize)
+            for i in range(shnum)
+        ]
+        strtab_offset = headers[shstrndx][4]
+        return [Section(self._cstring(strtab_offset + h[0]), *h[1:]) for h in headers]
+
+    @cached_property
+    def sections(self) -> dict[str, Section]:
+        """Sections, by name, in section header table order (unnamed sections excluded)."""
+        sections: dict[str, Section] = {}
+        for section in self._section_list:
+            if section.name:
+                sections.setdefault(section.name, section)
+        return sections
+
+    def has_section(self, name: str) -> bool:
+        return name in self.sections
+
+    def get_section(self, name: str) -> Section:
+        if name not in self.sections:
+            raise ValueError(f"{self._name}: no such section {name}")
+        return self.sections[name]
+
+    def section_content(self, name: str) -> bytes:
+        """Return section raw content, empty for section w/o data in file (e.g. `.bss`)."""
+        section = self.get_section(name)
+        if section.type == self.SHT_NOBITS:
+            return b""
+        return self._map[section.offset : section.offset + section.size]
+
+    @cached_property
+    def symbols(self) -> dict[str, int]:
+        """Symbols value, by name.
+
+        If a symbol name is defined more than once (e.g. local symbols), the first one in symbol
+        table order is kept.
+        """
+        symtab = next((s for s in self._section_list if s.type == self.SHT_SYMTAB), None)
+        if symtab is None:
+            return {}
+
+        strtab_header = self._section_list[symtab.link]
+        strtab = self._map[strtab_header.offset : strtab_header.offset + strtab_header.size]
+        entsize = symtab.entsize or self._sym.size
+        if entsize != self._sym.size:
+            raise ValueError(f"{self._name}: unsupported symbol entry size")
+
+        # Skip first (null) symbol
+        data = self._map[symtab.offset + entsize : symtab.offset + symtab.size]
+        value_index = 4 if self.is_elf64 else 1
+        symbols: dict[str, int] = {}
+        for sym in self._sym.iter_unpack(data):
+            name_offset = sym[0]
+            if name_offset == 0:
+                continue
+            name = strtab[name_offset : strtab.index(b"\0", name_offset)].decode("utf-8")
+            symbols.setdefault(name, sym[value_index])
+
+        return symbols
+
+    def has_symbol(self, name: str) -> bool:
+        return name in self.symbols
+
+    def get_symbol_address(self, name: str) -> int:
+        if name not in self.symbols:
+            raise ValueError(f"{self._name}: no such symbol {name}")
+        return self.symbols[name]
@@ -0,0 +1,138 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""ELF analysis summary and its on disk cache.
+
+Internal commands that only read ELF files (e.g. :py:mod:`.._internals.gen_memory_layout`,
+:py:mod:`.._internals.gen_task_metadata_bin`) need section address and size, a few well known
+symbols and package metadata. Those are summarized in a :py:class:`ElfInfo` and cached in a json
+sidecar file, keyed by ELF file content digest, so that an unchanged ELF is not parsed again by
+a subsequent build step (or a re-run of the same step).
+"""
+
+from dataclasses import dataclass, field, asdict
+import hashlib
+import json
+from pathlib import Path
+import typing as T
+from typing import ClassVar
+
+from ..logger import logger
+from ..utils import write_if_changed
+
+
+@dataclass(kw_only=True, frozen=True)
+class ElfInfo:
+    """ELF file summary.
+
+    Attributes
+    ----------
+    VERSION: ClassVar[int]
+        Cache file format version, a cache file with another version is discarded
+    SYMBOLS: ClassVar[tuple[str, ...]]
+        Symbols recorded in summary, i.e. symbols looked up by read only callers
+    digest: str
+        ELF file content sha256 hex digest
+    sections: dict[str, tuple[int, int]]
+        Section virtual address and size, by name
+    symbols: dict[str, int]
+        Symbol value, by name, only symbols in :py:attr:`SYMBOLS` are recorded
+    package_metadata: dict[str, T.Any] | None
+        `.note.package` json content, if any
+    """
+
+    VERSION: ClassVar[int] = 1
+    SYMBOLS: ClassVar[tuple[str, ...]] = ("_stext", "_erom", "_sheap", "_eheap", "_start", "_sigot")
+
+    digest: str
+    sections: dict[str, tuple[int, int]] = field(default_factory=dict)
+    symbols: dict[str, int] = field(default_factory=dict)
+    package_metadata: dict[str, T.Any] | None = None
+
+    @classmethod
+    def from_dict(cls, keyvals: dict) -> "ElfInfo":
+        sections = {k: (v[0], v[1]) for k, v in keyvals["sections"].items()}
+        return cls(
+            digest=keyvals["digest"],
+            sections=sections,
+            symbols=keyvals["symbols"],
+            package_metadata=keyvals["package_metadata"],
+        )
+
+    def save(self, filepath: Path) -> None:
+        """Write summary to file.
+
+        File is written to a temporary file first and then renamed, so that concurrent build
+        steps never read a partially written cache file.
+        """
+        data = {"version": ElfInfo.VERSION, **asdict(self)}
+        write_if_changed(filepath, json.dumps(data, indent=4))
+
+    @classmethod
+    def load(cls, filepath: Path) -> "ElfInfo":
+        with filepath.resolve(strict=True).open("r") as f:
+            data = json.load(f)
+        if data.get("version") != ElfInfo.VERSION:
+            raise ValueError(f"{filepath}: unsupported version")
+        return cls.from_dict(data)
+
+
+def file_digest(filepath: Path) -> str:
+    """Return file content sha256 hex digest."""
+    with filepath.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def cache_path(elf: Path, cache_dir: Path) -> Path:
+    """Return the cache file path of the given ELF file.
+
+    Cache file name is derived from ELF file name and absolute path, as different ELF files may
+    share the same name (e.g. dummy linked and relocated applications).
+    """
+    elf = elf.resolve()
+    path_digest = hashlib.sha1(str(elf).encode("utf-8")).hexdigest()[:8]
+    return cache_dir / f"{elf.name}.{path_digest}.barbican-info.json"
+
+
+def load_cached(elf: Path, cache_dir: Path, digest: str) -> ElfInfo | None:
+    """Return cached summary of the given ELF, None if missing or stale.
+
+    Parameters
+    ----------
+    elf: Path
+        ELF file path
+    cache_dir: Path
+        cache directory
+    digest: str
+        ELF file current content digest
+
+    Returns
+    -------
+    ElfInfo | None
+        Cached summary if up to date with ELF content, None otherwise
+    """
+    filepath = cache_path(elf, cache_dir)
+    try:
+        info = ElfInfo.load(filepath)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    if info.digest != digest:
+        logger.debug(f"{elf.name}: stale elf info cache")
+        return None
+
+    logger.debug(f"{elf.name}: elf info loaded from cache")
+    return info
+
+
+def store(elf: Path, cache_dir: Path, info: ElfInfo) -> None:
+    """Store ELF summary in cache.
+
+    Failing to write cache file is not an error, it only costs a parse on the next call.
+    """
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        info.save(cache_path(elf, cache_dir))
+    except OSError as e:
+        logger.warning(f"{elf.name}: failed to write elf info cache ({e})")
@@ -2,41 +2,180 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-import lief
 import os
 import json
 import codecs
+import logging
+import sys
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from functools import cached_property
+from pathlib import Path
 
 import typing
 from typing import ClassVar
 
 from ..logger import logger
 from ..console import console
+from . import elfinfo
+from .elffile import ElfFile
+from .elfinfo import ElfInfo
+
+if typing.TYPE_CHECKING:
+    import lief
+
+# 32 bits unsigned array typecode, `I` is 4 bytes wide on any supported host
+_ADDRESS_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+
+# XXX:
+#  lief is imported while parsing elf file only, its import time is a significant part of
+#  internal commands start up time.
+
+
+def relocate_table(table: bytes, lower: int, upper: int, offset: int, vma: int = 0) -> bytes:
+    """Relocate a table of 32 bits little endian addresses (e.g. `.got`).
+
+    Entries in [lower, upper] range are moved by offset, other entries are left untouched.
+    The table is patched in a single pass through a typed array view, patched entries are
+    logged only if debug log level is enabled.
+
+    Parameters
+    ----------
+    table: bytes
+        Table raw content
+    lower: int
+        Relocated range lower bound (included)
+    upper: int
+        Relocated range upper bound (included)
+    offset: int
+        Relocation offset
+    vma: int
+        Table virtual address, for logging purpose only
+
+    Returns
+    -------
+    bytes
+        Relocated table raw content
+
+    Raises
+    ------
+    ValueError
+        Table size is not a multiple of 4
+    """
+    if len(table) % 4:
+        raise ValueError(f"table size ({len(table)}) is not a multiple of 4")
+
+    entries = array(_ADDRESS_TYPECODE)
+    entries.frombytes(table)
+    if sys.byteorder != "little":
+        entries.byteswap()
+
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, addr in enumerate(entries):
+            if lower <= addr <= upper:
+                logger.debug(
+                    f"patching table entry {(vma + 4 * i):02x}: {addr:02x} -> {(addr + offset):02x}"
+                )
+
+    relocated = array(
+        _ADDRESS_TYPECODE, [addr + offset if lower <= addr <= upper else addr for addr in entries]
+    )
+    if sys.byteorder != "little":
+        relocated.byteswap()
+    return relocated.tobytes()
 
 
 class Elf:
+    """Elf file representation.
+
+    In read only mode, the ELF file is summarized (see :py:class:`.elfinfo.ElfInfo`), only
+    section info, :py:attr:`.elfinfo.ElfInfo.SYMBOLS` and package metadata are available.
+    If a cache directory is given, the summary is read from, or written to, this cache.
+    Summary is built with the lightweight :py:class:`.elffile.ElfFile` reader.
+    Otherwise, the ELF file is parsed and fully loaded (with lief), in order to be modified
+    and written back.
+
+    Parameters
+    ----------
+    elf: str
+        Input elf file to parse
+    out: str | None
+        Path to written elf file while write method is called
+    readonly: bool
+        Open elf file in read only mode
+    cache_dir: Path | None
+        ELF summary cache directory, used in read only mode only
+    """
+
     SECTION_HEADER_SIZE: ClassVar[int] = 16
 
-    def __init__(self, elf: str, out: typing.Optional[str]) -> None:
+    def __init__(
+        self,
+        elf: str,
+        out: str | None,
+        readonly: bool = False,
+        cache_dir: Path | None = None,
+    ) -> None:
         self._name: str = os.path.basename(elf)
+        self._output_path = out
+        self._info: ElfInfo | None = None
+        self._package_metadata: typing.Any
+
+        if readonly:
+            self._info = self._load_info(Path(elf), cache_dir)
+            self._package_metadata = self._info.package_metadata
+            return
+
+        import lief
+
         logger.info(f"Parsing {self.name} from {elf}")
         self._elf = typing.cast(lief.ELF.Binary, lief.parse(elf))
-        self._output_path = out
         if self._elf.has_section(section_name=".note.package"):
             logger.debug("package metadata section found")
-            raw_data = self._elf.get_section(".note.package").content[Elf.SECTION_HEADER_SIZE :]
-            self._package_metadata = json.loads(
-                codecs.decode(bytes(raw_data), "utf-8").strip("\x00")
-            )
+            raw_data = self._elf.get_section(".note.package").content
+            self._package_metadata = self._decode_package_metadata(bytes(raw_data))
         else:
             self._package_metadata = None
 
+    @staticmethod
+    def _decode_package_metadata(raw_data: bytes) -> typing.Any:
+        return json.loads(codecs.decode(raw_data[Elf.SECTION_HEADER_SIZE :], "utf-8").strip("\x00"))
+
+    def _load_info(self, elf: Path, cache_dir: Path | None) -> ElfInfo:
+        digest = elfinfo.file_digest(elf)
+        if cache_dir is not None:
+            info = elfinfo.load_cached(elf, cache_dir, digest)
+            if info is not None:
+                return info
+
+        # Cache miss, summarize w/ lightweight elf reader, lief is not needed here
+        with ElfFile(elf) as f:
+            package_metadata = None
+            if f.has_section(".note.package"):
+                package_metadata = self._decode_package_metadata(f.section_content(".note.package"))
+            info = ElfInfo(
+                digest=digest,
+                sections={name: (s.addr, s.size) for name, s in f.sections.items()},
+                symbols={name: f.symbols[name] for name in ElfInfo.SYMBOLS if f.has_symbol(name)},
+                package_metadata=package_metadata,
+            )
+
+        if cache_dir is not None:
+            elfinfo.store(elf, cache_dir, info)
+        return info
+
     @property
     def name(self) -> str:
         return self._name
 
+    @property
+    def readonly(self) -> bool:
+        return self._info is not None
+
     def save(self) -> None:
         # XXX: FIXME
+        self._require_lief()
         logger.info(f"Writing {self.name} to {self._output_path}")
         self._elf.write(self._output_path)  # type: ignore
 
@@ -47,6 +186,11 @@ class Elf:
         return False
 
     def get_section_info(self, section_name: str) -> tuple[int, int]:
+        if self._info is not None:
+            if section_name not in self._info.sections:
+                raise ValueError
+            return self._info.sections[section_name]
+
         if not self._elf.has_section(section_name=section_name):
             raise ValueError
 
@@ -55,10 +199,88 @@ class Elf:
         size = section.size
         return (vma, size)
 
+    @cached_property
+    def _symbols_by_name(self) -> dict[str, "lief.ELF.Symbol"]:
+        symbols: dict[str, "lief.ELF.Symbol"] = {}
+        for sym in self._elf.symbols:
+            if sym.name:
+                symbols.setdefault(typing.cast(str, sym.name), sym)
+        return symbols
+
+    @cached_property
+    def _symbols_by_address(self) -> dict[int, list["lief.ELF.Symbol"]]:
+        symbols: dict[int, list["lief.ELF.Symbol"]] = defaultdict(list)
+        for sym in self._elf.symbols:
+            symbols[sym.value].append(sym)
+        return symbols
+
+    @cached_property
+    def _section_intervals(self) -> tuple[list[int], list["lief.ELF.Section"]]:
+        import lief
+
+        sections = sorted(
+            (s for s in self._elf.sections if s.has(lief.ELF.Section.FLAGS.ALLOC) and s.size > 0),
+            key=lambda s: s.virtual_address,
+        )
+        return [s.virtual_address for s in sections], sections
+
+    def _invalidate_index(self) -> None:
+        """Drop symbol and section indexes, must be called on symbol or section modification."""
+        for index in ("_symbols_by_name", "_symbols_by_address", "_section_intervals"):
+            self.__dict__.pop(index, None)
+
+    def _require_lief(self) -> None:
+        if self.readonly:
+            raise ValueError(f"{self.name} opened in read only mode")
+
     def get_symbol_address(self, symbol_name: str) -> int:
-        if not self._elf.has_symbol(symbol_name):
+        if self._info is not None:
+            if symbol_name not in ElfInfo.SYMBOLS:
+                raise ValueError(f"{symbol_name} symbol not available in read only mode")
+            if symbol_name not in self._info.symbols:
+                raise ValueError
+            return self._info.symbols[symbol_name]
+
+        if symbol_name not in self._symbols_by_name:
             raise ValueError
-        return self._elf.get_symbol(symbol_name).value
+        return self._symbols_by_name[symbol_name].value
+
+    def get_symbol_addresses(self, *symbol_names: str) -> dict[str, int]:
+        """Return symbol addresses, by name.
+
+        Raise ValueError if at least one symbol is missing.
+
+        Parameters
+        ----------
+        *symbol_names: str
+            Symbol names to look for
+
+        Returns
+        -------
+        dict[str, int]
+            Symbol addresses, by name
+        """
+        return {name: self.get_symbol_address(name) for name in symbol_names}
+
+    def get_symbols_at(self, address: int) -> list[str]:
+        """Return names of the symbols whose value is the given address.
+
+        .. note:: Not available in read only mode
+        """
+        self._require_lief()
+        return [typing.cast(str, sym.name) for sym in self._symbols_by_address.get(address, [])]
+
+    def get_section_at(self, address: int) -> str | None:
+        """Return the name of the allocated section that contains the given address, if any.
+
+        .. note:: Not available in read only mode
+        """
+        self._require_lief()
+        starts, sections = self._section_intervals
+        index = bisect_right(starts, address) - 1
+        if index >= 0 and address < starts[index] + sections[index].size:
+            return typing.cast(str, sections[index].name)
+        return None
 
     def get_symbol_offset_from_section(self, symbol_name: str, from_section_name: str) -> int:
         section_vma, _ = self.get_section_info(from_section_name)
@@ -89,13 +311,23 @@ class SentryElf(Elf):
         Input elf file to parse
     out: str | None
         Path to written elf file while write method is called
+    readonly: bool
+        Open elf file in read only mode
+    cache_dir: Path | None
+        ELF summary cache directory, used in read only mode only
     """
 
     FLASH_SECTIONS: ClassVar[list[str]] = [".isr_vector", ".task_list", ".text", ".ARM"]
     RAM_SECTIONS: ClassVar[list[str]] = [".bss", "._stack"]
 
-    def __init__(self, elf: str, out: str | None) -> None:
-        super().__init__(elf, out)
+    def __init__(
+        self,
+        elf: str,
+        out: str | None,
+        readonly: bool = False,
+        cache_dir: Path | None = None,
+    ) -> None:
+        super().__init__(elf, out, readonly, cache_dir)
 
     def patch_task_list(self, task_meta_table: bytearray) -> None:
         tbl = self._elf.get_section(".task_list")
@@ -129,6 +361,10 @@ class AppElf(Elf):
         Input elf file to parse
     out: str | None
         Path to written elf file while write method is called
+    readonly: bool
+        Open elf file in read only mode
+    cache_dir: Path | None
+        ELF summary cache directory, used in read only mode only
 
     Raises
     ------
@@ -139,8 +375,14 @@ class AppElf(Elf):
     FLASH_SECTIONS: ClassVar[list[str]] = [".text", ".ARM"]
     RAM_SECTIONS: ClassVar[list[str]] = [".svcexchange", ".got", ".data", ".bss"]
 
-    def __init__(self, elf: str, out: str | None) -> None:
-        super().__init__(elf, out)
+    def __init__(
+        self,
+        elf: str,
+        out: str | None,
+        readonly: bool = False,
+        cache_dir: Path | None = None,
+    ) -> None:
+        super().__init__(elf, out, readonly, cache_dir)
         if not self.is_a_camelot_application:
             console.critical(f"{self.name} is not a valid camelot application")
             raise ValueError
@@ -199,49 +441,45 @@ class AppElf(Elf):
         def _symtab_fixup():
             """Fixup symtab with relocated addresses."""
             s_rom = self._prev_sections[".text"][0]
-            e_rom = self._elf.get_symbol("_erom").value
+            e_rom = self.get_symbol_address("_erom")
             rom_offset = self._elf.get_section(".text").virtual_address - s_rom
 
             s_ram = self._prev_sections[".svcexchange"][0]
-            e_ram = self._elf.get_symbol("_sheap").value
+            e_ram = self.get_symbol_address("_sheap")
             ram_offset = self._elf.get_section(".svcexchange").virtual_address - s_ram
 
-            for sym in self._elf.symbols:
+            debug = logger.isEnabledFor(logging.DEBUG)
+            # Offset is computed once per address, symbols are then moved in bulk
+            for address, symbols in self._symbols_by_address.items():
                 offset = 0
-                if s_rom <= sym.value <= e_rom:
+                if s_rom <= address <= e_rom:
                     offset = rom_offset
-                elif s_ram <= sym.value <= e_ram:
+                elif s_ram <= address <= e_ram:
                     offset = ram_offset
 
                 if offset > 0:
-                    new_value = sym.value + offset
-                    logger.debug(f"relocating {sym.name}: {sym.value:02x} -> {new_value:02x}")
-                    sym.value = new_value
+                    new_value = address + offset
+                    for sym in symbols:
+                        if debug:
+                            logger.debug(f"relocating {sym.name}: {address:02x} -> {new_value:02x}")
+                        sym.value = new_value
+
+            self._invalidate_index()
 
         def _got_fixup():
             """Got fixup with relocated addresses."""
             s_ram = self._prev_sections[".svcexchange"][0]
-            e_ram = self._elf.get_symbol("_eheap").value
+            e_ram = self.get_symbol_address("_eheap")
             ram_offset = self._elf.get_section(".svcexchange").virtual_address - s_ram
             got = self._elf.get_section(".got")
-            chunk_size = 4
-            patched_got = bytearray()
-
-            for i in range(0, len(got.content), chunk_size):
-                addr = int.from_bytes(got.content[i : i + chunk_size], "little")
-                if s_ram <= addr <= e_ram:
-                    logger.debug(
-                        f"patching got entry {(got.virtual_address + i):02x}: {addr:02x} "
-                        f"-> {(addr + ram_offset):02x}"
-                    )
-                    addr = addr + ram_offset
-                patched_got += addr.to_bytes(chunk_size, "little")
-
-            got.content = patched_got
+            got.content = memoryview(
+                relocate_table(bytes(got.content), s_ram, e_ram, ram_offset, got.virtual_address)
+            )
 
         def _heap_fixup():
-            _eheap_sym = self._elf.get_symbol("_eheap")
+            _eheap_sym = self._symbols_by_name["_eheap"]
             _eheap_sym.value = _eheap_sym.value + self.heap_size
+            self._invalidate_index()
 
         logger.info(f"relocating {self.name}")
         logger.info(f" - flash start address {srom:#010x}")
@@ -249,6 +487,7 @@ class AppElf(Elf):
 
         _relocate_sections(AppElf.FLASH_SECTIONS, srom)
         _relocate_sections(AppElf.RAM_SECTIONS, sram)
+        self._invalidate_index()
         _symtab_fixup()
         _got_fixup()
         _segment_fixup()
@@ -256,17 +495,18 @@ class AppElf(Elf):
         self._elf.header.entrypoint = self.get_symbol_address("_start")
 
     def remove_notes(self) -> None:
+        import lief
+
         for note_name in [".note.gnu.build-id", ".note.package"]:
             note_vma, _ = self.get_section_info(note_name)
-            note_sym: lief.ELF.Symbol
-
-            for sym in self._elf.symbols:
-                if sym.value == note_vma:
-                    note_sym = sym
-                    break
+            note_syms = self._symbols_by_address.get(note_vma)
+            if not note_syms:
+                raise ValueError(f"{self.name}: no symbol for {note_name}")
 
-            self._elf.remove_symtab_symbol(note_sym)
+            self._elf.remove_symtab_symbol(note_syms[0])
             self._elf.remove_section(note_name)
+            # Symbol removal invalidates symbol references held by indexes
+            self._invalidate_index()
 
         # XXX
         # In symtab, each symbol section index is shift by 2 as we remove section
@@ -2,24 +2,24 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-from git import Repo, RemoteProgress, FetchInfo
-from git.exc import InvalidGitRepositoryError, NoSuchPathError
+from contextlib import contextmanager
+from pathlib import Path
+import shutil
 
-from typing import Optional, cast
+from git import Repo, RemoteProgress, FetchInfo
+from git.exc import GitCommandError, InvalidGitRepositoryError, NoSuchPathError
 
-from rich.progress import (
-    BarColumn,
-    Progress,
-    MofNCompleteColumn,
-    SpinnerColumn,
-    TextColumn,
-    TimeRemainingColumn,
-)
+from typing import Any, Iterator, Optional, cast
+import typing as T
 
 from ..logger import logger
 from ..console import console
+from ..utils.cache import download_cache
 from .scm import ScmBaseClass
 
+if T.TYPE_CHECKING:
+    from rich.progress import Progress
+
 
 class GitProgressBar(RemoteProgress):
     OP_CODES = [
@@ -36,9 +36,23 @@ class GitProgressBar(RemoteProgress):
 
     OP_CODE_MAP = {getattr(RemoteProgress, _op_code): _op_code for _op_code in OP_CODES}
 
-    def __init__(self) -> None:
+    def __init__(self, progressbar: "Progress", name: str = "") -> None:
         super().__init__()
-        self._progressbar = Progress(
+        self._progressbar = progressbar
+        self._prefix = f"{name}: " if name else ""
+
+    @staticmethod
+    def columns() -> tuple:
+        """Return git progress bar columns."""
+        from rich.progress import (
+            BarColumn,
+            MofNCompleteColumn,
+            SpinnerColumn,
+            TextColumn,
+            TimeRemainingColumn,
+        )
+
+        return (
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             BarColumn(),
@@ -48,13 +62,25 @@ class GitProgressBar(RemoteProgress):
             "•",
             TimeRemainingColumn(),
             TextColumn("{task.fields[message]}"),
-            transient=False,
-            console=console._console,
         )
 
-    def __del__(self) -> None:
-        if self._progressbar.live.is_started:
-            self._progressbar.stop()
+    @classmethod
+    @contextmanager
+    def display(cls, name: str = "") -> Iterator["GitProgressBar"]:
+        """Git remote operation progress display context.
+
+        Parameters
+        ----------
+        name: str
+            Repository name, used as progress bars prefix
+
+        Yields
+        ------
+        GitProgressBar
+            Remote progress handler, to be forwarded to git remote operations
+        """
+        with console.progress(*cls.columns(), transient=False) as progressbar:
+            yield cls(progressbar, name)
 
     @classmethod
     def get_curr_op(cls, op_code: int) -> str:
@@ -71,13 +97,9 @@ class GitProgressBar(RemoteProgress):
     ) -> None:
         # Start new bar on each BEGIN-flag
         if op_code & self.BEGIN:
-            # Start rendering at first task insertion
-            if not self._progressbar.live.is_started:
-                self._progressbar.start()
-
             self.curr_op = self.get_curr_op(op_code)
             self._active_task = self._progressbar.add_task(
-                description=self.curr_op,
+                description=self._prefix + self.curr_op,
                 total=cast(Optional[float], max_count),
                 message=message,
             )
@@ -100,6 +122,11 @@ class GitProgressBar(RemoteProgress):
 class Git(ScmBaseClass):
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
+        self._reference: str | None = self._config.get("reference")
+        self._dissociate: bool = self._config.get("dissociate", False)
+        self._depth: int | None = self._config.get("depth")
+        self._filter: str | None = self._config.get("filter")
+        self._fetch_by_sha: bool = self._config.get("fetch_by_sha", False) or bool(self._depth)
         self._repo: Repo
         try:
             self._repo = Repo(self.sourcedir)
@@ -157,23 +184,136 @@ class Git(ScmBaseClass):
             raise ValueError
         self._repo.git.checkout(sha)
 
+    def _update_mirror(self, mirror: Path) -> None:
+        """Create or refresh the bare mirror of the repository in download cache.
+
+        A mirror is not refreshed if the requested revision is a commit already mirrored.
+        """
+        if not mirror.exists():
+            console.message(f"[b]Mirroring git repository [i]{self.name}[/i]...[/b]")
+            tmp = mirror.with_name(f".tmp-{mirror.name}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            try:
+                with GitProgressBar.display(self.name) as progress:
+                    Repo.clone_from(
+                        url=self.url, to_path=tmp, progress=progress, mirror=True  # type: ignore
+                    )
+                tmp.rename(mirror)
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+            return
+
+        repo = Repo(mirror)
+        if self.is_hex_sha(self.revision) and repo.is_valid_object(self.revision):
+            logger.info(f"{self.name}@{self.revision} found in git mirror")
+            return
+
+        logger.info(f"git fetch {self.name} mirror")
+        with GitProgressBar.display(self.name) as progress:
+            repo.remote().fetch(prune=True, progress=progress)
+
+    @property
+    def _reference_path(self) -> Path | None:
+        return Path(self._reference).expanduser() if self._reference else None
+
+    def _clone_options(self) -> dict[str, Any]:
+        """Return clone (and initial fetch) options from package configuration."""
+        options: dict[str, Any] = dict()
+        if self._reference_path:
+            options["reference_if_able"] = str(self._reference_path)
+            if self._dissociate:
+                options["dissociate"] = True
+        if self._depth:
+            options["depth"] = self._depth
+        if self._filter:
+            options["filter"] = self._filter
+        return options
+
+    def _add_alternates(self) -> None:
+        """Borrow objects from reference repository, if exists, as `--reference-if-able` does."""
+        if not self._reference_path:
+            return
+        try:
+            reference = Repo(self._reference_path)
+        except (InvalidGitRepositoryError, NoSuchPathError):
+            logger.warning(f"{self.name}: {self._reference_path} is not a git repository, ignored")
+            return
+        alternates = Path(self._repo.git_dir) / "objects" / "info" / "alternates"
+        alternates.parent.mkdir(parents=True, exist_ok=True)
+        alternates.write_text(str(Path(reference.common_dir, "objects").resolve()) + "\n")
+
+    def _fetch_sha(self, url: str) -> None:
+        """Clone a single commit, i.e. init and fetch by SHA.
+
+        Remote may refuse to serve a non advertised commit, if so, fall back to a full fetch.
+        """
+        self._repo = Repo.init(self.sourcedir)
+        self._add_alternates()
+        remote = self._repo.create_remote("origin", url)
+        options: dict[str, Any] = dict()
+        if self._depth:
+            options["depth"] = self._depth
+        if self._filter:
+            options["filter"] = self._filter
+            self._repo.git.config("remote.origin.promisor", "true")
+            self._repo.git.config("remote.origin.partialclonefilter", self._filter)
+
+        with GitProgressBar.display(self.name) as progress:
+            try:
+                remote.fetch(refspec=self.revision, progress=progress, **options)
+            except GitCommandError as e:
+                logger.debug(e)
+                console.warning(f"{self.name}: fetch by SHA refused by remote, fetching all")
+                options.pop("depth", None)
+                remote.fetch(progress=progress, **options)
+
+        if self._dissociate and self._reference_path:
+            self._repo.git.repack("-a", "-d")
+            (Path(self._repo.git_dir) / "objects" / "info" / "alternates").unlink(missing_ok=True)
+
+    def _clone(self, url: str, **options: Any) -> None:
+        if self.is_hex_sha(self.revision) and self._fetch_by_sha:
+            self._fetch_sha(url)
+            return
+
+        with GitProgressBar.display(self.name) as progress:
+            if self.is_hex_sha(self.revision):
+                self._repo = Repo.clone_from(
+                    url=url,
+                    to_path=self.sourcedir,
+                    progress=progress,  # type: ignore
+                    no_checkout=True,
+                    **options,
+                )
+            else:
+                self._repo = Repo.clone_from(
+                    url=url,
+                    to_path=self.sourcedir,
+                    progress=progress,  # type: ignore
+                    branch=self.revision,
+                    single_branch=True,
+                    **options,
+                )
+
     def clone(self) -> None:
+        cache = download_cache()
+        options = self._clone_options()
+        if cache is None or options or self._fetch_by_sha:
+            # XXX:
+            #  Explicit clone options (e.g. shallow or partial clone, reference repository)
+            #  are meant to transfer as few objects as possible, those bypass download cache
+            #  (i.e. a full mirror).
+            self._clone(self.url, **options)
+        else:
+            # Local clone from cached mirror (i.e. objects are hardlinked) and then bind
+            # to upstream, thus subsequent fetch are done from upstream.
+            with cache.git_mirror(self.url) as mirror:
+                self._update_mirror(mirror)
+                self._clone(str(mirror))
+            self._repo.remote().set_url(self.url)
+
         if self.is_hex_sha(self.revision):
-            self._repo = Repo.clone_from(
-                url=self.url,
-                to_path=self.sourcedir,
-                progress=GitProgressBar(),  # type: ignore
-                no_checkout=True,
-            )
             self._checkout(self.revision)
-        else:
-            self._repo = Repo.clone_from(
-                url=self.url,
-                to_path=self.sourcedir,
-                progress=GitProgressBar(),  # type: ignore
-                branch=self.revision,
-                single_branch=True,
-            )
         logger.info(f"git clone {self.name}@{self.revision} ({self._repo.head.commit})")
 
     def fetch(self) -> None:
@@ -192,7 +332,13 @@ class Git(ScmBaseClass):
             if is_new_ref:
                 refspec += ":" + refspec
 
-        fetch_infos = self._repo.remote().fetch(refspec=refspec, progress=GitProgressBar())
+        # Partial clone filter is recorded in repository configuration, but not depth
+        options: dict[str, Any] = dict()
+        if self._depth:
+            options["depth"] = self._depth
+
+        with GitProgressBar.display(self.name) as progress:
+            fetch_infos = self._repo.remote().fetch(refspec=refspec, progress=progress, **options)
 
         # this should never occurs
         if len(fetch_infos) != 1:
@@ -4,23 +4,91 @@
 
 from typing import cast
 from pathlib import Path
-from rich.progress import (
-    BarColumn,
-    MofNCompleteColumn,
-    Progress,
-    TextColumn,
-    TimeRemainingColumn,
-)
 
+import os
+import shutil
 import tarfile
+import threading
 import hashlib
+import typing as T
 
 from ..logger import logger
 from ..console import console
-from ..utils.downloader import download_file
+from ..utils.cache import DownloadCache, download_cache
+from ..utils.downloader import Download, download
 from .scm import ScmBaseClass
 
 
+# XXX:
+#  Extraction filters are available from python 3.11.4 (PEP 706), `data` filter refuses absolute
+#  path, path and link outside destination directory, device files, and clears unsafe mode bits.
+_EXTRACT_FILTER: dict[str, T.Any] = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+
+
+class _StreamExtractor:
+    """Extract a tarball in a dedicated thread, while being written (e.g. downloaded).
+
+    Content is forwarded to the extraction thread through a pipe, extraction starts on first
+    write, i.e. if content is never written (e.g. served from download cache), there is no
+    extraction at all.
+
+    Parameters
+    ----------
+    extract: T.Callable[[tarfile.TarFile], T.Any]
+        Extract members of a stream mode archive
+    """
+
+    def __init__(self, extract: T.Callable[[tarfile.TarFile], T.Any]) -> None:
+        self._extract = extract
+        self._thread: threading.Thread | None = None
+        self._writer: T.BinaryIO | None = None
+        self._error: BaseException | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def _run(self, reader: T.BinaryIO) -> None:
+        try:
+            with tarfile.open(fileobj=reader, mode="r|*") as tar:
+                self._extract(tar)
+            # consume trailing padding (if any), writer must never block
+            while reader.read(1 << 16):
+                pass
+        except BaseException as e:
+            self._error = e
+        finally:
+            # Writer gets a broken pipe error on extraction failure
+            reader.close()
+
+    def write(self, data: bytes) -> None:
+        if self._writer is None:
+            rfd, wfd = os.pipe()
+            self._writer = os.fdopen(wfd, "wb")
+            self._thread = threading.Thread(target=self._run, args=(os.fdopen(rfd, "rb"),))
+            self._thread.start()
+        self._writer.write(data)
+
+    def _join(self) -> None:
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except BrokenPipeError:
+                pass
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self) -> None:
+        """Wait for extraction completion, raise extraction error, if any."""
+        self._join()
+        if self._error is not None:
+            raise self._error
+
+    def abort(self) -> None:
+        """Wait for extraction termination, ignore extraction error (e.g. truncated archive)."""
+        self._join()
+
+
 class Tarball(ScmBaseClass):
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -28,12 +96,20 @@ class Tarball(ScmBaseClass):
         self._hashfile_url: str | None = cast(str | None, self._config.get("hashfile_uri"))
         self._hash_algorithm: str = self._config.get("hash_algorithm", "sha256")
         self._strip: int = self._config.get("strip", 0)
+        self._streaming: bool = self._config.get("streaming", False)
         self._tarball = Path()
+        self._tarball_digest: str | None = None
         self._hashfile = Path()
 
     @staticmethod
-    def _strip_member_path(path: Path, strip: int) -> Path:
-        return Path(*path.parts[strip:])
+    def _strip_member_name(name: str, strip: int) -> str | None:
+        """Strip leading components from member name, None if nothing is left."""
+        while name.startswith("./"):
+            name = name[2:]
+        if not strip:
+            return name if name not in ("", ".") else None
+        parts = name.split("/", strip)
+        return parts[strip] if len(parts) > strip and parts[strip] else None
 
     def _verify_download(self) -> None:
         if not self._hashfile_url:
@@ -41,58 +117,134 @@ class Tarball(ScmBaseClass):
             return
         if self._tarball.exists() and self._hashfile.exists():
             expected_digest, filename = self._hashfile.read_text().split()
-            hash = hashlib.new(self._hash_algorithm)
-            hash.update(self._tarball.read_bytes())
-            digest = hash.hexdigest()
+            digest = self._tarball_digest
+            if digest is None:
+                with self._tarball.open("rb") as f:
+                    digest = hashlib.file_digest(f, self._hash_algorithm).hexdigest()
             console.message(f"{self._hash_algorithm}sum: [i]{digest}[/i]")
             if expected_digest != digest:
                 console.message(f"{self._tarball.name}: [bold red]FAILED[/bold red]")
                 console.error(f"expected {self._hash_algorithm}sum: [i]{expected_digest}[/i]")
+                self._invalidate_cache()
                 raise Exception
 
             console.message(f"{self._tarball.name}: [bold green]OK[/bold green]")
 
+    def _extract_members(
+        self, tar: tarfile.TarFile, advance: T.Callable[[], None] | None = None
+    ) -> None:
+        """Extract archive members, in a single pass (i.e. stream mode compatible)."""
+        for m in tar:
+            name = self._strip_member_name(m.name, self._strip)
+            # XXX:
+            #  Members are not looked up afterward, do not keep track of those, stream mode
+            #  still records each member.
+            tar.members.clear()  # type: ignore[attr-defined]
+            if name is None:
+                continue
+
+            logger.debug(f" {m.name} -> {name}")
+            m.name = name
+            # if member is a hardlink, target link path is relative to archive root dir
+            # and need to be stripped too
+            if m.islnk():
+                m.linkname = self._strip_member_name(m.linkname, self._strip) or ""
+            tar.extract(m, self.sourcedir, **_EXTRACT_FILTER)
+            if advance is not None:
+                advance()
+
     def _extract(self) -> None:
+        from rich.progress import (
+            BarColumn,
+            DownloadColumn,
+            TextColumn,
+            TimeRemainingColumn,
+        )
+
         console.message(f"[b]Extracting[/b] [i]{self._tarball.name}[/i]")
-        progress = Progress(
+        columns = (
             TextColumn("[bold blue]{task.fields[filename]}", justify="right"),
             BarColumn(bar_width=None),
             "[progress.percentage]{task.percentage:>3.1f}%",
             "•",
-            MofNCompleteColumn(),
+            DownloadColumn(),
             "•",
             TimeRemainingColumn(),
-            console=console._console,
         )
         if not tarfile.is_tarfile(self._tarball):
             raise Exception
 
-        with progress:
-            task_id = progress.add_task("extracting", start=False, filename=self._tarball.name)
-            with tarfile.open(self._tarball, "r") as f:
-                members = f.getmembers()
-                progress.update(task_id, total=len(members))
-                progress.start_task(task_id)
-                for m in members:
-                    orig = m.name
-                    m.name = str(self._strip_member_path(Path(m.name), self._strip))
-                    dest = str(self.sourcedir / m.name)
-                    logger.debug(f" {orig} -> {dest}")
-
-                    # if member is a hardlink, target link path is relative to archive root dir
-                    # and need to be stripped too
-                    if m.islnk():
-                        m.linkname = str(self._strip_member_path(Path(m.linkname), self._strip))
-
-                    f.extract(m, self.sourcedir)
-                    progress.update(task_id, advance=1)
-
-    def _download_files(self) -> None:
-        self._tarball = download_file(self._url, self._dl_dir)
+        # Progress by (compressed) archive bytes consumed, there is no member count ahead of
+        # extraction in stream mode.
+        with console.progress(*columns) as progress, self._tarball.open("rb") as raw:
+            task_id = progress.add_task(
+                "extracting", total=self._tarball.stat().st_size, filename=self._tarball.name
+            )
+            with tarfile.open(fileobj=raw, mode="r|*") as tar:
+                self._extract_members(tar, lambda: progress.update(task_id, completed=raw.tell()))
+            progress.update(task_id, completed=raw.tell())
+
+    def _download_file(
+        self,
+        url: str,
+        hash_algorithm: str | None = None,
+        sink: T.Callable[[bytes], T.Any] | None = None,
+    ) -> Download:
+        cache = download_cache()
+        if cache is None:
+            return download(url, self._dl_dir, hash_algorithm, sink)
+        return cache.fetch_file(url, self._dl_dir, hash_algorithm, sink)
+
+    def _invalidate_cache(self) -> None:
+        """Drop cached files on hash mismatch, those are downloaded again on next attempt."""
+        cache = download_cache()
+        if cache is not None:
+            cache.invalidate(DownloadCache.FILES, self._url)
+            if self._hashfile_url is not None:
+                cache.invalidate(DownloadCache.FILES, self._hashfile_url)
+
+    def _download_files(self, sink: T.Callable[[bytes], T.Any] | None = None) -> None:
         if self._hashfile_url is not None:
-            self._hashfile = download_file(self._hashfile_url, self._dl_dir)
+            self._hashfile = self._download_file(self._hashfile_url).path
+        # tarball digest is computed while downloading, if verified
+        hash_algorithm = self._hash_algorithm if self._hashfile_url else None
+        tarball = self._download_file(self._url, hash_algorithm, sink)
+        self._tarball, self._tarball_digest = tarball.path, tarball.digest
+
+    def _download_and_extract(self) -> None:
+        """Extract tarball while downloading.
+
+        Extracted content is removed if tarball verification fails. If the tarball is served
+        from download cache, it is extracted afterward, as usual.
+        """
+        extractor = _StreamExtractor(self._extract_members)
+        try:
+            self._download_files(sink=extractor.write)
+        except BrokenPipeError:
+            # extraction failure, raise root cause
+            extractor.close()
+            raise
+        except BaseException:
+            extractor.abort()
+            raise
+        # raise extraction error, if any
+        extractor.close()
+
+        try:
+            self._verify_download()
+        except BaseException:
+            if extractor.started:
+                shutil.rmtree(self.sourcedir, ignore_errors=True)
+            raise
+
+        if not extractor.started:
+            self._extract()
 
     def download(self) -> None:
+        if self._streaming:
+            self._download_and_extract()
+            return
+
         self._download_files()
         self._verify_download()
         self._extract()
@@ -7,6 +7,7 @@ import math
 
 from contextlib import contextmanager
 from pathlib import Path
+from typing import IO, Iterator
 
 from ..logger import logger
 
@@ -54,3 +55,99 @@ def pow2_greatest_divisor(x: int) -> int:
 
 def align_to(x: int, a: int) -> int:
     return ((x + a - 1) // a) * a
+
+
+def write_if_changed(path: Path, content: str | bytes, encoding: str = "utf-8") -> bool:
+    """Write content to file, only if it differs from current file content.
+
+    Output file modification time is left untouched if content is unchanged, thus dependent build
+    steps are skipped by ninja if the rule that produces that file is marked as `restat`.
+    File is written to a temporary file in the same directory first and then renamed, so that a
+    reader never sees a partially written file.
+
+    Parameters
+    ----------
+    path: Path
+        Output file path
+    content: str | bytes
+        File content, encoded w/ the given encoding if str
+    encoding: str
+        text encoding, default to utf-8
+
+    Returns
+    -------
+    bool
+        True if file has been written, False if unchanged
+    """
+    data = content.encode(encoding) if isinstance(content, str) else content
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            logger.debug(f"{str(path)} unchanged")
+            return False
+    except FileNotFoundError:
+        pass
+
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return True
+
+
+_COMPARE_CHUNK_SIZE = 1024 * 1024
+
+
+def _same_content(a: Path, b: Path) -> bool:
+    """Return True if both files have the same content, compared chunk by chunk."""
+    try:
+        if a.stat().st_size != b.stat().st_size:
+            return False
+    except FileNotFoundError:
+        return False
+    with a.open("rb") as fa, b.open("rb") as fb:
+        while True:
+            chunk = fa.read(_COMPARE_CHUNK_SIZE)
+            if chunk != fb.read(_COMPARE_CHUNK_SIZE):
+                return False
+            if not chunk:
+                return True
+
+
+@contextmanager
+def open_if_changed(
+    path: Path, encoding: str = "utf-8", buffering: int = 1024 * 1024
+) -> Iterator[IO[str]]:
+    """Open a text file for streaming write, only replaced on close if its content changed.
+
+    Streaming counterpart of :py:func:`write_if_changed`, content is written (buffered) to a
+    temporary file in the same directory, never held in memory as a whole. On context exit, the
+    temporary file is compared against the current file and renamed over it if they differ, so
+    that output file modification time is left untouched if content is unchanged.
+    On error, the temporary file is removed and the output file is left as is.
+
+    Parameters
+    ----------
+    path: Path
+        Output file path
+    encoding: str
+        text encoding, default to utf-8
+    buffering: int
+        write buffer size, in bytes
+
+    Yields
+    ------
+    IO[str]
+        Text file handle to write content to
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("w", encoding=encoding, buffering=buffering) as f:
+            yield f
+        if _same_content(tmp, path):
+            logger.debug(f"{str(path)} unchanged")
+        else:
+            os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
@@ -0,0 +1,371 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""User level download cache.
+
+Package sources (e.g. kernel and runtime) are shared across projects, the download cache keeps
+a copy of each downloaded source in a user cache directory so that subsequent downloads (in the
+same or in another project) are served locally:
+
+- files (e.g. tarballs and their hash files) are keyed by URL, a cached file is verified against
+  its hash file, as a freshly downloaded one, and invalidated on mismatch,
+- git repositories are cached as bare mirrors, keyed by URL, and refreshed on use unless the
+  requested revision is a commit already mirrored.
+
+Cached files are materialized into the project w/ a hardlink (a reflink or a plain copy as
+fallback), git repositories are locally cloned from their mirror (i.e. w/ hardlinked objects)
+and then bound to their upstream URL.
+
+Each cache entry is guarded by a lock file while in use. Least recently used entries are evicted
+once the cache size exceeds its limit, entries in use are never evicted.
+
+The cache location and size limit can be set through environment variables, see
+:py:data:`ENV_CACHE`, :py:data:`ENV_CACHE_DIR` and :py:data:`ENV_CACHE_MAX_SIZE`.
+"""
+
+from contextlib import contextmanager
+import hashlib
+import os
+from pathlib import Path
+import shutil
+from typing import Any, Callable, Iterator
+
+from ..console import console
+from ..logger import logger
+from .downloader import Download, download
+
+ENV_CACHE: str = "BARBICAN_CACHE"
+"""Environment variable to set to `0` in order to disable the download cache."""
+
+ENV_CACHE_DIR: str = "BARBICAN_CACHE_DIR"
+"""Environment variable overriding cache directory (default: `$XDG_CACHE_HOME/barbican`)."""
+
+ENV_CACHE_MAX_SIZE: str = "BARBICAN_CACHE_MAX_SIZE"
+"""Environment variable overriding cache size limit, in bytes w/ optional K, M or G suffix."""
+
+DEFAULT_MAX_SIZE: int = 10 * 1024**3
+"""Default cache size limit, in bytes."""
+
+_SIZE_SUFFIXES = {"K": 1024, "M": 1024**2, "G": 1024**3}
+
+# Linux `FICLONE` ioctl request number, i.e. `_IOW(0x94, 9, int)`
+_FICLONE = 0x40049409
+
+
+def parse_size(size: str) -> int:
+    """Parse a size, in bytes, w/ optional K, M or G (binary) suffix.
+
+    Parameters
+    ----------
+    size: str
+        size string, e.g. `4096`, `512M` or `10G`
+
+    Returns
+    -------
+    int
+        size in bytes
+    """
+    size = size.strip().upper().removesuffix("B")
+    multiplier = _SIZE_SUFFIXES.get(size[-1:], 1)
+    if multiplier != 1:
+        size = size[:-1]
+    return int(size) * multiplier
+
+
+@contextmanager
+def _flock(path: Path, blocking: bool = True) -> Iterator[bool]:
+    """Hold an exclusive lock on the given lock file for the context duration.
+
+    Parameters
+    ----------
+    path: Path
+        lock file path, created if missing
+    blocking: bool
+        wait for lock if True, give up immediately otherwise
+
+    Yields
+    ------
+    bool
+        True if lock is held, False if not blocking and lock is held by someone else
+    """
+    import fcntl
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        # lock is released on close
+        yield True
+
+
+def _reflink(src: Path, dest: Path) -> None:
+    import fcntl
+
+    with src.open("rb") as s, dest.open("wb") as d:
+        fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+
+
+def materialize(src: Path, dest: Path) -> None:
+    """Materialize a cached file into project.
+
+    A hardlink is used if possible (i.e. same filesystem), then a reflink (i.e. copy on write,
+    on supported filesystems), and a plain copy as last resort.
+
+    Parameters
+    ----------
+    src: Path
+        cached file
+    dest: Path
+        destination file, replaced if exists
+    """
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(src, dest)
+        return
+    except OSError:
+        pass
+
+    try:
+        _reflink(src, dest)
+        return
+    except (OSError, ImportError):
+        dest.unlink(missing_ok=True)
+
+    shutil.copyfile(src, dest)
+
+
+def _entry_size(entry: Path) -> int:
+    if entry.is_file():
+        return entry.lstat().st_size
+    size = 0
+    for dirpath, _, filenames in os.walk(entry):
+        size += sum(os.lstat(os.path.join(dirpath, f)).st_size for f in filenames)
+    return size
+
+
+class DownloadCache:
+    """Download cache.
+
+    Parameters
+    ----------
+    root: Path
+        cache root directory
+    max_size: int
+        cache size limit, in bytes
+    """
+
+    FILES: str = "files"
+    GIT: str = "git"
+
+    def __init__(self, root: Path, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self._root = root
+        self._max_size = max_size
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @staticmethod
+    def key(url: str) -> str:
+        """Return cache key of the given URL."""
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def entry_path(self, kind: str, url: str) -> Path:
+        """Return cache entry path of the given kind (i.e. :py:attr:`FILES` or :py:attr:`GIT`)."""
+        return self._root / kind / self.key(url)
+
+    def _lock_path(self, entry: Path) -> Path:
+        return self._root / "locks" / f"{entry.parent.name}-{entry.name}.lock"
+
+    @contextmanager
+    def lock(self, entry: Path) -> Iterator[Path]:
+        """Hold cache entry lock for the context duration.
+
+        Entry is marked as recently used on context exit.
+
+        Parameters
+        ----------
+        entry: Path
+            cache entry path
+
+        Yields
+        ------
+        Path
+            Cache entry path, may not exist yet
+        """
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        with _flock(self._lock_path(entry)):
+            try:
+                yield entry
+            finally:
+                if entry.exists():
+                    os.utime(entry)
+
+    @contextmanager
+    def git_mirror(self, url: str) -> Iterator[Path]:
+        """Git mirror cache entry context.
+
+        Caller creates (or refreshes) the bare mirror and clones from it while entry lock is
+        held. Cache is trimmed to its size limit on exit.
+
+        Parameters
+        ----------
+        url: str
+            git repository URL
+
+        Yields
+        ------
+        Path
+            Bare mirror repository path, may not exist yet
+        """
+        with self.lock(self.entry_path(self.GIT, url)) as entry:
+            yield entry
+        self.evict()
+
+    def fetch_file(
+        self,
+        url: str,
+        dest_dir: Path,
+        hash_algorithm: str | None = None,
+        sink: Callable[[bytes], Any] | None = None,
+    ) -> Download:
+        """Fetch a file from cache, download and add it to cache on miss.
+
+        File digest, if requested, is computed while downloading and stored alongside the
+        cached file, thus a cache hit does not read the file content either.
+
+        Parameters
+        ----------
+        url: str
+            file URL
+        dest_dir: Path
+            destination directory, the cached file is materialized in this directory
+        hash_algorithm: str | None
+            if given, file digest w/ this algorithm is returned
+        sink: Callable[[bytes], Any] | None
+            if given, file content is forwarded to this callable while downloading, on cache
+            miss only
+
+        Returns
+        -------
+        Download
+            Materialized file path and digest
+        """
+        with self.lock(self.entry_path(self.FILES, url)) as entry:
+            files = (
+                [f for f in entry.iterdir() if not f.name.startswith(".")] if entry.is_dir() else []
+            )
+            if len(files) == 1:
+                console.message(f"[b]Using cached[/b] [i]{url}[/i]")
+                cached = Download(files[0])
+            else:
+                # Missing or inconsistent entry.
+                # Download to a per entry (i.e. lock protected) directory, left as is on failure,
+                # a partial download is resumed on next attempt.
+                shutil.rmtree(entry, ignore_errors=True)
+                partial_dir = entry.with_name(f".part-{entry.name}")
+                partial_dir.mkdir(exist_ok=True)
+                dl = download(url, partial_dir, hash_algorithm, sink)
+                partial_dir.rename(entry)
+                cached = Download(entry / dl.path.name, dl.digest)
+                if hash_algorithm is not None and dl.digest is not None:
+                    self._digest_path(cached.path, hash_algorithm).write_text(dl.digest)
+
+            digest = cached.digest
+            if hash_algorithm is not None and digest is None:
+                digest = self._digest(cached.path, hash_algorithm)
+
+            dest = dest_dir / cached.path.name
+            materialize(cached.path, dest)
+
+        self.evict()
+        return Download(dest, digest)
+
+    @staticmethod
+    def _digest_path(cached: Path, hash_algorithm: str) -> Path:
+        return cached.with_name(f".{cached.name}.{hash_algorithm}")
+
+    def _digest(self, cached: Path, hash_algorithm: str) -> str:
+        """Return cached file digest, computed once and then stored alongside the file."""
+        digest_path = self._digest_path(cached, hash_algorithm)
+        if digest_path.exists():
+            return digest_path.read_text()
+        with cached.open("rb") as f:
+            digest = hashlib.file_digest(f, hash_algorithm).hexdigest()
+        digest_path.write_text(digest)
+        return digest
+
+    def invalidate(self, kind: str, url: str) -> None:
+        """Remove cache entry of the given URL, if any."""
+        with self.lock(self.entry_path(kind, url)) as entry:
+            logger.debug(f"invalidate {url} cache entry")
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def entries(self) -> list[Path]:
+        """Return cache entries, least recently used first."""
+        entries: list[tuple[int, Path]] = []
+        for kind in (self.FILES, self.GIT):
+            kind_dir = self._root / kind
+            if not kind_dir.is_dir():
+                continue
+            for entry in kind_dir.iterdir():
+                # skip partial entries
+                if not entry.name.startswith("."):
+                    entries.append((entry.stat().st_mtime_ns, entry))
+        return [e for _, e in sorted(entries)]
+
+    def evict(self) -> list[Path]:
+        """Evict least recently used entries until cache size is below its limit.
+
+        Entries in use (i.e. locked) are skipped.
+
+        Returns
+        -------
+        list[Path]
+            Evicted entries
+        """
+        sizes = {entry: _entry_size(entry) for entry in self.entries()}
+        total = sum(sizes.values())
+        evicted: list[Path] = []
+        for entry, size in sizes.items():
+            if total <= self._max_size:
+                break
+            with _flock(self._lock_path(entry), blocking=False) as locked:
+                if not locked:
+                    continue
+                logger.info(f"download cache: evict {entry.name} ({size} bytes)")
+                # XXX:
+                #  lock file is left as is, removing it would let a waiter and a newcomer
+                #  hold lock on distinct files
+                shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            evicted.append(entry)
+        return evicted
+
+
+def download_cache() -> DownloadCache | None:
+    """Return user download cache, None if disabled.
+
+    Returns
+    -------
+    DownloadCache | None
+        Download cache as configured by environment, None if disabled
+    """
+    if os.environ.get(ENV_CACHE, "1") in ("", "0"):
+        return None
+
+    root = os.environ.get(ENV_CACHE_DIR)
+    if not root:
+        xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        root = str(Path(xdg_cache_home) / "barbican")
+
+    max_size = os.environ.get(ENV_CACHE_MAX_SIZE)
+    return DownloadCache(Path(root), parse_size(max_size) if max_size else DEFAULT_MAX_SIZE)
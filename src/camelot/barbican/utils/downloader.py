@@ -2,26 +2,89 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-import os
-import requests
-import sys
+"""Streaming file downloader.
+
+Files are downloaded through a connection pooled :py:class:`requests.Session`, w/ retries on
+transient errors (connection errors and 429, 5xx statuses). Content is streamed to a partial
+file, named after the URL, next to the destination file and renamed once complete. An
+interrupted transfer is resumed from the partial file w/ an HTTP Range request, either on retry
+or on the next download of the same URL.
 
+If requested, file digest is computed while streaming, thus verification does not need to read
+the downloaded file again. Content can also be forwarded, while streaming, to a consumer (e.g.
+an archive extractor) so that download and processing overlap.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+import os
 from pathlib import Path
-from urllib3.util import parse_url
-from tempfile import NamedTemporaryFile
-from rich.progress import (
-    BarColumn,
-    DownloadColumn,
-    Progress,
-    TaskID,
-    TextColumn,
-    TimeRemainingColumn,
-    TransferSpeedColumn,
-)
+
+import typing as T
 
 from ..console import console
 from ..logger import logger
 
+if T.TYPE_CHECKING:
+    import requests
+    from rich.progress import Progress, TaskID
+
+# XXX:
+#  requests and rich are imported on first download only, those are heavy
+#  dependencies that are not needed by most of barbican commands.
+
+MAX_ATTEMPTS: int = 5
+"""Maximum number of attempts for a given download, an attempt resumes where the previous stops."""
+
+_MIN_CHUNK_SIZE = 64 * 1024
+_MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Download:
+    """Downloaded file.
+
+    Attributes
+    ----------
+    path: Path
+        Downloaded file path
+    digest: str | None
+        File content hex digest, if requested
+    """
+
+    path: Path
+    digest: str | None = None
+
+
+class _Sink:
+    """Forward downloaded content to a consumer.
+
+    Each byte is forwarded exactly once and in order, whatever resume or restart happens
+    underneath, i.e. content already forwarded is skipped on restart and partial file
+    content not forwarded yet (e.g. downloaded by a previous run) is forwarded on resume.
+    """
+
+    def __init__(self, write: T.Callable[[bytes], T.Any]) -> None:
+        self._write = write
+        self._position = 0
+
+    def feed(self, data: bytes, offset: int) -> None:
+        """Forward data, starting at the given file offset, if not already forwarded."""
+        skip = self._position - offset
+        if skip < len(data):
+            self._write(data[skip:] if skip > 0 else data)
+            self._position = offset + len(data)
+
+    def catch_up(self, partial: Path, offset: int) -> None:
+        """Forward partial file content up to the given offset."""
+        if self._position >= offset:
+            return
+        with partial.open("rb") as f:
+            f.seek(self._position)
+            while self._position < offset:
+                self.feed(f.read(min(_MAX_CHUNK_SIZE, offset - self._position)), self._position)
+
 
 def _is_chunked(transfer_encoding: str | None) -> bool:
     return False if not transfer_encoding else transfer_encoding == "chunked"
@@ -34,8 +97,49 @@ def _get_attachment_filename(content_disposition: str | None) -> str | None:
     return None
 
 
-def _progress_bar() -> Progress:
-    return Progress(
+def _chunk_size(length: int) -> int:
+    """Return streaming chunk size for the given content length (0 if unknown).
+
+    Aim at ~256 chunks per file, i.e. few per call overhead on large files and still smooth
+    progress on small ones.
+    """
+    return min(max(length // 256, _MIN_CHUNK_SIZE), _MAX_CHUNK_SIZE)
+
+
+@lru_cache(maxsize=1)
+def _session() -> "requests.Session":
+    """Return the connection pooled session shared by all downloads."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
+
+    retry = Retry(
+        total=MAX_ATTEMPTS,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    session = requests.Session()
+    # up to one connection per concurrent package download
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=os.cpu_count() or 8, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # use curl user-agent to pass through anti-bot/anti-crawler reverse proxy on some
+    # source package repository
+    session.headers["user-agent"] = "curl"
+    return session
+
+
+def _progress_columns() -> tuple:
+    from rich.progress import (
+        BarColumn,
+        DownloadColumn,
+        TextColumn,
+        TimeRemainingColumn,
+        TransferSpeedColumn,
+    )
+
+    return (
         TextColumn("[bold blue]{task.fields[filename]}", justify="right"),
         BarColumn(bar_width=None),
         "[progress.percentage]{task.percentage:>3.1f}%",
@@ -45,82 +149,171 @@ def _progress_bar() -> Progress:
         TransferSpeedColumn(),
         "•",
         TimeRemainingColumn(),
-        console=console._console,
     )
 
 
-def _download(url: str, dest_dir: Path, progress: Progress, task_id: TaskID) -> Path:
-    console.message(f"[b]Downloading[/b] [i]{url}[/i]")
+def _partial_path(url: str, dest_dir: Path) -> Path:
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return dest_dir / f".{key}.part"
 
-    # use curl user-agent to pass through anti-bot/anti-crawler reverse proxy on some
-    # source package repository
-    r = requests.get(url, stream=True, headers={"user-agent": "curl"})
-    logger.debug(f"response status {r.status_code}")
-    r.raise_for_status()
 
-    rh = r.headers
-    logger.debug(f"response header: {rh}")
-    # content-length might not be present, e.g. while transfer encoding is chunked
-    length = rh.get("content-length") or 0
-    chunked = _is_chunked(rh.get("transfer-encoding"))
-    # if transfer is chunked use default chunk size, 1024 otherwise
-    chunk_size = 1024 if not chunked else None
+def _hash_partial(partial: Path, hash_algorithm: str) -> T.Any:
+    """Return hash object initialized w/ partial file content, i.e. on resume."""
+    hash = hashlib.new(hash_algorithm)
+    with partial.open("rb") as f:
+        while chunk := f.read(_MAX_CHUNK_SIZE):
+            hash.update(chunk)
+    return hash
+
+
+def _filename(url: str, response: "requests.Response") -> str:
+    from urllib3.util import parse_url
 
     # url filename and attachment filename may differ, use attachment filename
     # url otherwise
-    filename = _get_attachment_filename(rh.get("content-disposition"))
+    filename = _get_attachment_filename(response.headers.get("content-disposition"))
     if not filename:
         filename = Path(parse_url(url).path).name  # type: ignore
-    filepath = dest_dir / filename
-    progress.update(task_id, filename=filename, total=int(length))
-
-    # Download to a temporary file w/o deletion on close.
-    # The temporary file is deleted automatically if context manager exits
-    # before normal download termination.
-    # Once download is done, temp file is closed and renamed, one can use os.rename
-    # safely here as there is no cwd change.
-    # Once rename, delete flag is set to False to keep downloaded file on the filesystem.
-
-    # XXX:
-    #   `delete_on_close` is a py3.12+ kwargs.
-    #   As we still support py3.11, we need to workaround here.
-    #   To be removed when python 3.11 support will be dropped.
-    kwargs = dict()
-    if sys.version_info.major == 3 and sys.version_info.minor >= 12:
-        kwargs["delete_on_close"] = False
-
-    with NamedTemporaryFile("wb", dir=dest_dir, **kwargs) as f:  # type: ignore
-        logger.debug(f"downloading to temporary file {f.name}")
-        progress.start_task(task_id)
+    return filename
 
-        for chunk in r.iter_content(chunk_size=chunk_size):
-            f.write(chunk)
 
-            # In case of chunked encoding, iter_content might be empty
-            if len(chunk) is None:
-                continue
+def _attempt(
+    url: str,
+    partial: Path,
+    hash_algorithm: str | None,
+    sink: _Sink | None,
+    progress: "Progress",
+    task_id: "TaskID",
+) -> tuple[str, T.Any]:
+    """Download (or resume) url content to partial file, return file name and hash object."""
+    offset = partial.stat().st_size if partial.exists() else 0
+    headers = {"range": f"bytes={offset}-"} if offset else {}
+
+    with _session().get(url, stream=True, headers=headers, timeout=30) as r:
+        logger.debug(f"response status {r.status_code}")
+        if offset and r.status_code == 416:
+            # Range not satisfiable, partial file is stale, start over
+            logger.debug("stale partial file, start over")
+            partial.unlink()
+            offset = -1
+        else:
+            r.raise_for_status()
+            filename, hash = _stream(
+                url, r, partial, offset, hash_algorithm, sink, progress, task_id
+            )
+
+    if offset < 0:
+        return _attempt(url, partial, hash_algorithm, sink, progress, task_id)
+    return filename, hash
+
+
+def _stream(
+    url: str,
+    r: "requests.Response",
+    partial: Path,
+    offset: int,
+    hash_algorithm: str | None,
+    sink: _Sink | None,
+    progress: "Progress",
+    task_id: "TaskID",
+) -> tuple[str, T.Any]:
+    """Stream response content to partial file from offset, return file name and hash object."""
+    rh = r.headers
+    logger.debug(f"response header: {rh}")
+    if offset and r.status_code != 206:
+        logger.debug("server does not support range request, start over")
+        offset = 0
+
+    # content-length might not be present, e.g. while transfer encoding is chunked
+    length = int(rh.get("content-length") or 0)
+    # if transfer is chunked use chunks as received
+    chunked = _is_chunked(rh.get("transfer-encoding"))
+    chunk_size = _chunk_size(length) if not chunked else None
+
+    filename = _filename(url, r)
+    progress.update(task_id, filename=filename, total=(offset + length) or None, completed=offset)
+    progress.start_task(task_id)
 
+    hash = None
+    if hash_algorithm is not None:
+        hash = hashlib.new(hash_algorithm) if not offset else _hash_partial(partial, hash_algorithm)
+
+    if sink is not None:
+        sink.catch_up(partial, offset)
+
+    with partial.open("ab" if offset else "wb") as f:
+        for chunk in r.iter_content(chunk_size=chunk_size):
+            if sink is not None:
+                sink.feed(chunk, f.tell())
+            f.write(chunk)
+            if hash is not None:
+                hash.update(chunk)
             progress.update(task_id, advance=len(chunk))
         if length == 0:
             progress.update(task_id, total=f.tell())
 
-        # XXX:
-        #   Note that, as a side effect, if there is a crash between file close and rename
-        #   operations, the temporary file will not be removed in python 3.11 and prior version
-        if sys.version_info.major == 3 and sys.version_info.minor < 12:
-            f.delete = False
-            f._closer.delete = False
+    return filename, hash
+
+
+def _download(
+    url: str,
+    dest_dir: Path,
+    hash_algorithm: str | None,
+    sink: _Sink | None,
+    progress: "Progress",
+    task_id: "TaskID",
+) -> Download:
+    from requests.exceptions import ChunkedEncodingError, ConnectionError, Timeout
+
+    console.message(f"[b]Downloading[/b] [i]{url}[/i]")
+
+    # Download to a partial file, named after the URL, and rename once complete.
+    # Partial file is kept on failure, the next attempt resumes from there.
+    partial = _partial_path(url, dest_dir)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            filename, hash = _attempt(url, partial, hash_algorithm, sink, progress, task_id)
+            break
+        except (ConnectionError, Timeout, ChunkedEncodingError) as e:
+            # XXX:
+            #  transient errors before response are retried by the session, those are
+            #  raised while streaming response content.
+            if attempt == MAX_ATTEMPTS:
+                raise
+            logger.warning(f"{url}: {e}, resuming ({attempt}/{MAX_ATTEMPTS})")
+
+    filepath = dest_dir / filename
+    os.replace(partial, filepath)
+    return Download(filepath, hash.hexdigest() if hash is not None else None)
+
 
-        f.close()
-        os.rename(f.name, filepath)
-        # Once renamed to final download name, set delete flag to False and exit context manager
-        f.delete = False
-        f._closer.delete = False
-    return filepath
+def download(
+    url: str,
+    dest_dir: Path,
+    hash_algorithm: str | None = None,
+    sink: T.Callable[[bytes], T.Any] | None = None,
+) -> Download:
+    """Download a file.
 
+    Parameters
+    ----------
+    url: str
+        file URL
+    dest_dir: Path
+        destination directory
+    hash_algorithm: str | None
+        if given, file digest w/ this algorithm (see :py:func:`hashlib.new`) is computed while
+        downloading
+    sink: T.Callable[[bytes], T.Any] | None
+        if given, file content is forwarded, in order, to this callable while downloading
 
-def download_file(url: str, dest_dir: Path) -> Path:
-    progress = _progress_bar()
-    with progress:
+    Returns
+    -------
+    Download
+        Downloaded file path and digest
+    """
+    with console.progress(*_progress_columns()) as progress:
         task_id = progress.add_task("download", start=False, filename="")
-        return _download(url, dest_dir, progress, task_id)
+        return _download(
+            url, dest_dir, hash_algorithm, _Sink(sink) if sink else None, progress, task_id
+        )
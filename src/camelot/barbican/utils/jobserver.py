@@ -0,0 +1,197 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""GNU make compatible jobserver.
+
+Some build steps run their own parallel build (e.g. `meson compile` runs a nested ninja and
+`cargo build` runs many rustc), each one choosing its own parallelism independently of the outer
+ninja one. The jobserver bounds the total number of concurrent jobs across the whole process
+tree: the outer build owns a fixed number of job tokens and every (nested) build tool that is
+a jobserver client (e.g. ninja >= 1.13, cargo, GNU make >= 4.4) acquires a token before
+starting a job and releases it once done.
+
+The jobserver uses the GNU make 4.4 FIFO protocol, i.e. a named pipe preloaded w/ `jobs - 1`
+tokens (one byte each), each client implicitly owning one extra token (the one its parent
+acquired to run it), advertised to children processes through the `MAKEFLAGS` environment
+variable (`-j<jobs> --jobserver-auth=fifo:<path>`).
+"""
+
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import tempfile
+from types import TracebackType
+
+from ..logger import logger
+
+ENV_MAKEFLAGS: str = "MAKEFLAGS"
+"""Environment variable used to advertise the jobserver to clients."""
+
+_TOKEN = b"+"
+
+_NINJA_CLIENT_VERSION = (1, 13)
+
+
+class JobServer:
+    """FIFO based jobserver.
+
+    The FIFO is created, and preloaded w/ tokens, on context entry and removed on exit.
+
+    Parameters
+    ----------
+    jobs: int
+        maximum number of concurrent jobs
+
+    Raises
+    ------
+    ValueError
+        If jobs is lower than 1.
+    """
+
+    def __init__(self, jobs: int) -> None:
+        if jobs < 1:
+            raise ValueError("jobserver needs at least one job")
+        self._jobs = jobs
+        self._tmpdir: Path | None = None
+        self._fd: int = -1
+
+    @property
+    def jobs(self) -> int:
+        return self._jobs
+
+    @property
+    def path(self) -> Path:
+        """Jobserver FIFO path.
+
+        Returns
+        -------
+        Path
+            FIFO path
+
+        Raises
+        ------
+        RuntimeError
+            If jobserver is not started.
+        """
+        if self._tmpdir is None:
+            raise RuntimeError("jobserver not started")
+        return self._tmpdir / "jobserver.fifo"
+
+    @property
+    def makeflags(self) -> str:
+        """Jobserver `MAKEFLAGS` value."""
+        return f"-j{self._jobs} --jobserver-auth=fifo:{self.path}"
+
+    def environ(self, env: dict[str, str] | None = None) -> dict[str, str]:
+        """Return a copy of the given environment w/ jobserver advertised.
+
+        Parameters
+        ----------
+        env: dict[str, str] | None
+            base environment, default to current process environment
+
+        Returns
+        -------
+        dict[str, str]
+            Environment for jobserver clients
+        """
+        env = dict(os.environ if env is None else env)
+        env[ENV_MAKEFLAGS] = self.makeflags
+        return env
+
+    def __enter__(self) -> "JobServer":
+        self._tmpdir = Path(tempfile.mkdtemp(prefix="barbican-jobserver-"))
+        try:
+            os.mkfifo(self.path, 0o600)
+            # XXX:
+            #  FIFO content is discarded once no one holds it open, a read/write descriptor
+            #  is held while the jobserver is running (and never blocks on open).
+            self._fd = os.open(self.path, os.O_RDWR | os.O_NONBLOCK)
+            os.write(self._fd, _TOKEN * (self._jobs - 1))
+        except BaseException:
+            self._cleanup()
+            raise
+        logger.debug(f"jobserver started, {self._jobs} jobs ({self.path})")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        tokens = self.available_tokens()
+        if exc_type is None and tokens != self._jobs - 1:
+            logger.warning(f"jobserver: {self._jobs - 1 - tokens} token(s) not released")
+        self._cleanup()
+
+    def _cleanup(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    def available_tokens(self) -> int:
+        """Return the number of tokens currently available, i.e. not held by any client.
+
+        Available tokens are drained and then written back, this is meant to be called once
+        clients are done (e.g. for token leak detection).
+
+        Returns
+        -------
+        int
+            Available tokens
+        """
+        tokens = b""
+        try:
+            while chunk := os.read(self._fd, self._jobs):
+                tokens += chunk
+        except BlockingIOError:
+            pass
+        if tokens:
+            os.write(self._fd, tokens)
+        return len(tokens)
+
+    def run(self, cmd: list[str], **kwargs) -> int:
+        """Run a command as jobserver client.
+
+        Parameters
+        ----------
+        cmd: list[str]
+            command line
+        **kwargs
+            extra :py:func:`subprocess.run` arguments
+
+        Returns
+        -------
+        int
+            Command exit code
+        """
+        return subprocess.run(cmd, env=self.environ(kwargs.pop("env", None)), **kwargs).returncode
+
+
+def ninja_is_client(ninja: str) -> bool:
+    """Return True if the given ninja is a jobserver client, i.e. ninja >= 1.13.
+
+    Parameters
+    ----------
+    ninja: str
+        ninja executable path
+
+    Returns
+    -------
+    bool
+        True if ninja acquires job tokens from the jobserver advertised in `MAKEFLAGS`
+    """
+    proc = subprocess.run([ninja, "--version"], capture_output=True, text=True)
+    version: list[int] = []
+    # e.g. `1.13.2.git.kitware.jobserver-pipe-1`
+    for part in proc.stdout.strip().split(".")[:2]:
+        if not part.isdigit():
+            return False
+        version.append(int(part))
+    return tuple(version) >= _NINJA_CLIENT_VERSION
@@ -2,16 +2,23 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-from dataclasses import dataclass, fields, field, asdict
+from dataclasses import dataclass, field
 from enum import Enum, StrEnum, unique, auto, IntFlag
-from types import GenericAlias
+import heapq
 
 import json
 from pathlib import Path
 import typing as T
 
+from . import align_to, write_if_changed
 
-@dataclass(kw_only=True, frozen=True)
+
+def _int(value: int | str) -> int:
+    # Integers are serialized as hex strings
+    return int(value, 16) if isinstance(value, str) else value
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
 class Region:
     @unique
     class Type(StrEnum):
@@ -29,20 +36,29 @@ class Region:
     permission: Permission = Permission(0)
     start_address: int
     size: int
+    pool: str = ""
+    # MPU subregion disable mask, bit n set if subregion n is disabled (PMSAv7 only)
+    subregion_mask: int = 0
     subregions: list["Region"] = field(default_factory=list)
 
     def __post_init__(self) -> None:
-        for f in fields(self):
-            value = getattr(self, f.name)
-            value_type = T.cast(type, f.type)
-            if value_type is int and isinstance(value, str):
-                object.__setattr__(self, f.name, int(value, 16))
-            elif value_type == GenericAlias(list, ("Region",)) and all(
-                isinstance(e, dict) for e in value
-            ):
-                object.__setattr__(self, f.name, [Region(**e) for e in value])
-            elif issubclass(value_type, Enum):
-                object.__setattr__(self, f.name, value_type(value))
+        # Serialized values (i.e. hex strings, enum values and dict) are accepted too
+        if not isinstance(self.type, Region.Type):
+            object.__setattr__(self, "type", Region.Type(self.type))
+        if not isinstance(self.permission, Region.Permission):
+            object.__setattr__(self, "permission", Region.Permission(self.permission))
+        if isinstance(self.start_address, str):
+            object.__setattr__(self, "start_address", int(self.start_address, 16))
+        if isinstance(self.size, str):
+            object.__setattr__(self, "size", int(self.size, 16))
+        if isinstance(self.subregion_mask, str):
+            object.__setattr__(self, "subregion_mask", int(self.subregion_mask, 16))
+        if not all(isinstance(r, Region) for r in self.subregions):
+            object.__setattr__(
+                self,
+                "subregions",
+                [r if isinstance(r, Region) else Region.from_dict(r) for r in self.subregions],
+            )
 
     @staticmethod
     def dict_factory(x):
@@ -59,12 +75,38 @@ class Region:
 
     @classmethod
     def from_dict(cls, keyvals: dict) -> "Region":
-        return cls(**keyvals)
+        """Create region from its serialized form.
+
+        This is the deserialization fast path, values are decoded once, here, and the region is
+        built w/o going through `__init__` and `__post_init__` conversions.
+        """
+        region = object.__new__(cls)
+        _set = object.__setattr__
+        _set(region, "name", keyvals["name"])
+        _set(region, "type", _REGION_TYPES[keyvals["type"]])
+        _set(region, "permission", _REGION_PERMISSIONS[keyvals.get("permission", 0)])
+        _set(region, "start_address", _int(keyvals["start_address"]))
+        _set(region, "size", _int(keyvals["size"]))
+        _set(region, "pool", keyvals.get("pool", ""))
+        _set(region, "subregion_mask", _int(keyvals.get("subregion_mask", 0)))
+        _set(region, "subregions", [cls.from_dict(r) for r in keyvals.get("subregions", ())])
+        return region
+
+    def asdict(self) -> dict[str, T.Any]:
+        """Generate serialized form, same as `dataclasses.asdict` w/ :py:meth:`dict_factory`."""
+        return {
+            "name": self.name,
+            "type": self.type.value,
+            "permission": self.permission.value,
+            "start_address": hex(self.start_address),
+            "size": hex(self.size),
+            "pool": self.pool,
+            "subregion_mask": hex(self.subregion_mask),
+            "subregions": [r.asdict() for r in self.subregions],
+        }
 
     def save(self, filepath: Path) -> None:
-        data = asdict(self, dict_factory=self.dict_factory)
-        with filepath.open("w") as f:
-            json.dump(data, f, indent=4)
+        write_if_changed(filepath, json.dumps(self.asdict(), indent=4))
 
     @classmethod
     def load(cls, filepath: Path) -> "Region":
@@ -73,21 +115,177 @@ class Region:
             return cls.from_dict(data)
 
 
+# Enum lookup tables, enum constructors are comparatively slow
+_REGION_TYPES: dict[str, Region.Type] = {t.value: t for t in Region.Type}
+_REGION_PERMISSIONS: dict[int, Region.Permission] = {
+    p: Region.Permission(p) for p in range(1 << len(Region.Permission))
+}
+
+
+def free_ranges(
+    span: tuple[int, int], occupied: T.Iterable[tuple[int, int]]
+) -> list[tuple[int, int]]:
+    """Return free address ranges in span.
+
+    Parameters
+    ----------
+    span: tuple[int, int]
+        start and end (excluded) addresses
+    occupied: T.Iterable[tuple[int, int]]
+        start and end (excluded) addresses of occupied ranges, in any order, may overlap and/or
+        be partially out of span
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        Free ranges start and end (excluded) addresses, sorted by address
+    """
+    start, end = span
+    ranges: list[tuple[int, int]] = []
+    candidate = start
+    for range_start, range_end in sorted(occupied):
+        if range_start >= end:
+            break
+        if range_start > candidate:
+            ranges.append((candidate, range_start))
+        candidate = max(candidate, range_end)
+    if candidate < end:
+        ranges.append((candidate, end))
+    return ranges
+
+
 @dataclass
 class Layout:
     """Memory Layout.
 
     Memory layout is a user defined list that can only accepts :py:class:`MemoryRegion` items.
+    Applications memory pools are recorded as regions too, named after the pool, and
+    applications regions reference their pool by name (see :py:attr:`Region.pool`).
     """
 
     regions: list[Region] = field(default_factory=list)
+    pools: list[Region] = field(default_factory=list)
 
     def append(self, region: Region) -> None:
         self.regions.append(region)
 
+    def asdict(self) -> dict[str, T.Any]:
+        return {
+            "regions": [r.asdict() for r in self.regions],
+            "pools": [p.asdict() for p in self.pools],
+        }
+
     def save(self, filepath: Path) -> None:
-        data = asdict(self, dict_factory=Region.dict_factory)
-        with filepath.open("w") as f:
-            json.dump(data, f, indent=4)
+        write_if_changed(filepath, json.dumps(self.asdict(), indent=4))
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "Layout":
+        """Create layout from its json serialized form."""
+        keyvals = json.loads(data)
+        return cls(
+            regions=[Region.from_dict(r) for r in keyvals["regions"]],
+            pools=[Region.from_dict(p) for p in keyvals.get("pools", [])],
+        )
+
+    @classmethod
+    def load(cls, filepath: Path) -> "Layout":
+        return cls.from_json(filepath.resolve(strict=True).read_bytes())
+
+    def get_region(self, name: str, type: Region.Type) -> Region:
+        """Return the named region of the given type.
+
+        Parameters
+        ----------
+        name: str
+            Region name
+        type: Region.Type
+            Region type
+
+        Returns
+        -------
+        Region
+            The first region that matches
+
+        Raises
+        ------
+        ValueError
+            No such region in layout
+        """
+        for region in self.regions:
+            if region.name == name and region.type == type:
+                return region
+        raise ValueError(f"no {type} region named {name} in layout")
+
+    def overlaps(self) -> list[tuple[Region, Region]]:
+        """Return overlapping regions.
+
+        Regions are swept by start address, with a heap of regions still open at that address,
+        thus this is O(n log n + k), k being the number of overlapping pairs.
+
+        Returns
+        -------
+        list[tuple[Region, Region]]
+            Overlapping regions pairs, the lowest start address first, empty if none
+        """
+        pairs: list[tuple[Region, Region]] = []
+        active: list[tuple[int, int, Region]] = []
+        regions = sorted(
+            (r for r in self.regions if r.size > 0), key=lambda r: (r.start_address, r.size)
+        )
+        for index, region in enumerate(regions):
+            while active and active[0][0] <= region.start_address:
+                heapq.heappop(active)
+            pairs.extend((other, region) for _, _, other in active)
+            heapq.heappush(active, (region.start_address + region.size, index, region))
+        return pairs
+
+    def free_ranges(self, pool: Region) -> list[tuple[int, int]]:
+        """Return free address ranges in the given pool.
+
+        Parameters
+        ----------
+        pool: Region
+            memory pool, see :py:attr:`pools`
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            Free ranges start and end (excluded) addresses, sorted by address
+        """
+        return free_ranges(
+            (pool.start_address, pool.start_address + pool.size),
+            ((r.start_address, r.start_address + r.size) for r in self.regions),
+        )
+
+    def find_fit(
+        self,
+        size: int,
+        align: int = 1,
+        pool: Region | None = None,
+        fixup: T.Callable[[int, int], tuple[int, int]] | None = None,
+    ) -> int | None:
+        """Return the lowest free start address for the given size and alignment.
+
+        Parameters
+        ----------
+        size: int
+            requested size
+        align: int
+            requested start address alignment
+        pool: Region | None
+            memory pool to search in, all pools of that layout, in order, if None
+        fixup: T.Callable[[int, int], tuple[int, int]] | None
+            region fixup (e.g. MPU alignment), returning start address and size of a region at a
+            given address, used instead of `align` if any
 
-    # def load
+        Returns
+        -------
+        int | None
+            Start address of the first fit, None if there is no room left
+        """
+        for candidate_pool in [pool] if pool else self.pools:
+            for start, end in self.free_ranges(candidate_pool):
+                saddr, fixed_size = fixup(start, size) if fixup else (align_to(start, align), size)
+                if saddr + fixed_size <= end:
+                    return saddr
+        return None
@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import ClassVar
 
 from ..console import console
+from . import write_if_changed
 
 
 @unique
@@ -94,8 +95,7 @@ class ProjectPath:
     def save(self) -> None:
         """Save project path as a json file in project private build dir."""
         data = asdict(self, dict_factory=self.asdict_factory)
-        with self.save_full_path.open("w") as f:
-            json.dump(data, f, indent=4)
+        write_if_changed(self.save_full_path, json.dumps(data, indent=4))
 
     @classmethod
     def load(cls, build_dir: Path) -> "ProjectPath":
@@ -181,6 +181,11 @@ class ProjectPath:
     def private_build_dir(self) -> Path:
         return self.build_dir / DirName.Camelot_Private.value
 
+    @property
+    @lru_cache
+    def elfinfo_cache_dir(self) -> Path:
+        return self.private_build_dir / "elfinfo"
+
     @property
     @lru_cache
     def target_bin_dir(self) -> Path:
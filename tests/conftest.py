@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+PACKAGE_METADATA = {
+    "type": "camelot application",
+    "task": {"stack_size": "0x400", "heap_size": "0x200"},
+}
+
+# Camelot application like layout, w/ flash and ram sections and symbols used for relocation
+_ASM = """
+.section .note.package,"",@note
+.long 4, {descsz}, 1
+.asciz "FDO"
+.ascii {desc}
+.byte 0
+.section .text,"ax"
+.globl _start
+_start:
+.fill 64, 1, 0x90
+.section .ARM,"a"
+.long 1, 2, 3, 4
+.section .svcexchange,"aw"
+.zero 128
+.section .gotdata,"aw"
+.long 0x20000010, 0x08000004, 0x20000090, 0
+.section .data,"aw"
+.long 42, 43
+.section .bss,"aw",@nobits
+.zero 32
+"""
+
+_LDSCRIPT = """
+SECTIONS {
+  .text 0x08000000 : { _stext = .; *(.text) }
+  .ARM : { *(.ARM) _erom = .; }
+  .svcexchange 0x20000000 : AT(_erom) { *(.svcexchange) }
+  .got : { *(.gotdata) }
+  _sigot = LOADADDR(.got);
+  .data : { *(.data) }
+  .bss : { *(.bss) _sheap = .; _eheap = .; }
+  .note.package 0 : { KEEP(*(.note.package)) }
+}
+"""
+
+
+@pytest.fixture(scope="module", params=[32, 64], ids=["elf32", "elf64"])
+def app_elf(request, tmp_path_factory):
+    if not shutil.which("as") or not shutil.which("ld"):
+        pytest.skip("requires GNU assembler and linker")
+    bits = request.param
+    workdir = tmp_path_factory.mktemp(f"elf{bits}")
+    desc = json.dumps(PACKAGE_METADATA)
+    (workdir / "app.s").write_text(_ASM.format(descsz=len(desc) + 1, desc=json.dumps(desc)))
+    (workdir / "app.ld").write_text(_LDSCRIPT)
+    subprocess.run(["as", f"--{bits}", "-o", "app.o", "app.s"], cwd=workdir, check=True)
+    emulation = "elf_i386" if bits == 32 else "elf_x86_64"
+    subprocess.run(
+        ["ld", "-m", emulation, "-T", "app.ld", "-o", "app.elf", "app.o"], cwd=workdir, check=True
+    )
+    return workdir / "app.elf"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def download_cache_dir(tmp_path_factory):
+    """Do not pollute user download cache."""
+    with pytest.MonkeyPatch.context() as mp:
+        cache_dir = tmp_path_factory.mktemp("cache")
+        mp.setenv("BARBICAN_CACHE_DIR", str(cache_dir))
+        yield cache_dir
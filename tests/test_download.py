@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import threading
+
+import pytest
+
+from camelot.barbican.console import console
+from camelot.barbican.project import Project
+
+
+class FakePackage:
+    def __init__(self, name, barrier=None, error=None):
+        self.name = name
+        self.barrier = barrier
+        self.error = error
+        self.downloaded = False
+
+    def download(self):
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        # Concurrent progress displays must not raise (rich allows only one live display)
+        with console.progress() as progress:
+            progress.add_task(self.name, total=1)
+        with console.status(self.name):
+            pass
+        self.downloaded = True
+
+
+def _project(packages):
+    project = object.__new__(Project)
+    project._packages = packages
+    return project
+
+
+def test_download_parallel():
+    # Would dead lock (then timeout) if packages were processed serially
+    barrier = threading.Barrier(3)
+    packages = [FakePackage(f"pkg{i}", barrier) for i in range(3)]
+    timings = _project(packages)._run_packages("download", jobs=3)
+    assert all(p.downloaded for p in packages)
+    assert sorted(timings) == ["pkg0", "pkg1", "pkg2"]
+    assert not barrier.broken
+
+
+def test_download_serial():
+    packages = [FakePackage(f"pkg{i}") for i in range(4)]
+    timings = _project(packages)._run_packages("download", jobs=1)
+    assert list(timings) == ["pkg0", "pkg1", "pkg2", "pkg3"]
+
+
+def test_download_error():
+    packages = [FakePackage("pkg0", error=RuntimeError("boom"))]
+    packages += [FakePackage(f"pkg{i}") for i in range(1, 4)]
+    with pytest.raises(RuntimeError, match="boom"):
+        _project(packages)._run_packages("download", jobs=1)
+    # pending packages are cancelled on first failure
+    assert not any(p.downloaded for p in packages)
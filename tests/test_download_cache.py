@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+import os
+
+import pytest
+
+from git import Repo
+
+from camelot.barbican.scm import scm_create
+from camelot.barbican.utils import cache
+from camelot.barbican.utils.cache import DownloadCache, parse_size
+from camelot.barbican.utils.downloader import Download
+
+
+@pytest.fixture
+def fake_download(monkeypatch):
+    calls = []
+
+    def _download(url, dest_dir, hash_algorithm=None, sink=None):
+        calls.append(url)
+        filepath = dest_dir / url.rsplit("/", 1)[-1]
+        filepath.write_bytes(b"x" * 1024)
+        return Download(filepath, "digest" if hash_algorithm else None)
+
+    monkeypatch.setattr(cache, "download", _download)
+    return calls
+
+
+@pytest.mark.parametrize(
+    "size,expected", [("4096", 4096), ("2k", 2048), ("512M", 512 << 20), ("10GB", 10 << 30)]
+)
+def test_parse_size(size, expected):
+    assert parse_size(size) == expected
+
+
+def test_fetch_file(tmp_path, fake_download):
+    dl_cache = DownloadCache(tmp_path / "cache")
+    for project in ("a", "b"):
+        dl_dir = tmp_path / project
+        dl_dir.mkdir()
+        filepath = dl_cache.fetch_file("https://example.com/src.tar.gz", dl_dir).path
+        assert filepath == dl_dir / "src.tar.gz"
+        assert filepath.read_bytes() == b"x" * 1024
+
+    # downloaded once, materialized w/ hardlinks
+    assert fake_download == ["https://example.com/src.tar.gz"]
+    assert (tmp_path / "a" / "src.tar.gz").samefile(tmp_path / "b" / "src.tar.gz")
+
+
+def test_fetch_file_digest(tmp_path, fake_download):
+    dl_cache = DownloadCache(tmp_path / "cache")
+    url = "https://example.com/src.tar.gz"
+    # digest computed while downloading is stored alongside cached file
+    assert dl_cache.fetch_file(url, tmp_path, "sha256").digest == "digest"
+    assert dl_cache.fetch_file(url, tmp_path, "sha256").digest == "digest"
+    # not stored yet, computed from file content
+    expected = hashlib.sha1(b"x" * 1024).hexdigest()
+    assert dl_cache.fetch_file(url, tmp_path, "sha1").digest == expected
+    assert dl_cache.fetch_file(url, tmp_path).digest is None
+    assert len(fake_download) == 1
+
+
+def test_invalidate(tmp_path, fake_download):
+    dl_cache = DownloadCache(tmp_path / "cache")
+    url = "https://example.com/src.tar.gz"
+    dl_cache.fetch_file(url, tmp_path)
+    dl_cache.invalidate(DownloadCache.FILES, url)
+    assert not dl_cache.entry_path(DownloadCache.FILES, url).exists()
+    dl_cache.fetch_file(url, tmp_path)
+    assert fake_download == [url, url]
+
+
+def test_evict_lru(tmp_path, fake_download):
+    dl_cache = DownloadCache(tmp_path / "cache", max_size=2048)
+    urls = [f"https://example.com/{i}.tar.gz" for i in range(3)]
+    for i, url in enumerate(urls):
+        dl_cache.fetch_file(url, tmp_path)
+        entry = dl_cache.entry_path(DownloadCache.FILES, url)
+        os.utime(entry, ns=(i * 10**9, i * 10**9))
+
+    # entry #0, the least recently used one, has been evicted on entry #2 insertion
+    dl_cache.fetch_file(urls[1], tmp_path)
+    assert [e.name for e in dl_cache.entries()] == [DownloadCache.key(u) for u in urls[:0:-1]]
+    assert len(fake_download) == 3
+
+
+def test_evict_skip_locked(tmp_path, fake_download):
+    dl_cache = DownloadCache(tmp_path / "cache", max_size=1024)
+    url = "https://example.com/0.tar.gz"
+    dl_cache.fetch_file(url, tmp_path)
+    with dl_cache.lock(dl_cache.entry_path(DownloadCache.FILES, url)):
+        # least recently used entry is in use, the next one is evicted
+        dl_cache.fetch_file("https://example.com/1.tar.gz", tmp_path)
+        assert [e.name for e in dl_cache.entries()] == [DownloadCache.key(url)]
+    assert (tmp_path / "1.tar.gz").exists()
+
+
+def test_git_mirror(tmp_path, download_cache_dir):
+    origin = Repo.init(tmp_path / "origin")
+    with origin.config_writer(config_level="repository") as writer:
+        writer.set_value("user", "name", "CI Joe")
+        writer.set_value("user", "email", "ci.joe@ci.com")
+    (tmp_path / "origin" / "README").write_text("readme")
+    origin.index.add("README")
+    commit = origin.index.commit("initial commit")
+
+    url = str(origin.git_dir)
+    config = {"scm": {"git": {"uri": url, "revision": str(commit)}}}
+    repo = scm_create("first", tmp_path, tmp_path / "first", config)
+    repo.download()
+    mirror = DownloadCache(download_cache_dir).entry_path(DownloadCache.GIT, url)
+    assert Repo(mirror).bare
+    assert repo._repo.remote().url == url
+
+    # pinned commit already mirrored, no need to reach upstream
+    (tmp_path / "origin.bak").mkdir()
+    os.rename(tmp_path / "origin", tmp_path / "origin.bak" / "origin")
+    repo = scm_create("second", tmp_path, tmp_path / "second", config)
+    repo.download()
+    assert repo._repo.head.commit == commit
+    assert repo._repo.remote().url == url
@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import threading
+
+import pytest
+
+from camelot.barbican.utils import downloader
+
+PAYLOAD = os.urandom(300 * 1024)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.headers.get("range"))
+
+        if server.errors > 0:
+            server.errors -= 1
+            self.send_response(503)
+            self.send_header("content-length", "0")
+            self.end_headers()
+            return
+
+        start = 0
+        range_header = self.headers.get("range")
+        if range_header and server.ranges:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            if start >= len(PAYLOAD):
+                self.send_response(416)
+                self.send_header("content-length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("content-range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+
+        body = PAYLOAD[start:]
+        self.send_header("content-length", str(len(body)))
+        if server.attachment:
+            self.send_header("content-disposition", f"attachment; filename={server.attachment}")
+        self.end_headers()
+
+        if server.truncate > 0:
+            # drop connection in the middle of the transfer
+            server.truncate -= 1
+            self.wfile.write(body[: len(body) // 3])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.requests = []
+    httpd.errors = 0
+    httpd.truncate = 0
+    httpd.ranges = True
+    httpd.attachment = None
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(server, path="/pkg/src.tar.gz"):
+    return f"http://127.0.0.1:{server.server_port}{path}"
+
+
+def test_download(server, tmp_path):
+    dl = downloader.download(_url(server), tmp_path, "sha256")
+    assert dl.path == tmp_path / "src.tar.gz"
+    assert dl.path.read_bytes() == PAYLOAD
+    assert dl.digest == hashlib.sha256(PAYLOAD).hexdigest()
+    assert server.requests == [None]
+    # no partial file left
+    assert list(tmp_path.iterdir()) == [dl.path]
+
+
+def test_download_no_digest(server, tmp_path):
+    assert downloader.download(_url(server), tmp_path).digest is None
+
+
+def test_download_attachment(server, tmp_path):
+    server.attachment = "archive.tar.gz"
+    dl = downloader.download(_url(server, "/download?id=42"), tmp_path)
+    assert dl.path == tmp_path / "archive.tar.gz"
+
+
+def test_resume_on_error(server, tmp_path):
+    server.truncate = 2
+    dl = downloader.download(_url(server), tmp_path, "sha256")
+    assert dl.path.read_bytes() == PAYLOAD
+    assert dl.digest == hashlib.sha256(PAYLOAD).hexdigest()
+    # resumed twice, from received chunks
+    assert server.requests[0] is None
+    offsets = [int(r.removeprefix("bytes=").rstrip("-")) for r in server.requests[1:]]
+    assert len(offsets) == 2 and 0 < offsets[0] < offsets[1] < len(PAYLOAD)
+
+
+def test_resume_partial_file(server, tmp_path):
+    url = _url(server)
+    downloader._partial_path(url, tmp_path).write_bytes(PAYLOAD[:1000])
+    dl = downloader.download(url, tmp_path, "sha256")
+    assert dl.path.read_bytes() == PAYLOAD
+    assert dl.digest == hashlib.sha256(PAYLOAD).hexdigest()
+    assert server.requests == ["bytes=1000-"]
+
+
+def test_resume_unsupported(server, tmp_path):
+    server.ranges = False
+    url = _url(server)
+    downloader._partial_path(url, tmp_path).write_bytes(b"garbage")
+    dl = downloader.download(url, tmp_path, "sha256")
+    assert dl.path.read_bytes() == PAYLOAD
+    assert dl.digest == hashlib.sha256(PAYLOAD).hexdigest()
+
+
+def test_resume_stale(server, tmp_path):
+    url = _url(server)
+    downloader._partial_path(url, tmp_path).write_bytes(PAYLOAD + b"garbage")
+    dl = downloader.download(url, tmp_path)
+    assert dl.path.read_bytes() == PAYLOAD
+    assert server.requests == [f"bytes={len(PAYLOAD) + 7}-", None]
+
+
+def test_retry_status(server, tmp_path):
+    server.errors = 1
+    dl = downloader.download(_url(server), tmp_path)
+    assert dl.path.read_bytes() == PAYLOAD
+    assert server.requests == [None, None]
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_sink_resume_on_error(server, tmp_path, ranges):
+    # content is forwarded once, whatever the server resumes or restarts transfer
+    server.truncate = 2
+    server.ranges = ranges
+    received = bytearray()
+    dl = downloader.download(_url(server), tmp_path, sink=received.extend)
+    assert dl.path.read_bytes() == PAYLOAD
+    assert bytes(received) == PAYLOAD
+
+
+def test_sink_resume_partial_file(server, tmp_path):
+    url = _url(server)
+    downloader._partial_path(url, tmp_path).write_bytes(PAYLOAD[:1000])
+    received = bytearray()
+    downloader.download(url, tmp_path, sink=received.extend)
+    assert bytes(received) == PAYLOAD
+    assert server.requests == ["bytes=1000-"]
+
+
+@pytest.mark.parametrize(
+    "length,expected",
+    [(0, 64 * 1024), (1024, 64 * 1024), (64 * 1024 * 1024, 256 * 1024), (1 << 40, 4 << 20)],
+)
+def test_chunk_size(length, expected):
+    assert downloader._chunk_size(length) == expected
@@ -0,0 +1,40 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from argparse import Namespace
+import json
+
+import pytest
+
+from camelot.barbican import cmd_dumpspecs
+
+REGION = {
+    "name": "app1",
+    "type": "text",
+    "permission": 5,
+    "start_address": "0x8010000",
+    "size": "0x1000",
+}
+
+
+@pytest.mark.parametrize(
+    "content,error",
+    [
+        ("{", "Invalid JSON"),
+        (json.dumps({}), "Invalid layout"),
+        (json.dumps({"regions": [{"name": "app1"}]}), "Invalid layout"),
+        (json.dumps({"regions": [{**REGION, "size": "0xZZ"}]}), "Invalid layout"),
+        (json.dumps({"regions": [{**REGION, "type": "rom"}]}), "Invalid layout"),
+        (json.dumps({"regions": ["app1"]}), "Invalid layout"),
+    ],
+)
+def test_invalid_layout(tmp_path, monkeypatch, capsys, content, error):
+    monkeypatch.setattr(cmd_dumpspecs, "Project", lambda _: None)
+    layout = tmp_path / "output" / "build" / "camelot_private" / "layout.json"
+    layout.parent.mkdir(parents=True)
+    layout.write_text(content)
+    with pytest.raises(SystemExit) as e:
+        cmd_dumpspecs.run(Namespace(projectdir=tmp_path))
+    assert e.value.code == 1
+    assert error in capsys.readouterr().out
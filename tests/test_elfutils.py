@@ -0,0 +1,184 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import shutil
+import struct
+
+import pytest
+
+from camelot.barbican.relocation import elfinfo
+from camelot.barbican.relocation.elffile import ElfFile
+from camelot.barbican.relocation.elfutils import AppElf, relocate_table
+
+from conftest import PACKAGE_METADATA
+
+
+@pytest.fixture
+def no_lief(monkeypatch):
+    import lief
+
+    def _no_parse(*args, **kwargs):
+        raise AssertionError("unexpected elf parsing w/ lief")
+
+    monkeypatch.setattr(lief, "parse", _no_parse)
+
+
+class TestElfFile:
+    def test_sections(self, app_elf):
+        import lief
+
+        binary = lief.parse(str(app_elf))
+        with ElfFile(app_elf) as elf:
+            assert elf.is_elf64 == (binary.header.identity_class == lief.ELF.Header.CLASS.ELF64)
+            assert elf.entrypoint == binary.entrypoint
+            assert list(elf.sections) == [s.name for s in binary.sections if s.name]
+            for section in binary.sections:
+                if not section.name:
+                    continue
+                assert elf.get_section(section.name).addr == section.virtual_address
+                assert elf.get_section(section.name).size == section.size
+            assert elf.section_content(".ARM") == bytes(binary.get_section(".ARM").content)
+            assert elf.section_content(".bss") == b""
+
+    def test_symbols(self, app_elf):
+        import lief
+
+        binary = lief.parse(str(app_elf))
+        with ElfFile(app_elf) as elf:
+            expected = {s.name: s.value for s in binary.symbols if s.name}
+            assert elf.symbols == expected
+            assert elf.get_symbol_address("_start") == binary.get_symbol("_start").value
+            with pytest.raises(ValueError):
+                elf.get_symbol_address("nope")
+
+    def test_invalid(self, tmp_path):
+        notelf = tmp_path / "notelf"
+        notelf.write_bytes(b"\x7fFLE" + bytes(60))
+        with pytest.raises(ValueError):
+            ElfFile(notelf)
+
+
+class TestReadOnlyElf:
+    def test_summary(self, app_elf):
+        full = AppElf(str(app_elf), None)
+        summary = AppElf(str(app_elf), None, readonly=True)
+
+        assert summary.readonly and not full.readonly
+        for section in [*AppElf.FLASH_SECTIONS, *AppElf.RAM_SECTIONS, ".note.package"]:
+            assert summary.get_section_info(section) == full.get_section_info(section)
+        for symbol in elfinfo.ElfInfo.SYMBOLS:
+            assert summary.get_symbol_address(symbol) == full.get_symbol_address(symbol)
+        assert summary.get_package_metadata("task") == PACKAGE_METADATA["task"]
+        assert summary.flash_size == full.flash_size
+        assert summary.ram_size == full.ram_size
+
+    def test_no_lief(self, app_elf, no_lief):
+        elf = AppElf(str(app_elf), None, readonly=True)
+        assert elf.get_package_metadata("type") == "camelot application"
+
+    def test_missing(self, app_elf):
+        elf = AppElf(str(app_elf), None, readonly=True)
+        with pytest.raises(ValueError):
+            elf.get_section_info(".nope")
+        with pytest.raises(ValueError):
+            elf.get_symbol_address("arm_exidx")
+        with pytest.raises(ValueError):
+            elf.save()
+
+    def test_cache(self, app_elf, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "cache"
+        first = AppElf(str(app_elf), None, readonly=True, cache_dir=cache_dir)
+        assert elfinfo.cache_path(app_elf, cache_dir).exists()
+
+        # Cache hit, elf file must not be parsed again
+        def _no_parse(*args, **kwargs):
+            raise AssertionError("unexpected elf parsing")
+
+        monkeypatch.setattr(ElfFile, "__init__", _no_parse)
+        second = AppElf(str(app_elf), None, readonly=True, cache_dir=cache_dir)
+        assert second._info == first._info
+
+    def test_stale_cache(self, app_elf, tmp_path):
+        elf = tmp_path / "app.elf"
+        shutil.copy(app_elf, elf)
+        cache_dir = tmp_path / "cache"
+        first = AppElf(str(elf), None, readonly=True, cache_dir=cache_dir)
+
+        # Append some garbage, content (and thus digest) changes, sections don't
+        with elf.open("ab") as f:
+            f.write(b"\0" * 16)
+
+        assert elfinfo.load_cached(elf, cache_dir, elfinfo.file_digest(elf)) is None
+        second = AppElf(str(elf), None, readonly=True, cache_dir=cache_dir)
+        assert second._info.digest != first._info.digest
+        assert second._info.sections == first._info.sections
+        assert elfinfo.load_cached(elf, cache_dir, second._info.digest) == second._info
+
+
+class TestElfIndex:
+    def test_symbol_queries(self, app_elf):
+        elf = AppElf(str(app_elf), None)
+        addresses = elf.get_symbol_addresses("_stext", "_start", "_erom")
+        assert addresses == {"_stext": 0x08000000, "_start": 0x08000000, "_erom": 0x08000050}
+        assert sorted(elf.get_symbols_at(0x08000000)) == ["_start", "_stext"]
+        assert elf.get_symbols_at(0x08000001) == []
+        with pytest.raises(ValueError):
+            elf.get_symbol_addresses("_start", "nope")
+
+    def test_section_at(self, app_elf):
+        elf = AppElf(str(app_elf), None)
+        assert elf.get_section_at(0x08000000) == ".text"
+        assert elf.get_section_at(0x0800004F) == ".ARM"
+        assert elf.get_section_at(0x20000085) == ".got"
+        assert elf.get_section_at(0x20000098) == ".bss"
+        assert elf.get_section_at(0x07FFFFFF) is None
+        assert elf.get_section_at(0x30000000) is None
+
+    def test_readonly(self, app_elf):
+        elf = AppElf(str(app_elf), None, readonly=True)
+        with pytest.raises(ValueError):
+            elf.get_symbols_at(0x08000000)
+        with pytest.raises(ValueError):
+            elf.get_section_at(0x08000000)
+
+    def test_relocate(self, app_elf, tmp_path):
+        out = tmp_path / "relocated.elf"
+        elf = AppElf(str(app_elf), str(out))
+        elf.relocate(0x08010000, 0x20010000)
+
+        # Indexes are updated w/ relocated addresses
+        assert sorted(elf.get_symbols_at(0x08010000)) == ["_start", "_stext"]
+        assert elf.get_symbols_at(0x08000000) == []
+        assert elf.get_section_at(0x08010000) == ".text"
+        assert elf.get_section_at(0x08000000) is None
+
+        elf.save()
+        with ElfFile(out) as relocated:
+            assert relocated.entrypoint == 0x08010000
+            assert relocated.get_symbol_address("_erom") == 0x08010050
+            assert relocated.get_symbol_address("_sheap") == 0x200100B8
+            assert relocated.get_symbol_address("_eheap") == 0x200100B8 + 0x200
+            assert relocated.get_section(".got").addr == 0x20010080
+
+
+class TestRelocateTable:
+    @staticmethod
+    def pack(*entries: int) -> bytes:
+        return struct.pack(f"<{len(entries)}I", *entries)
+
+    def test_relocate(self):
+        table = self.pack(0x20000000, 0x1FFFFFFF, 0x20000010, 0x20001000, 0x20001001, 0)
+        relocated = relocate_table(table, 0x20000000, 0x20001000, 0x10000)
+        assert relocated == self.pack(0x20010000, 0x1FFFFFFF, 0x20010010, 0x20011000, 0x20001001, 0)
+
+    def test_empty(self):
+        assert relocate_table(b"", 0, 0xFFFFFFFF, 4) == b""
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            relocate_table(bytes(6), 0, 0xFFFFFFFF, 4)
+
+    def test_overflow(self):
+        with pytest.raises(OverflowError):
+            relocate_table(self.pack(0xFFFFFFF0), 0, 0xFFFFFFFF, 0x100)
@@ -0,0 +1,356 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import pytest
+
+from camelot.barbican._internals import gen_memory_layout as gen
+from camelot.barbican.utils import memory_layout as memory
+
+CODE_POOL = (0x08010000, 0x08080000)
+RAM_POOL = (0x20004000, 0x20020000)
+CODE_POOLS = {"tasks_code": CODE_POOL}
+POOLS = ("tasks_code", "tasks_ram")
+RAM_POOLS = {"tasks_ram": RAM_POOL}
+
+
+@dataclass
+class FakeApp:
+    """Application ELF stub, only sizes are used for placement."""
+
+    name: str
+    flash_size: int
+    ram_size: int
+
+
+def _place(
+    apps,
+    previous=None,
+    fixup=gen._arm_pmsa_v7_align_region,
+    code_pools=CODE_POOLS,
+    ram_pools=RAM_POOLS,
+    affinity=None,
+) -> list[memory.Region]:
+    if previous is None:
+        previous = memory.Layout()
+    return gen._incremental_app_regions(previous, apps, code_pools, ram_pools, fixup, affinity)
+
+
+def _region(regions, name, type):
+    return memory.Layout(regions).get_region(name, type)
+
+
+class TestIncrementalLayout:
+    APPS = [
+        FakeApp("app1.elf", 0x3000, 0x800),
+        FakeApp("app2.elf", 0x1000, 0x400),
+        FakeApp("app3.elf", 0x2000, 0x400),
+    ]
+
+    def test_unchanged(self):
+        previous = memory.Layout(_place(self.APPS))
+        assert _place(self.APPS, previous) == previous.regions
+
+    def test_shrink(self):
+        previous = memory.Layout(_place(self.APPS))
+        apps = [FakeApp("app1.elf", 0x1000, 0x100), *self.APPS[1:]]
+        # Shrunk application is left in place, w/ its previous region sizes
+        assert _place(apps, previous) == previous.regions
+
+    def test_grow(self):
+        previous = memory.Layout(_place(self.APPS))
+        apps = [*self.APPS[:2], FakeApp("app3.elf", 0x2100, 0x400)]
+        regions = _place(apps, previous)
+
+        # Other applications are not moved
+        for name in ("app1", "app2"):
+            for type in memory.Region.Type:
+                assert _region(regions, name, type) == _region(previous.regions, name, type)
+
+        text = _region(regions, "app3", memory.Region.Type.Text)
+        assert text.size == 0x4000
+        assert text.start_address % text.size == 0
+        assert _region(regions, "app3", memory.Region.Type.Ram) == _region(
+            previous.regions, "app3", memory.Region.Type.Ram
+        )
+
+    def test_grow_first_fit(self):
+        # app1 text in [0x08010000, 0x08014000), app2 in [0x08014000, 0x08015000)
+        # app3 in [0x08016000, 0x08018000), leaving a hole in [0x08015000, 0x08016000)
+        previous = memory.Layout(
+            gen._app_regions("app1", (0x08010000, 0x4000), (0x20004000, 0x800), *POOLS)
+            + gen._app_regions("app2", (0x08014000, 0x1000), (0x20004800, 0x400), *POOLS)
+            + gen._app_regions("app3", (0x08016000, 0x2000), (0x20004C00, 0x400), *POOLS)
+        )
+        apps = [*self.APPS, FakeApp("app4.elf", 0x1000, 0x100)]
+        regions = _place(apps, previous)
+        assert regions[:6] == previous.regions
+        assert _region(regions, "app4", memory.Region.Type.Text).start_address == 0x08015000
+
+    def test_new_app(self):
+        previous = memory.Layout(_place(self.APPS[:2]))
+        regions = _place(self.APPS, previous)
+        assert regions[:4] == previous.regions
+        # app1 text in [0x08010000, 0x08014000), app2 in [0x08014000, 0x08015000)
+        assert _region(regions, "app3", memory.Region.Type.Text).start_address == 0x08016000
+
+    def test_no_room(self):
+        previous = memory.Layout(_place(self.APPS))
+        apps = [*self.APPS[:2], FakeApp("app3.elf", 0x80000, 0x400)]
+        assert _place(apps, previous) is None
+
+    def test_mpu_change(self):
+        # Regions placed for PMSAv8 are not PMSAv7 compliant, those must be placed again
+        apps = [FakeApp("app1.elf", 0x1020, 0x120)]
+        previous = memory.Layout(_place(apps, fixup=gen._arm_pmsa_v8_align_region))
+        regions = _place(apps, previous)
+        assert regions != previous.regions
+        for region in regions:
+            assert region.start_address % region.size == 0
+
+    @pytest.mark.parametrize(
+        "fixup", [gen._arm_pmsa_v7_align_region, gen._arm_pmsa_v8_align_region]
+    )
+    def test_first_fit(self, fixup):
+        taken = memory.Layout(
+            [gen._span(0x08010000, 0x08011000), gen._span(0x08012000, 0x08014000)]
+        )
+        assert gen._first_fit(0x1000, CODE_POOL, taken, fixup) == (0x08011000, 0x1000)
+        assert gen._first_fit(0x2000, CODE_POOL, taken, fixup) == (0x08014000, 0x2000)
+        assert gen._first_fit(0x80000, CODE_POOL, taken, fixup) is None
+        # A region can't end at pool limit
+        assert gen._first_fit(0x6C000, CODE_POOL, taken, fixup) is None
+        assert gen._first_fit(0x6B000, CODE_POOL, taken, gen._arm_pmsa_v8_align_region) == (
+            0x08014000,
+            0x6B000,
+        )
+
+
+class TestPacking:
+    def test_largest_first(self):
+        # In configuration order, app2 text would be placed at 0x08014000, leaving a 0x3000 gap
+        apps = [FakeApp("app1.elf", 0x1000, 0x100), FakeApp("app2.elf", 0x3000, 0x400)]
+        regions = _place(apps)
+        # Regions are still in configuration order
+        assert [r.name for r in regions] == ["app1", "app1", "app2", "app2"]
+        assert _region(regions, "app2", memory.Region.Type.Text).start_address == 0x08010000
+        assert _region(regions, "app1", memory.Region.Type.Text).start_address == 0x08014000
+        assert _region(regions, "app2", memory.Region.Type.Ram).start_address == 0x20004000
+        assert _region(regions, "app1", memory.Region.Type.Ram).start_address == 0x20004400
+
+    def test_unaligned_pool(self):
+        slots = gen._pack(
+            [0x4000, 0x1000, 0x2000, 0x1000],
+            (0x08011000, 0x08080000),
+            [],
+            gen._arm_pmsa_v7_align_region,
+        )
+        assert slots == [
+            (0x08014000, 0x4000),
+            (0x08011000, 0x1000),
+            (0x08012000, 0x2000),
+            (0x08018000, 0x1000),
+        ]
+
+    def test_exhaustive(self, monkeypatch):
+        args = ([0x60, 0x40, 0x40], (0, 0x1000), [(0x80, 0xA0)], gen._arm_pmsa_v8_align_region)
+        # Both 0x40 regions fit in the leading hole, largest first placement misses that
+        assert gen._pack(*args) == [(0xA0, 0x60), (0x0, 0x40), (0x40, 0x40)]
+        monkeypatch.setattr(gen, "_EXHAUSTIVE_PACKING_LIMIT", 0)
+        assert gen._pack(*args) == [(0x0, 0x60), (0xA0, 0x40), (0xE0, 0x40)]
+
+    def test_deterministic(self):
+        apps = [FakeApp(f"app{i}.elf", 0x1000, 0x100) for i in range(8)]
+        regions = _place(apps)
+        # Same size regions are placed in configuration order
+        texts = [r.start_address for r in regions if r.type == memory.Region.Type.Text]
+        assert texts == sorted(texts)
+        assert _place(apps) == regions
+
+    def test_no_room(self):
+        assert gen._pack([0x40000, 0x40000], CODE_POOL, [], gen._arm_pmsa_v7_align_region) is None
+
+    def test_pool_usage(self):
+        regions = gen._app_regions("app1", (0x08010000, 0x4000), (0x20004000, 0x800))
+        regions += gen._app_regions("app2", (0x08018000, 0x1000), (0x20004800, 0x400))
+        texts = [r for r in regions if r.type == memory.Region.Type.Text]
+        usage = gen._pool_usage(CODE_POOL, texts, 0x3000 + 0x1000)
+        assert usage.size == 0x70000
+        assert usage.allocated == 0x5000
+        assert usage.padding == 0x1000
+        assert usage.free == 0x6B000
+        assert usage.largest_free == 0x08080000 - 0x08019000
+        assert usage.fragmentation == pytest.approx(1 - 0x67000 / 0x6B000)
+
+
+class TestSubregions:
+    @pytest.mark.parametrize(
+        "saddr,size,expected",
+        [
+            (0x08010000, 0x3000, (0x08010000, 0x3000)),
+            (0x08011000, 0x3000, (0x08011000, 0x3000)),
+            (0x08010100, 0x2100, (0x08010800, 0x2800)),
+            # Enabled subregions would cross MPU region boundary
+            (0x08012000, 0x3000, (0x08014000, 0x3000)),
+            # Subregions are not supported for regions smaller than 256 bytes
+            (0x08000010, 0x80, (0x08000080, 0x80)),
+        ],
+    )
+    def test_align_region(self, saddr, size, expected):
+        assert gen._arm_pmsa_v7_subregion_align_region(saddr, size) == expected
+        assert gen._arm_pmsa_v7_subregion_align_region(*expected) == expected
+
+    @pytest.mark.parametrize(
+        "saddr,size,mask",
+        [
+            (0x08010000, 0x4000, 0x00),
+            (0x08010000, 0x3000, 0xC0),
+            (0x08011000, 0x3000, 0x03),
+            (0x08010800, 0x2800, 0xC1),
+            (0x08000080, 0x80, 0x00),
+        ],
+    )
+    def test_subregion_mask(self, saddr, size, mask):
+        assert gen._arm_pmsa_v7_subregion_mask(saddr, size) == mask
+
+    def test_packing(self):
+        apps = [FakeApp("app1.elf", 0x2100, 0x100), FakeApp("app2.elf", 0x1000, 0x100)]
+        # app1 text is rounded up to a 0x4000 region, app2 is placed after
+        regions = _place(apps)
+        text = _region(regions, "app2", memory.Region.Type.Text)
+        assert text.start_address + text.size == 0x08015000
+        # app2 text in [0x08010000, 0x08011000), app1 in [0x08011000, 0x08013800)
+        regions = _place(apps, fixup=gen._arm_pmsa_v7_subregion_align_region)
+        text = _region(regions, "app1", memory.Region.Type.Text)
+        assert (text.start_address, text.size) == (0x08011000, 0x2800)
+
+
+class TestPools:
+    CODE_POOLS = {"tasks_code": (0x08010000, 0x08016000), "tasks_code_1": (0x08100000, 0x08180000)}
+    APPS = [
+        FakeApp("app1.elf", 0x4000, 0x100),
+        FakeApp("app2.elf", 0x3000, 0x100),
+        FakeApp("app3.elf", 0x1000, 0x100),
+    ]
+
+    def _place(self, apps=APPS, **kwargs):
+        return _place(apps, code_pools=self.CODE_POOLS, **kwargs)
+
+    def test_spill(self):
+        regions = self._place()
+        app1, app2, app3 = (_region(regions, f"app{i}", memory.Region.Type.Text) for i in (1, 2, 3))
+        assert (app1.pool, app1.start_address) == ("tasks_code", 0x08010000)
+        assert (app2.pool, app2.start_address) == ("tasks_code_1", 0x08100000)
+        assert (app3.pool, app3.start_address) == ("tasks_code", 0x08014000)
+        assert all(r.pool == "tasks_ram" for r in regions if r.type == memory.Region.Type.Ram)
+
+    def test_affinity(self):
+        affinity = {"app3": gen.Affinity(text="tasks_code_1")}
+        regions = self._place(affinity=affinity)
+        app3 = _region(regions, "app3", memory.Region.Type.Text)
+        assert (app3.pool, app3.start_address) == ("tasks_code_1", 0x08104000)
+
+    def test_no_spill(self):
+        affinity = {"app2": gen.Affinity(text="tasks_code", spill=False)}
+        assert self._place(affinity=affinity) is None
+
+    def test_unknown_pool(self):
+        with pytest.raises(ValueError):
+            self._place(affinity={"app1": gen.Affinity(ram="nope")})
+
+    def test_affinity_change(self):
+        previous = memory.Layout(self._place())
+        regions = self._place(
+            previous=previous, affinity={"app1": gen.Affinity(text="tasks_code_1")}
+        )
+        assert _region(regions, "app1", memory.Region.Type.Text).pool == "tasks_code_1"
+        assert _region(regions, "app3", memory.Region.Type.Text) == _region(
+            previous.regions, "app3", memory.Region.Type.Text
+        )
+
+    def test_get_pools(self):
+        reserved_memory = SimpleNamespace(
+            tasks_code=SimpleNamespace(reg=[0x08010000, 0x6000]),
+            tasks_code_1=SimpleNamespace(reg=[0x08100000, 0x80000]),
+            tasks_code_3=SimpleNamespace(reg=[0x08200000, 0x80000]),
+        )
+        assert gen._get_pools(reserved_memory, "tasks_code") == self.CODE_POOLS
+        assert gen._get_pools(reserved_memory, "tasks_ram") == {}
+
+    def test_affinity_args(self):
+        args = gen.argument_parser().parse_args(
+            ["out", "--affinity", "app1", "text", "tasks_code_1", "--no-spill", "app2"]
+        )
+        assert gen._affinity(args.affinity, args.no_spill) == {
+            "app1": gen.Affinity(text="tasks_code_1"),
+            "app2": gen.Affinity(spill=False),
+        }
+        with pytest.raises(ValueError):
+            gen._affinity([["app1", "data", "tasks_code"]], [])
+
+
+class FakeSentry:
+    flash_size = 0x8000
+    ram_size = 0x1000
+
+    def get_section_info(self, name: str) -> tuple[int, int]:
+        return {
+            ".isr_vector": (0x08000000, 0x400),
+            ".bss": (0x20000000, 0x800),
+            ".idle_task": (0x08008000, 0x400),
+            "._idle": (0x20001000, 0x200),
+        }[name]
+
+
+@pytest.fixture
+def project_elves(monkeypatch):
+    import dts_utils
+
+    reserved_memory = SimpleNamespace(
+        tasks_code=SimpleNamespace(reg=[CODE_POOL[0], CODE_POOL[1] - CODE_POOL[0]]),
+        tasks_ram=SimpleNamespace(reg=[RAM_POOL[0], RAM_POOL[1] - RAM_POOL[0]]),
+    )
+    dts = SimpleNamespace(mpu=None, **{"reserved-memory": reserved_memory})
+    monkeypatch.setattr(dts_utils, "Dts", lambda _: dts)
+
+    apps = list(TestIncrementalLayout.APPS)
+    monkeypatch.setattr(gen, "_get_project_elves", lambda *_: (FakeSentry(), apps))
+    return apps
+
+
+def test_layout_not_rewritten(project_elves, tmp_path):
+    output = tmp_path / "layout.json"
+    (tmp_path / "dts").touch()
+    gen.run_gen_memory_layout(output, tmp_path / "dts", [])
+    first = memory.Layout.load(output)
+    # MPU subregions are opt-in
+    assert all(r.subregion_mask == 0 for r in first.regions)
+    assert [(p.name, p.type) for p in first.pools] == [
+        ("tasks_code", memory.Region.Type.Text),
+        ("tasks_ram", memory.Region.Type.Ram),
+    ]
+    mtime = output.stat().st_mtime_ns
+
+    gen.run_gen_memory_layout(output, tmp_path / "dts", [])
+    assert output.stat().st_mtime_ns == mtime
+
+    project_elves[2] = FakeApp("app3.elf", 0x2100, 0x400)
+    gen.run_gen_memory_layout(output, tmp_path / "dts", [])
+    second = memory.Layout.load(output)
+    changed = {r.name for r in second.regions if r not in first.regions}
+    assert changed == {"app3"}
+
+
+def test_layout_subregions(project_elves, tmp_path):
+    output = tmp_path / "layout.json"
+    (tmp_path / "dts").touch()
+    gen.run_gen_memory_layout(output, tmp_path / "dts", [], mpu_subregions=True)
+    layout = memory.Layout.load(output)
+    # app2 text in [0x08010000, 0x08011000), app1 in [0x08011000, 0x08014000)
+    assert _region(layout.regions, "app1", memory.Region.Type.Text).subregion_mask == 0x03
+
+    args = gen.argument_parser().parse_args(["out", "--mpu-subregions"])
+    assert args.mpu_subregions
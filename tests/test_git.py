@@ -137,3 +137,99 @@ class TestGit(GitTestBase):
                 private_dir, "test_invalid_commit", origin.git_dir, str("a" * 40)
             )
             repo.download()
+
+
+class TestGitCloneOptions(GitTestBase):
+    @pytest.fixture(scope="class")
+    def origin(self, private_dir):
+        origin_repo = Repo.init(private_dir / "origin")
+        self.set_repo_default_user_config(origin_repo)
+        for _ in range(3):
+            self.add_and_commit_random_file(origin_repo)
+        # required for partial clones
+        origin_repo.git.config("uploadpack.allowFilter", "true")
+        return origin_repo
+
+    @staticmethod
+    def create(path, name, origin, revision, **options):
+        # shallow clone is ignored for local path, use file:// instead
+        config = {
+            "scm": {"git": {"uri": f"file://{origin.git_dir}", "revision": revision, **options}}
+        }
+        repo = scm_create(name, Path(), path, config)
+        assert isinstance(repo, Git)
+        return repo
+
+    @staticmethod
+    def commit_count(repo):
+        return int(repo._repo.git.rev_list("--count", "HEAD"))
+
+    def test_shallow_branch(self, private_dir, origin, default_branch):
+        repo = self.create(private_dir, "shallow_branch", origin, default_branch, depth=1)
+        repo.download()
+        assert repo._repo.head.commit == origin.head.commit
+        assert self.commit_count(repo) == 1
+        assert (Path(repo._repo.git_dir) / "shallow").exists()
+
+    def test_shallow_commit(self, private_dir, origin):
+        commit = origin.head.commit.parents[0]
+        repo = self.create(private_dir, "shallow_commit", origin, str(commit), depth=1)
+        repo.download()
+        assert repo._repo.head.commit == commit
+        assert self.commit_count(repo) == 1
+
+    def test_fetch_by_sha(self, private_dir, origin):
+        commit = origin.head.commit.parents[0]
+        repo = self.create(private_dir, "fetch_sha", origin, str(commit), fetch_by_sha=True)
+        repo.download()
+        assert repo._repo.head.commit == commit
+        assert self.commit_count(repo) == 2
+        # no branch fetched
+        assert repo._repo.remote().refs == []
+
+    def test_partial_clone(self, private_dir, origin, default_branch):
+        repo = self.create(private_dir, "partial", origin, default_branch, filter="blob:none")
+        repo.download()
+        assert repo._repo.head.commit == origin.head.commit
+        assert repo._repo.git.config("remote.origin.partialclonefilter") == "blob:none"
+
+    @pytest.mark.parametrize("dissociate", [False, True])
+    def test_reference(self, private_dir, origin, default_branch, dissociate):
+        name = f"reference_{dissociate}"
+        repo = self.create(
+            private_dir,
+            name,
+            origin,
+            default_branch,
+            reference=origin.working_tree_dir,
+            dissociate=dissociate,
+        )
+        repo.download()
+        assert repo._repo.head.commit == origin.head.commit
+        alternates = Path(repo._repo.git_dir) / "objects" / "info" / "alternates"
+        assert alternates.exists() != dissociate
+
+    def test_reference_commit(self, private_dir, origin):
+        commit = origin.head.commit
+        repo = self.create(
+            private_dir,
+            "reference_commit",
+            origin,
+            str(commit),
+            reference=origin.working_tree_dir,
+            fetch_by_sha=True,
+        )
+        repo.download()
+        assert repo._repo.head.commit == commit
+        assert (Path(repo._repo.git_dir) / "objects" / "info" / "alternates").exists()
+
+    def test_fetch_by_sha_refused(self, private_dir, origin, monkeypatch):
+        # git protocol v0 refuses non advertised (i.e. not a ref tip) commit by default
+        monkeypatch.setenv("GIT_CONFIG_COUNT", "1")
+        monkeypatch.setenv("GIT_CONFIG_KEY_0", "protocol.version")
+        monkeypatch.setenv("GIT_CONFIG_VALUE_0", "0")
+        commit = origin.head.commit.parents[0]
+        repo = self.create(private_dir, "fetch_sha_refused", origin, str(commit), depth=1)
+        repo.download()
+        assert repo._repo.head.commit == commit
+        assert self.commit_count(repo) == 2
@@ -0,0 +1,133 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from camelot.barbican._internals import server
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork and unix socket")
+
+
+@pytest.fixture(scope="module")
+def socket_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("server") / "test.sock"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", server.__name__, "--socket", str(path), "--idle-timeout", "30"]
+    )
+    for _ in range(200):
+        if path.exists():
+            break
+        time.sleep(0.05)
+    else:
+        proc.kill()
+        pytest.fail("internal server did not start")
+
+    yield path
+
+    proc.terminate()
+    proc.wait()
+
+
+def test_forward_no_server(tmp_path):
+    assert server.forward("capture_out", [], tmp_path / "none.sock", spawn=False) is None
+
+
+def test_forward(socket_path, tmp_path):
+    out = tmp_path / "out.txt"
+    returncode = server.forward(
+        "capture_out", [str(out), sys.executable, "-c", "print('hello')"], socket_path
+    )
+    assert returncode == 0
+    assert out.read_text() == "hello\n"
+
+
+def test_forward_relative_to_cwd(socket_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    returncode = server.forward(
+        "capture_out", ["out.txt", sys.executable, "-c", "print('cwd')"], socket_path
+    )
+    assert returncode == 0
+    assert (tmp_path / "out.txt").read_text() == "cwd\n"
+
+
+def test_forward_failure(socket_path, tmp_path):
+    out = tmp_path / "out.txt"
+    returncode = server.forward(
+        "capture_out", [str(out), sys.executable, "-c", "raise SystemExit(3)"], socket_path
+    )
+    assert returncode == 1
+    assert not out.exists()
+
+
+def test_forward_invalid_arguments(socket_path):
+    # argparse exits w/ status 2 on invalid command line
+    assert server.forward("capture_out", [], socket_path) == 2
+
+
+def test_forward_log_level(socket_path, tmp_path, capfd):
+    argv = [str(tmp_path / "out.txt"), sys.executable, "-c", "raise SystemExit(3)"]
+    root = logging.getLogger()
+    level = root.level
+    try:
+        root.setLevel(logging.CRITICAL + 1)
+        assert server.forward("capture_out", argv, socket_path) == 1
+        quiet = capfd.readouterr().out
+        root.setLevel(logging.INFO)
+        assert server.forward("capture_out", argv, socket_path) == 1
+        verbose = capfd.readouterr().out
+    finally:
+        root.setLevel(level)
+    # Logs are printed by the forked child, w/ client log level
+    assert "CRITICAL" not in quiet
+    assert "CRITICAL" in verbose
+
+
+@pytest.mark.parametrize("mode", [0o755, 0o770])
+def test_forward_not_private(tmp_path, mode, monkeypatch):
+    spawned = []
+    monkeypatch.setattr(server, "_spawn_server", spawned.append)
+    socket_dir = tmp_path / "shared"
+    socket_dir.mkdir()
+    socket_dir.chmod(mode)
+    assert server.forward("capture_out", [], socket_dir / "test.sock") is None
+    assert spawned == []
+
+
+def test_forward_symlink(tmp_path, monkeypatch):
+    spawned = []
+    monkeypatch.setattr(server, "_spawn_server", spawned.append)
+    target = tmp_path / "target"
+    target.mkdir(mode=0o700)
+    (tmp_path / "link").symlink_to(target)
+    assert server.forward("capture_out", [], tmp_path / "link" / "test.sock") is None
+    assert spawned == []
+
+
+def test_forward_spawn(tmp_path, monkeypatch):
+    spawned = []
+    monkeypatch.setattr(server, "_spawn_server", spawned.append)
+    path = tmp_path / "run" / "test.sock"
+    assert server.forward("capture_out", [], path) is None
+    assert spawned == [path]
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+
+
+def test_private_dir_owner(tmp_path, monkeypatch):
+    assert server._private_dir(tmp_path / "run", create=True)
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(tmp_path).st_uid + 1)
+    assert not server._private_dir(tmp_path / "run", create=True)
+
+
+def test_run_server_not_private(tmp_path):
+    socket_dir = tmp_path / "shared"
+    socket_dir.mkdir(mode=0o777)
+    socket_dir.chmod(0o777)
+    server.run_server(socket_dir / "test.sock", idle_timeout=1)
+    assert list(socket_dir.iterdir()) == []
@@ -0,0 +1,68 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import pkgutil
+import subprocess
+import sys
+
+import pytest
+
+from camelot.barbican import _internals
+from camelot.barbican._internals.import_profile import HEAVY_PACKAGES, parse_importtime
+
+INTERNALS = [m.name for m in pkgutil.iter_modules(_internals.__path__)]
+
+
+@pytest.mark.parametrize("cmd", INTERNALS)
+def test_internal_import_budget(cmd):
+    """Heavy dependencies must not be imported on internal command start up."""
+    code = (
+        "import json, sys\n"
+        f"import camelot.barbican.barbican, camelot.barbican._internals.{cmd}\n"
+        "print(json.dumps(sorted({m.split('.')[0] for m in sys.modules})))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+    imported = set(json.loads(proc.stdout))
+    assert imported.isdisjoint(HEAVY_PACKAGES)
+
+
+def test_parse_importtime():
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   _io",
+            "import time:        80 |        200 | io",
+            "unrelated line",
+        ]
+    )
+    imports = parse_importtime(output)
+    assert [i.name for i in imports] == ["_io", "io"]
+    assert [i.depth for i in imports] == [1, 0]
+    assert imports[1].self_us == 80
+    assert imports[1].cumulative_us == 200
+
+
+def test_relocate_elf(app_elf, tmp_path):
+    from camelot.barbican._internals import relocate_elf
+    from camelot.barbican.relocation.elffile import ElfFile
+    from camelot.barbican.utils import memory_layout as memory
+
+    layout = memory.Layout()
+    layout.append(
+        memory.Region(
+            name="app", type=memory.Region.Type.Text, start_address=0x08010000, size=0x100
+        )
+    )
+    layout.append(
+        memory.Region(name="app", type=memory.Region.Type.Ram, start_address=0x20010000, size=0x400)
+    )
+    layout.save(tmp_path / "layout.json")
+
+    out = tmp_path / "app.elf"
+    relocate_elf.run(["--name", "app", "-l", str(tmp_path / "layout.json"), str(out), str(app_elf)])
+    with ElfFile(out) as elf:
+        assert elf.entrypoint == 0x08010000
+        assert elf.get_section(".text").addr == 0x08010000
+        assert elf.get_section(".svcexchange").addr == 0x20010000
@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from camelot.barbican.utils.jobserver import ENV_MAKEFLAGS, JobServer, ninja_is_client
+
+CLIENT = """
+import os
+auth = os.environ["MAKEFLAGS"].split("--jobserver-auth=fifo:")[1]
+fd = os.open(auth, os.O_RDWR)
+token = os.read(fd, 1)
+print(token.decode())
+os.write(fd, token)
+"""
+
+
+def _ninja_jobserver() -> bool:
+    ninja = shutil.which("ninja")
+    return ninja is not None and ninja_is_client(ninja)
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_jobserver(jobs):
+    with JobServer(jobs) as jobserver:
+        assert jobserver.jobs == jobs
+        assert jobserver.path.is_fifo()
+        assert jobserver.available_tokens() == jobs - 1
+        # tokens are written back
+        assert jobserver.available_tokens() == jobs - 1
+        assert jobserver.makeflags == f"-j{jobs} --jobserver-auth=fifo:{jobserver.path}"
+        assert jobserver.environ({})[ENV_MAKEFLAGS] == jobserver.makeflags
+        path = jobserver.path
+    assert not path.exists()
+    assert not path.parent.exists()
+
+
+def test_jobserver_invalid():
+    with pytest.raises(ValueError):
+        JobServer(0)
+
+
+def test_jobserver_not_started():
+    with pytest.raises(RuntimeError):
+        JobServer(2).path
+
+
+def test_jobserver_client():
+    with JobServer(2) as jobserver:
+        proc = subprocess.run(
+            [sys.executable, "-c", CLIENT],
+            env=jobserver.environ(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert proc.stdout.strip() == "+"
+        assert jobserver.available_tokens() == 1
+
+
+@pytest.mark.parametrize(
+    "version,client",
+    [
+        ("1.11.1", False),
+        ("1.12.1", False),
+        ("1.13.0", True),
+        ("1.13.2.git.kitware.jobserver-pipe-1", True),
+        ("2.0.0", True),
+        ("garbage", False),
+    ],
+)
+def test_ninja_is_client(tmp_path, version, client):
+    ninja = tmp_path / "ninja"
+    ninja.write_text(f"#!/bin/sh\necho {version}\n")
+    ninja.chmod(0o755)
+    assert ninja_is_client(str(ninja)) is client
+
+
+@pytest.mark.skipif(not _ninja_jobserver(), reason="requires ninja >= 1.13")
+def test_jobserver_ninja(tmp_path):
+    jobs = 2
+    edges = 6
+    log = tmp_path / "log"
+    (tmp_path / "build.ninja").write_text(
+        "rule job\n"
+        f"  command = echo + $$(date +%s%N) >> {log} && sleep 0.2"
+        f" && echo - $$(date +%s%N) >> {log} && touch $out\n"
+        + "".join(f"build out{i}: job\n" for i in range(edges))
+    )
+    with JobServer(jobs) as jobserver:
+        # no -j, ninja parallelism is bound by jobserver
+        assert jobserver.run(["ninja", "-C", str(tmp_path)], capture_output=True) == 0
+
+    events = sorted((int(t), 1 if e == "+" else -1) for e, t in map(str.split, log.open()))
+    assert len(events) == 2 * edges
+    running = concurrency = 0
+    for _, e in events:
+        running += e
+        concurrency = max(concurrency, running)
+    assert concurrency == jobs
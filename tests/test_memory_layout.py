@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import dataclasses
+import json
 import pytest
 import typing
 
@@ -21,6 +22,8 @@ class TestMemoryRegion:
         "permission": 1,
         "start_address": "0x8000000",
         "size": "0x400",
+        "pool": "",
+        "subregion_mask": "0x0",
         "subregions": [],
     }
 
@@ -113,3 +116,176 @@ class TestMemoryRegion:
             dataclasses.asdict(region, dict_factory=memory.Region.dict_factory)
             == TestMemoryRegion._dict  # noqa: W503
         )
+
+
+class TestMemoryLayout:
+    @staticmethod
+    def layout() -> memory.Layout:
+        layout = memory.Layout()
+        for name, text, ram in [("app1", 0x08010000, 0x20004000), ("app2", 0x08020000, 0x20008000)]:
+            layout.append(
+                memory.Region(
+                    name=name, type=memory.Region.Type.Text, start_address=text, size=0x1000
+                )
+            )
+            layout.append(
+                memory.Region(name=name, type=memory.Region.Type.Ram, start_address=ram, size=0x400)
+            )
+        return layout
+
+    def test_save_load(self, tmp_path):
+        layout = self.layout()
+        layout.save(tmp_path / "layout.json")
+        assert memory.Layout.load(tmp_path / "layout.json") == layout
+
+    def test_save_load_pools(self, tmp_path):
+        layout = self.layout()
+        layout.pools.append(
+            memory.Region(
+                name="tasks_code",
+                type=memory.Region.Type.Text,
+                start_address=0x08010000,
+                size=0x20000,
+            )
+        )
+        layout.save(tmp_path / "layout.json")
+        loaded = memory.Layout.load(tmp_path / "layout.json")
+        assert loaded == layout
+        assert loaded.pools[0].size == 0x20000
+
+    def test_get_region(self):
+        layout = self.layout()
+        region = layout.get_region("app2", memory.Region.Type.Ram)
+        assert region.start_address == 0x20008000
+        with pytest.raises(ValueError):
+            layout.get_region("app3", memory.Region.Type.Text)
+
+    def test_overlaps(self):
+        layout = self.layout()
+        assert layout.overlaps() == []
+        inner = memory.Region(
+            name="app3", type=memory.Region.Type.Text, start_address=0x08010800, size=0x100
+        )
+        adjacent = memory.Region(
+            name="app4", type=memory.Region.Type.Text, start_address=0x08011000, size=0x100
+        )
+        empty = memory.Region(
+            name="app5", type=memory.Region.Type.Text, start_address=0x08010900, size=0
+        )
+        layout.regions.extend([inner, adjacent, empty])
+        app1 = layout.get_region("app1", memory.Region.Type.Text)
+        assert layout.overlaps() == [(app1, inner)]
+
+    def test_free_ranges(self):
+        layout = self.layout()
+        pool = memory.Region(
+            name="tasks_code", type=memory.Region.Type.Text, start_address=0x08010000, size=0x20000
+        )
+        assert layout.free_ranges(pool) == [(0x08011000, 0x08020000), (0x08021000, 0x08030000)]
+        assert memory.free_ranges((0, 0x100), [(0x80, 0x200), (0x10, 0x20), (0x18, 0x40)]) == [
+            (0, 0x10),
+            (0x40, 0x80),
+        ]
+
+    def test_find_fit(self):
+        layout = self.layout()
+        layout.pools.extend(
+            [
+                memory.Region(
+                    name="tasks_code",
+                    type=memory.Region.Type.Text,
+                    start_address=0x08010000,
+                    size=0x12000,
+                ),
+                memory.Region(
+                    name="tasks_code_1",
+                    type=memory.Region.Type.Text,
+                    start_address=0x08100000,
+                    size=0x80000,
+                ),
+            ]
+        )
+        assert layout.find_fit(0x1000, 0x1000) == 0x08011000
+        assert layout.find_fit(0x10000, 0x10000) == 0x08100000
+        assert layout.find_fit(0x100, 0x100, layout.pools[1]) == 0x08100000
+        assert layout.find_fit(0x100000, 0x100) is None
+        # Fixup may round size up, e.g. to a power of 2
+        assert layout.find_fit(0x900, fixup=lambda saddr, size: (saddr, 0x1000)) == 0x08011000
+        assert layout.find_fit(0xF00, fixup=lambda saddr, size: (saddr, 0x10000)) == 0x08100000
+
+    @staticmethod
+    def full_layout() -> memory.Layout:
+        layout = TestMemoryLayout.layout()
+        layout.append(
+            memory.Region(
+                name="app3",
+                type=memory.Region.Type.Text,
+                permission=memory.Region.Permission.Read | memory.Region.Permission.Exec,
+                start_address=0x08030000,
+                size=0x3000,
+                pool="tasks_code",
+                subregion_mask=0xC0,
+                subregions=[
+                    memory.Region(
+                        name="app3_sub",
+                        type=memory.Region.Type.Text,
+                        start_address=0x08030000,
+                        size=0x800,
+                    )
+                ],
+            )
+        )
+        layout.pools.append(
+            memory.Region(
+                name="tasks_code",
+                type=memory.Region.Type.Text,
+                start_address=0x08010000,
+                size=0x20000,
+            )
+        )
+        return layout
+
+    def test_slots(self):
+        region = self.layout().regions[0]
+        assert not hasattr(region, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            region.size = 0  # type: ignore
+
+    def test_asdict(self):
+        layout = self.full_layout()
+        assert layout.asdict() == dataclasses.asdict(
+            layout, dict_factory=memory.Region.dict_factory
+        )
+
+    def test_from_json(self):
+        layout = self.full_layout()
+        loaded = memory.Layout.from_json(json.dumps(layout.asdict()))
+        assert loaded == layout
+        assert isinstance(loaded.regions[-1].subregions[0], memory.Region)
+        assert loaded.regions[-1].permission == (
+            memory.Region.Permission.Read | memory.Region.Permission.Exec
+        )
+
+    def test_from_json_legacy(self):
+        # Layout w/o pools, nor pool and subregion mask in regions
+        data = {
+            "regions": [
+                {
+                    "name": "app1",
+                    "type": "text",
+                    "permission": 5,
+                    "start_address": "0x8010000",
+                    "size": "0x1000",
+                    "subregions": [],
+                }
+            ]
+        }
+        layout = memory.Layout.from_json(json.dumps(data))
+        assert layout.regions[0].pool == ""
+        assert layout.regions[0].subregion_mask == 0
+        assert layout.pools == []
+
+    def test_save_load_full(self, tmp_path):
+        layout = self.full_layout()
+        layout.save(tmp_path / "layout.json")
+        assert memory.Layout.load(tmp_path / "layout.json") == layout
@@ -2,9 +2,15 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+import io
+import random
+import shutil
+import subprocess
+
 import pytest
 from pathlib import PureWindowsPath, PurePosixPath
 
+from camelot.barbican._internals import meson_package_dyndep
 from camelot.barbican.builder.ninja import (
     NinjaWriter,
     NinjaRule,
@@ -16,6 +22,53 @@ from camelot.barbican.builder.ninja import (
 )
 
 
+def legacy_wrap(line: str, width: int) -> list[str]:
+    """Former quadratic NinjaWriter._wrap implementation, reference for byte-for-byte checks."""
+    escape_new_line = " $"
+    if len(line) <= width:
+        return [line]
+
+    def space_is_escaped(text, pos):
+        idx = pos - 1
+        cnt = 0
+        while idx > 0 and text[idx] == "$":
+            idx -= 1
+            cnt += 1
+        return cnt % 2 == 1
+
+    def space_pos_before_line_width(text):
+        pos = width - len(escape_new_line)
+        while True:
+            pos = text.rfind(" ", 0, pos)
+            if pos < 0 or not space_is_escaped(text, pos):
+                break
+        return pos
+
+    def space_pos_after_line_width(text):
+        pos = width - len(escape_new_line) - 1
+        while True:
+            pos = text.find(" ", pos + 1)
+            if pos < 0 or not space_is_escaped(text, pos):
+                break
+        return pos
+
+    parts = []
+    indent = len(line) - len(line.lstrip())
+    min_pos = indent
+    while len(line) > width:
+        pos = space_pos_before_line_width(line)
+        if pos < min_pos:
+            pos = space_pos_after_line_width(line)
+        if pos >= min_pos:
+            parts.append(line[:pos] + escape_new_line)
+            line = " " * (indent + 2) + line[pos + 1 :]
+            min_pos = indent + 2
+        else:
+            break
+    parts.append(line)
+    return parts
+
+
 class TestNinjaWriter:
 
     escape_path_data = [
@@ -102,6 +155,26 @@ class TestNinjaWriter:
         wrapped = nw._wrap(line)
         assert wrapped[0] == "this is a simple$$ $"
 
+    @pytest.mark.parametrize("seed", range(4))
+    def test_wrap_legacy(self, seed):
+        # byte-for-byte identical to the former implementation, on random lines made of words,
+        # (escaped) spaces and escape characters, w/ and w/o indentation
+        rng = random.Random(seed)
+        for _ in range(2000):
+            width = rng.randint(4, 40)
+            line = " " * rng.choice([0, 0, 1, 2, 4, 30])
+            line += "".join(
+                rng.choice(["a", "bb", "cccc", " ", "  ", "$", "$ ", "$$", ":"])
+                for _ in range(rng.randint(0, 80))
+            )
+            assert NinjaWriter(width=width)._wrap(line) == legacy_wrap(line, width), (width, line)
+
+    def test_wrap_long_line(self):
+        nw = NinjaWriter()
+        words = [f"obj/file_{i}.o" for i in range(10000)]
+        line = "build out: link " + " ".join(words)
+        assert nw._wrap(line) == legacy_wrap(line, nw.width)
+
     def test_comment_wrap(self):
         nw = NinjaWriter(width=20)
         nw.comment("this is a long comment that should wrap nicely")
@@ -268,6 +341,24 @@ class TestNinjaWriter:
         nw.default([data])
         assert nw.render().splitlines()[0] == f"default {data}"
 
+    def test_streaming(self):
+        def _emit(nw):
+            nw.comment("streamed " * 20)
+            nw.variable("cc", "gcc")
+            nw.rule("cc", command="gcc -c $in -o $out", description="compile")
+            nw.build(outputs=["out"], rule="cc", inputs=[f"in{i}.c" for i in range(20)])
+            nw.default(["out"])
+
+        nw = NinjaWriter(width=40)
+        _emit(nw)
+        output = io.StringIO()
+        streamed = NinjaWriter(width=40, output=output)
+        _emit(streamed)
+        assert output.getvalue() == nw.render()
+        assert streamed.lines == []
+        with pytest.raises(ValueError):
+            streamed.render()
+
     def test_default_target_list(self):
         nw = NinjaWriter()
         nw.default(self.include_data)
@@ -387,12 +478,24 @@ class TestNinjaFile:
         with pytest.raises(ValueError):
             NinjaFile([BuilderA("a"), BuilderC("c")]).generate()
 
-    def test_ninja_file_write(self, tmp_path_factory):
+    @pytest.mark.parametrize("streaming", [True, False])
+    @pytest.mark.parametrize("Builder", [EmptyBuilder, DummyBuilder])
+    def test_ninja_file_write(self, tmp_path_factory, Builder, streaming):
         f = tmp_path_factory.mktemp("generated") / "build.ninja"
-        nf = NinjaFile([EmptyBuilder("empty")])
-        nf.write(f)
+        nf = NinjaFile([Builder("a")])
+        nf.write(f, streaming=streaming)
         assert f.read_text(encoding="utf-8") == nf.generate()
 
+    @pytest.mark.parametrize("streaming", [True, False])
+    def test_ninja_file_write_unchanged(self, tmp_path, streaming):
+        f = tmp_path / "build.ninja"
+        nf = NinjaFile([EmptyBuilder("empty")])
+        nf.write(f, streaming=streaming)
+        mtime = f.stat().st_mtime_ns
+        nf.write(f, streaming=streaming)
+        assert f.stat().st_mtime_ns == mtime
+        assert list(tmp_path.iterdir()) == [f]
+
     def test_ninja_build_dep(self):
         build1 = NinjaBuild(outputs=["output1"], rule="rule1")
         build2 = NinjaBuild(outputs=["output2"], rule="rule2", inputs=["input2", build1])
@@ -400,6 +503,29 @@ class TestNinjaFile:
         nw.build(**(build2.asdict()))
         assert nw.render().splitlines()[0] == "build output2: rule2 input2 output1"
 
+    def test_ninja_build_statement(self):
+        build1 = NinjaBuild(outputs=["output1"], rule="rule1")
+        build2 = NinjaBuild(outputs=["output2", "output3"], rule="rule2", inputs=[build1])
+        build3 = NinjaBuild(
+            outputs=["output4"],
+            rule="rule3",
+            inputs=["input4", build1],
+            implicit=[build2],
+            order_only=[build2],
+            validation=[build1],
+            implicit_outputs=["output5"],
+            variables={"flags": "-O2", "opts": ["-a", "-b"]},
+        )
+        nw = NinjaWriter()
+        nw.build_statement(build3)
+        expected = NinjaWriter()
+        expected.build(**(build3.asdict()))
+        assert nw.render() == expected.render()
+        assert nw.render().splitlines()[0] == (
+            "build output4 | output5: rule3 input4 output1 | output2 output3 "
+            "|| output2 output3 |@ output1"
+        )
+
     @pytest.mark.parametrize("Builder", [DummyBuilder, DummyBuilderImplicit])
     def test_ninja_build_default(self, Builder):
         class BuilderWithDefaultTarget(Builder):
@@ -413,3 +539,90 @@ class TestNinjaFile:
         # XXX: default statement is assumed to be the last line of generated ninja build file
         default = NinjaFile([BuilderWithDefaultTarget("dummy")]).generate().splitlines()[-1]
         assert default == "default output_build_by_default"
+
+
+class FragmentBuilder(DummyBuilder):
+    def __init__(self, name: str, fingerprint: str = "0" * 64, outputs: list[str] | None = None):
+        super().__init__(name)
+        self.fingerprint = fingerprint
+        self.outputs = outputs or [f"{name}.o"]
+
+    def __ninja_fingerprint__(self):
+        return self.fingerprint
+
+    def __ninja_builds__(self):
+        yield NinjaBuild(outputs=self.outputs, rule="cc", inputs=[f"{self.name}.c"])
+
+
+class TestNinjaFileFragments:
+    def test_write(self, tmp_path):
+        f = tmp_path / "build.ninja"
+        nf = NinjaFile([FragmentBuilder("a"), DummyBuilder("b")])
+        nf.write(f, fragments=True)
+
+        fragment = NinjaFile.fragment_path(f, "a")
+        assert fragment.read_text().splitlines()[0] == f"# fingerprint: {'0' * 64}"
+        assert "build a.o: cc a.c" in fragment.read_text()
+
+        content = f.read_text()
+        assert f"subninja {fragment}" in content
+        assert "build a.o" not in content
+        # non fragment builder are generated inline
+        assert "build out.o: cc in.c" in content
+
+    def test_write_unchanged_fingerprint(self, tmp_path):
+        f = tmp_path / "build.ninja"
+        NinjaFile([FragmentBuilder("a"), FragmentBuilder("b")]).write(f, fragments=True)
+        fragment_a = NinjaFile.fragment_path(f, "a")
+        fragment_b = NinjaFile.fragment_path(f, "b")
+        mtime_a = fragment_a.stat().st_mtime_ns
+        mtime = f.stat().st_mtime_ns
+
+        # fragment w/ unchanged fingerprint is not regenerated
+        b = FragmentBuilder("b", fingerprint="1" * 64, outputs=["b2.o"])
+        NinjaFile([FragmentBuilder("a", outputs=["a2.o"]), b]).write(f, fragments=True)
+        assert fragment_a.stat().st_mtime_ns == mtime_a
+        assert "build a.o: cc a.c" in fragment_a.read_text()
+        assert "build b2.o: cc b.c" in fragment_b.read_text()
+        # top level file is rewritten on fragment change
+        assert f.stat().st_mtime_ns != mtime
+        assert "1" * 64 in f.read_text()
+
+    def test_write_stale_fragment(self, tmp_path):
+        f = tmp_path / "build.ninja"
+        NinjaFile([FragmentBuilder("a"), FragmentBuilder("b")]).write(f, fragments=True)
+        NinjaFile([FragmentBuilder("a")]).write(f, fragments=True)
+        assert not NinjaFile.fragment_path(f, "b").exists()
+        assert NinjaFile.fragment_path(f, "a").exists()
+
+    def test_write_no_fragments(self, tmp_path):
+        f = tmp_path / "build.ninja"
+        nf = NinjaFile([FragmentBuilder("a"), DummyBuilder("b")])
+        nf.write(f)
+        assert f.read_text() == nf.generate()
+        assert not NinjaFile.fragment_path(f, "a").parent.exists()
+
+    def test_write_dyndep(self, tmp_path):
+        # A dyndep file written next to the top level build file leaves fragments untouched
+        f = tmp_path / "build.ninja"
+        NinjaFile([FragmentBuilder("a")]).write(f, fragments=True)
+        introspect = {"buildsystem_files": [], "installed": {}, "targets": []}
+        meson_package_dyndep._gen_ninja_dyndep_file(
+            "a", introspect, tmp_path, tmp_path / "a.dyndep"
+        )
+        assert (tmp_path / "a.dyndep").exists()
+        assert NinjaFile.fragment_path(f, "a").exists()
+
+    @pytest.mark.skipif(shutil.which("ninja") is None, reason="requires ninja")
+    def test_ninja_targets(self, tmp_path):
+        def targets(fragments):
+            d = tmp_path / str(fragments)
+            d.mkdir()
+            nf = NinjaFile([FragmentBuilder("a"), FragmentBuilder("b"), DummyBuilder("c")])
+            nf.write(d / "build.ninja", fragments=fragments)
+            out = subprocess.run(
+                ["ninja", "-C", d, "-t", "targets", "all"], capture_output=True, check=True
+            )
+            return sorted(out.stdout.decode().splitlines())
+
+        assert targets(True) == targets(False)
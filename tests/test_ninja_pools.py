@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from jsonschema import ValidationError
+
+from camelot.barbican import barbican
+from camelot.barbican.builder import pools
+from camelot.barbican.builder.ninja import NinjaFile, NinjaPool
+from camelot.barbican.config.validator import validate_project_config
+
+GiB = 1024**3
+
+
+@pytest.mark.parametrize(
+    "name,cores,memory,expected",
+    [
+        (pools.CARGO_LTO, 16, 64 * GiB, 4),
+        (pools.CARGO_LTO, 16, 8 * GiB, 2),
+        (pools.CARGO_LTO, 2, 64 * GiB, 1),
+        (pools.MESON_COMPILE, 16, 4 * GiB, 2),
+        (pools.LINK, 16, 64 * GiB, 16),
+        (pools.LINK, 16, 512 * 1024**2, 1),
+    ],
+)
+def test_default_depth(name, cores, memory, expected):
+    assert pools.default_depth(name, cores, memory) == expected
+
+
+def test_default_depth_unknown_memory(monkeypatch):
+    monkeypatch.setattr(pools, "physical_memory", lambda: None)
+    assert pools.default_depth(pools.LINK, cores=8) == 8
+
+
+@pytest.mark.parametrize("command", ["build", "download", "update"])
+def test_default_jobs(command, monkeypatch):
+    # Default job count follows CPU affinity, not host CPU count
+    monkeypatch.setattr(pools.os, "sched_getaffinity", lambda _: {0, 1}, raising=False)
+    assert barbican.parser().parse_args([command]).jobs == 2
+
+
+def test_ninja_pools():
+    depths = {p.name: p.depth for p in pools.ninja_pools({pools.LINK: 3})}
+    assert sorted(depths) == sorted([pools.CARGO_LTO, pools.MESON_COMPILE, pools.LINK])
+    assert depths[pools.LINK] == 3
+    assert all(depth >= 1 for depth in depths.values())
+
+
+class PoolBuilder:
+    def __init__(self, name, depth=2):
+        self.name = name
+        self.depth = depth
+
+    @classmethod
+    def __ninja_variables__(cls):
+        yield from ()
+
+    @classmethod
+    def __ninja_rules__(cls):
+        yield from ()
+
+    def __ninja_pools__(self):
+        yield NinjaPool(name="heavy", depth=self.depth)
+
+    def __ninja_builds__(self):
+        yield from ()
+
+
+def test_ninja_file_pools():
+    content = NinjaFile([PoolBuilder("a"), PoolBuilder("b")]).generate()
+    assert content.count("pool heavy\n  depth = 2\n") == 1
+
+
+def test_ninja_file_duplicate_pools():
+    with pytest.raises(ValueError):
+        NinjaFile([PoolBuilder("a"), PoolBuilder("b", depth=3)]).generate()
+
+
+def _project_config(**extra):
+    kernel = {"scm": {"tarball": {"uri": "https://example.com/kernel.tar.gz"}}, "config": "k"}
+    return {"name": "test", "version": "1.0", "dts": "test.dts", "kernel": kernel, **extra}
+
+
+def test_project_config_pools():
+    validate_project_config(_project_config(pools={"cargo_lto": 1, "link": 4}))
+
+
+@pytest.mark.parametrize("config", [{"cargo_lto": 0}, {"unknown": 2}, {"link": "2"}])
+def test_project_config_pools_invalid(config):
+    with pytest.raises(ValidationError):
+        validate_project_config(_project_config(pools=config))
@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+import io
+import tarfile
+
+import pytest
+
+from camelot.barbican.scm import scm_create
+from camelot.barbican.scm import tarball
+from camelot.barbican.scm.tarball import Tarball, _StreamExtractor
+from camelot.barbican.utils.downloader import Download
+
+URL = "https://example.com/pkg-1.0.tar.gz"
+
+
+def _add(tar, name, data=None, **attrs):
+    info = tarfile.TarInfo(name)
+    for k, v in attrs.items():
+        setattr(info, k, v)
+    if data is not None:
+        info.size = len(data)
+    tar.addfile(info, io.BytesIO(data) if data is not None else None)
+
+
+@pytest.fixture(scope="module")
+def archive():
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        _add(tar, "pkg-1.0", type=tarfile.DIRTYPE, mode=0o755)
+        _add(tar, "pkg-1.0/a.txt", b"a" * 4096)
+        _add(tar, "pkg-1.0/sub/b.txt", b"b")
+        _add(tar, "pkg-1.0/hard", type=tarfile.LNKTYPE, linkname="pkg-1.0/a.txt")
+        _add(tar, "pkg-1.0/sym", type=tarfile.SYMTYPE, linkname="a.txt")
+    return buf.getvalue()
+
+
+def _create(tmp_path, **options):
+    config = {"scm": {"tarball": {"uri": URL, "strip": 1, **options}}}
+    (tmp_path / "dl").mkdir()
+    repo = scm_create("pkg", tmp_path / "dl", tmp_path / "src", config)
+    assert isinstance(repo, Tarball)
+    return repo
+
+
+def _check_extracted(repo, tmp_path):
+    assert (repo.sourcedir / "a.txt").read_bytes() == b"a" * 4096
+    assert (repo.sourcedir / "sub" / "b.txt").read_bytes() == b"b"
+    assert (repo.sourcedir / "hard").samefile(repo.sourcedir / "a.txt")
+    assert (repo.sourcedir / "sym").readlink().name == "a.txt"
+
+
+@pytest.mark.parametrize(
+    "name,strip,expected",
+    [
+        ("pkg/a/b", 1, "a/b"),
+        ("./pkg/a/b", 1, "a/b"),
+        ("pkg/a/b", 2, "b"),
+        ("pkg", 1, None),
+        ("pkg/", 1, None),
+        ("./", 0, None),
+        ("./a", 0, "a"),
+    ],
+)
+def test_strip_member_name(name, strip, expected):
+    assert Tarball._strip_member_name(name, strip) == expected
+
+
+def test_extract(tmp_path, archive):
+    repo = _create(tmp_path)
+    repo._tarball = tmp_path / "dl" / "pkg-1.0.tar.gz"
+    repo._tarball.write_bytes(archive)
+    repo._extract()
+    _check_extracted(repo, tmp_path)
+
+
+@pytest.mark.skipif(not hasattr(tarfile, "data_filter"), reason="requires extraction filters")
+@pytest.mark.parametrize(
+    "name,attrs",
+    [
+        ("pkg-1.0/../../evil.txt", {}),
+        ("pkg-1.0/evil", {"type": tarfile.SYMTYPE, "linkname": "/etc/passwd"}),
+        ("pkg-1.0/dev", {"type": tarfile.CHRTYPE}),
+    ],
+)
+def test_extract_unsafe(tmp_path, name, attrs):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        _add(tar, name, b"evil" if not attrs else None, **attrs)
+    repo = _create(tmp_path)
+    repo._tarball = tmp_path / "dl" / "pkg-1.0.tar.gz"
+    repo._tarball.write_bytes(buf.getvalue())
+    with pytest.raises(tarfile.FilterError):
+        repo._extract()
+    assert not (tmp_path / "evil.txt").exists()
+
+
+@pytest.fixture
+def fake_download(monkeypatch, archive):
+    monkeypatch.setenv("BARBICAN_CACHE", "0")
+    sinks = []
+
+    def _download(url, dest_dir, hash_algorithm=None, sink=None):
+        sinks.append(sink)
+        data = archive if url == URL else f"{hashlib.sha256(archive).hexdigest()}  x".encode()
+        filepath = dest_dir / url.rsplit("/", 1)[-1]
+        filepath.write_bytes(data)
+        if sink is not None and url == URL:
+            for i in range(0, len(data), 100):
+                sink(data[i : i + 100])
+        digest = hashlib.new(hash_algorithm, data).hexdigest() if hash_algorithm else None
+        return Download(filepath, digest)
+
+    monkeypatch.setattr(tarball, "download", _download)
+    return sinks
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_download(tmp_path, fake_download, streaming):
+    repo = _create(tmp_path, hashfile_uri=URL + ".sha256", streaming=streaming)
+    repo.download()
+    _check_extracted(repo, tmp_path)
+    # hashfile (downloaded first) is never streamed
+    assert [s is not None for s in fake_download] == [False, streaming]
+
+
+def test_download_streaming_hash_mismatch(tmp_path, fake_download, monkeypatch):
+    repo = _create(tmp_path, hashfile_uri=URL + ".sha256", streaming=True)
+    monkeypatch.setattr(repo, "_hash_algorithm", "sha1")
+    with pytest.raises(Exception):
+        repo.download()
+    assert not repo.sourcedir.exists()
+
+
+def test_stream_extractor_error():
+    extractor = _StreamExtractor(lambda tar: None)
+    extractor.write(b"not a tarball" * 100)
+    with pytest.raises(tarfile.ReadError):
+        extractor.close()
+
+
+def test_stream_extractor_not_started():
+    extractor = _StreamExtractor(lambda tar: None)
+    assert not extractor.started
+    extractor.close()
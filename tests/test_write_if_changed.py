@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: 2026 H2Lab
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from camelot.barbican.utils import open_if_changed, write_if_changed
+
+
+def test_write_new(tmp_path):
+    f = tmp_path / "out.txt"
+    assert write_if_changed(f, "content")
+    assert f.read_text() == "content"
+
+
+def test_write_unchanged(tmp_path):
+    f = tmp_path / "out.bin"
+    assert write_if_changed(f, b"\x00\x01")
+    mtime = f.stat().st_mtime_ns
+    assert not write_if_changed(f, b"\x00\x01")
+    assert f.stat().st_mtime_ns == mtime
+
+
+def test_write_changed(tmp_path):
+    f = tmp_path / "out.txt"
+    write_if_changed(f, "content")
+    assert write_if_changed(f, "contenT")
+    assert f.read_text() == "contenT"
+    assert write_if_changed(f, "longer content")
+    assert f.read_text() == "longer content"
+    # No temporary file left behind
+    assert list(tmp_path.iterdir()) == [f]
+
+
+def test_open_if_changed(tmp_path):
+    f = tmp_path / "out.txt"
+    with open_if_changed(f) as out:
+        out.write("content")
+    assert f.read_text() == "content"
+    mtime = f.stat().st_mtime_ns
+    with open_if_changed(f) as out:
+        out.write("content")
+    assert f.stat().st_mtime_ns == mtime
+    with open_if_changed(f) as out:
+        out.write("contenT")
+    assert f.read_text() == "contenT"
+    assert list(tmp_path.iterdir()) == [f]
+
+
+def test_open_if_changed_error(tmp_path):
+    f = tmp_path / "out.txt"
+    f.write_text("content")
+    with pytest.raises(RuntimeError):
+        with open_if_changed(f) as out:
+            out.write("partial")
+            raise RuntimeError
+    assert f.read_text() == "content"
+    assert list(tmp_path.iterdir()) == [f]